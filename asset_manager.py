@@ -0,0 +1,119 @@
+import threading
+
+import pygame
+
+
+class AssetManager:
+    """
+    โหลดรูปของเกมครั้งเดียว แปลงเป็น format ของหน้าจอ และเก็บรูปที่ย่อ/ปรับความโปร่งใสแล้วไว้ใช้ซ้ำ
+
+    - add() ลงทะเบียนรูปด้วยชื่อ (ยังไม่โหลด)
+    - preload() อ่านและถอดรหัสไฟล์ทั้งหมดบน thread แยก (ใช้ตอนอยู่หน้าเมนู) ส่วน convert()/convert_alpha()
+      ต้องทำบน thread หลักหลังตั้งค่าหน้าจอแล้ว จึงทำตอน get() ครั้งแรก หรือทีละรูปด้วย warm()
+    - get(name, size, alpha) คืน surface ที่ cache ไว้ตาม (ชื่อ, ขนาด, alpha) ไม่ต้องย่อหรือ copy ใหม่ทุกเฟรม
+      surface ที่ได้ใช้ร่วมกันทั้งเกม ห้ามวาดทับ
+
+    Args:
+        loader: ฟังก์ชันอ่านไฟล์รูป (ค่าเริ่มต้น pygame.image.load)
+    """
+
+    def __init__(self, loader=pygame.image.load):
+        self.loader = loader
+        self._assets = {}    # name -> (path, alpha, prepare, loader)
+        self._raw = {}       # name -> surface ที่อ่านจากไฟล์แล้ว (ยังไม่ convert)
+        self._cache = {}     # (name, size, alpha) -> surface ที่พร้อมใช้
+        self._lock = threading.Lock()
+        self._preload_thread = None
+
+    def add(self, name, path, alpha=None, prepare=None, loader=None):
+        """
+        Args:
+            name: ชื่อที่ใช้กับ get()
+            path: ไฟล์รูป
+            alpha: True = convert_alpha(), False = convert(), None = ตามว่ารูปมี alpha ต่อพิกเซลหรือไม่
+            prepare: ฟังก์ชันแปลงรูปหลัง convert (เช่นเปลี่ยนสี) ทำครั้งเดียวบน thread หลัก
+            loader: ฟังก์ชันอ่านไฟล์ของรูปนี้ (None = self.loader) ต้องเรียกจาก thread อื่นได้
+        """
+        self._assets[name] = (path, alpha, prepare, loader or self.loader)
+
+    def preload(self, names=None):
+        """อ่านไฟล์รูป (ทั้งหมด หรือเฉพาะ names) บน thread แยก ไม่รอให้เสร็จ"""
+        names = list(self._assets if names is None else names)
+        if self._preload_thread is not None and self._preload_thread.is_alive():
+            return
+        self._preload_thread = threading.Thread(target=self._preload, args=(names,), daemon=True)
+        self._preload_thread.start()
+
+    def _preload(self, names):
+        for name in names:
+            if (name, None, None) in self._cache:
+                continue
+            try:
+                self._load_raw(name)
+            except Exception as e:
+                # get() จะลองโหลดใหม่และแจ้งข้อผิดพลาดให้ผู้เรียกเอง
+                print(f"Could not preload asset {name}: {e}")
+
+    def _load_raw(self, name):
+        with self._lock:
+            raw = self._raw.get(name)
+        if raw is None:
+            path, _, _, loader = self._assets[name]
+            raw = loader(path)
+            with self._lock:
+                raw = self._raw.setdefault(name, raw)
+        return raw
+
+    def warm(self, limit=1):
+        """
+        convert รูปที่ preload เสร็จแล้วแต่ยังไม่ได้ convert (ไม่เกิน limit รูป) เรียกทุกเฟรมของหน้าเมนูได้
+
+        Returns:
+            int: จำนวนรูปที่ convert ในครั้งนี้
+        """
+        with self._lock:
+            ready = [name for name in self._raw if (name, None, None) not in self._cache]
+        for name in ready[:limit]:
+            self.get(name)
+        return min(len(ready), limit)
+
+    def get(self, name, size=None, alpha=None):
+        """
+        Args:
+            name: ชื่อที่ลงทะเบียนด้วย add()
+            size: ขนาด (width, height) ที่ต้องการ (None = ขนาดเดิม)
+            alpha: ความโปร่งใสทั้งรูป 0-255 (None = ไม่ปรับ)
+
+        Returns:
+            pygame.Surface: รูปที่แปลงเป็น format ของหน้าจอแล้ว (raise ถ้าโหลดไฟล์ไม่ได้)
+        """
+        size = tuple(size) if size is not None else None
+        key = (name, size, alpha)
+        surface = self._cache.get(key)
+        if surface is not None:
+            return surface
+
+        if size is None and alpha is None:
+            _, convert_alpha, prepare, _ = self._assets[name]
+            raw = self._load_raw(name)
+            if convert_alpha is None:
+                convert_alpha = bool(raw.get_flags() & pygame.SRCALPHA)
+            surface = raw.convert_alpha() if convert_alpha else raw.convert()
+            if prepare is not None:
+                surface = prepare(surface)
+            with self._lock:
+                # ไม่ต้องเก็บรูปที่ยังไม่ convert อีกแล้ว
+                self._raw.pop(name, None)
+        elif alpha is None:
+            surface = pygame.transform.scale(self.get(name), size)
+        else:
+            # set_alpha เปลี่ยน surface เดิม จึงต้อง copy จากรูปขนาดเดียวกันที่ไม่ปรับ alpha
+            surface = self.get(name, size).copy()
+            surface.set_alpha(alpha)
+        self._cache[key] = surface
+        return surface
+
+    def clear(self):
+        with self._lock:
+            self._raw = {}
+        self._cache = {}
@@ -0,0 +1,194 @@
+"""
+ปรับ model_complexity และค่า confidence ของ MediaPipe ให้เหมาะกับเครื่องที่รันเกม
+
+ตอนเริ่มเกมครั้งแรกบนเครื่องใหม่ จะเล่นคลิปสั้นๆ ผ่านทุกชุดการตั้งค่าใน CANDIDATES
+วัดเวลา inference แล้วเลือกชุดที่แม่นยำที่สุดที่ยังอยู่ในงบเวลาต่อเฟรม
+ผลถูกบันทึกไว้ใน TUNING_PATH แยกตามชื่อเครื่อง ครั้งต่อไปจะโหลดค่าเดิมทันที
+ถ้าไม่มีคลิป จะใช้ DEFAULT_SETTINGS โดยไม่บันทึกผล (calibrate ใหม่เมื่อมีคลิปแล้ว)
+
+    python auto_tune.py --clip calibration/clip.mp4 --budget-ms 25 --force
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from frame_sources import ImageSequenceSource, VideoFileSource
+from landmark_provider import HandLandmarkProvider
+from machine_id import machine_key
+from players import MAX_PLAYERS
+from tracking_roi import InferenceRoi
+
+TUNING_PATH = os.path.join(os.path.expanduser("~"), ".cookie_cutter", "model_tuning.json")
+DEFAULT_CLIP = "calibration/clip.mp4"
+DEFAULT_SETTINGS = {"model_complexity": 1, "min_detection_confidence": 0.7, "min_tracking_confidence": 0.7}
+
+# ROI ของตัวตรวจจับมือในเกม (ย่อภาพตอนหามือ และตัดเฉพาะรอบมือเมื่อเจอแล้ว)
+GAME_ROI = {"detect_scale": 0.5, "crop_size": 256}
+
+CANDIDATES = [
+    {"model_complexity": 1, "min_detection_confidence": 0.7, "min_tracking_confidence": 0.7},
+    {"model_complexity": 1, "min_detection_confidence": 0.6, "min_tracking_confidence": 0.5},
+    {"model_complexity": 0, "min_detection_confidence": 0.7, "min_tracking_confidence": 0.7},
+    {"model_complexity": 0, "min_detection_confidence": 0.6, "min_tracking_confidence": 0.5},
+]
+
+
+def create_game_provider(settings):
+    """
+    HandLandmarkProvider แบบเดียวกับที่เกมใช้ (หามือได้ครบ MAX_PLAYERS และใช้ GAME_ROI)
+
+    Args:
+        settings: model_complexity, min_detection_confidence, min_tracking_confidence
+    """
+    return HandLandmarkProvider(max_num_hands=MAX_PLAYERS, roi=InferenceRoi(**GAME_ROI), **settings)
+
+
+def load_clip(path, max_frames=90, frame_size=(640, 480)):
+    """
+    โหลดเฟรมของคลิปที่ใช้ calibrate เข้าหน่วยความจำ
+    ถ้าไม่มีคลิปจะใช้ภาพว่าง (วัดได้แค่เวลาของ palm detection)
+
+    Returns:
+        tuple: (list ของเฟรม, True ถ้าเฟรมมาจากคลิปจริง)
+    """
+    frames = []
+    if path and os.path.exists(path):
+        if os.path.isdir(path):
+            source = ImageSequenceSource(path, realtime=False)
+        else:
+            source = VideoFileSource(path, realtime=False)
+        while len(frames) < max_frames and not source.finished:
+            ret, frame, _ = source.read()
+            if ret:
+                frames.append(frame)
+        source.release()
+    if not frames:
+        print(f"Calibration clip not found at {path}, timing on blank frames")
+        return [np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)] * 30, False
+    return frames, True
+
+
+def measure_settings(frames, settings, warmup=5):
+    """
+    Returns:
+        dict: เวลา inference (mean/p90 ms) และสัดส่วนเฟรมที่ตรวจเจอมือ
+    """
+    provider = create_game_provider(settings)
+    timestamp = 0.0
+    for frame in frames[:warmup]:
+        provider.process(frame, timestamp)
+        timestamp += 1 / 30
+
+    latencies = []
+    detected = 0
+    for frame in frames:
+        start = time.perf_counter()
+        landmark_frame = provider.process(frame, timestamp)
+        latencies.append((time.perf_counter() - start) * 1000)
+        timestamp += 1 / 30
+        if landmark_frame.hands:
+            detected += 1
+    provider.close()
+
+    latencies = np.array(latencies)
+    return {
+        "settings": settings,
+        "mean_ms": float(latencies.mean()),
+        "p90_ms": float(np.percentile(latencies, 90)),
+        "detection_rate": detected / len(frames),
+    }
+
+
+def calibrate(clip_path=DEFAULT_CLIP, budget_ms=1000 / 30, candidates=CANDIDATES):
+    """
+    วัดทุกชุดการตั้งค่าแล้วเลือกชุดที่แม่นยำที่สุดจากชุดที่ p90 latency อยู่ในงบ
+    (model_complexity สูงกว่าก่อน แล้วจึงดูสัดส่วนเฟรมที่ตรวจเจอมือในคลิป)
+    ถ้าไม่มีชุดไหนอยู่ในงบเลย จะเลือกชุดที่เร็วที่สุด
+
+    Returns:
+        dict: ผลการ calibrate รวมชุดที่เลือก
+    """
+    frames, from_clip = load_clip(clip_path)
+    results = []
+    for settings in candidates:
+        result = measure_settings(frames, settings)
+        results.append(result)
+        print(f"Calibrate {settings}: mean={result['mean_ms']:.1f}ms p90={result['p90_ms']:.1f}ms "
+              f"detected={result['detection_rate']:.2f}")
+
+    within_budget = [r for r in results if r["p90_ms"] <= budget_ms]
+    if within_budget:
+        chosen = max(within_budget, key=lambda r: (r["settings"]["model_complexity"], r["detection_rate"],
+                                                   r["settings"]["min_detection_confidence"]))
+    else:
+        chosen = min(results, key=lambda r: r["p90_ms"])
+    print(f"Selected model settings: {chosen['settings']} (budget {budget_ms:.1f}ms)")
+    return {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "budget_ms": budget_ms,
+        "clip": clip_path,
+        "blank_frames": not from_clip,
+        "results": results,
+        "selected": chosen["settings"],
+    }
+
+
+def load_tuning(path=TUNING_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read tuning file {path}: {e}")
+        return {}
+
+
+def save_tuning(entry, path=TUNING_PATH):
+    tuning = load_tuning(path)
+    tuning[machine_key()] = entry
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(tuning, f, indent=2)
+
+
+def load_or_calibrate(clip_path=DEFAULT_CLIP, budget_ms=1000 / 30, force=False, path=TUNING_PATH):
+    """
+    คืนค่าการตั้งค่าของ HandLandmarkProvider สำหรับเครื่องนี้
+    (calibrate ครั้งแรกหรือเมื่อ force=True แล้วบันทึกผลไว้)
+    ถ้าไม่มีคลิปจะคืน DEFAULT_SETTINGS โดยไม่บันทึก เพราะภาพว่างวัดได้แค่ palm detection
+    และไม่มีชุดไหนตรวจเจอมือ ผลจึงใช้เลือกไม่ได้
+
+    Returns:
+        dict: model_complexity, min_detection_confidence, min_tracking_confidence
+    """
+    if not force:
+        entry = load_tuning(path).get(machine_key())
+        if entry and entry.get("budget_ms") == budget_ms:
+            return dict(entry["selected"])
+
+    if not (clip_path and os.path.exists(clip_path)):
+        print(f"Calibration clip not found at {clip_path}, using default model settings")
+        return dict(DEFAULT_SETTINGS)
+    try:
+        entry = calibrate(clip_path, budget_ms)
+    except Exception as e:
+        print(f"Model calibration failed, using defaults: {e}")
+        return dict(DEFAULT_SETTINGS)
+    if entry["blank_frames"]:
+        print(f"Could not read frames from {clip_path}, using default model settings")
+        return dict(DEFAULT_SETTINGS)
+    save_tuning(entry, path)
+    return dict(entry["selected"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate MediaPipe model settings for this machine")
+    parser.add_argument("--clip", default=DEFAULT_CLIP, help="วิดีโอหรือโฟลเดอร์ภาพที่ใช้ calibrate")
+    parser.add_argument("--budget-ms", type=float, default=1000 / 30, help="งบเวลา inference ต่อเฟรม")
+    parser.add_argument("--force", action="store_true", help="calibrate ใหม่แม้จะมีผลเดิมอยู่แล้ว")
+    args = parser.parse_args()
+    print(load_or_calibrate(args.clip, args.budget_ms, args.force))
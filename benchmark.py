@@ -0,0 +1,572 @@
+"""
+Headless benchmark ของ pipeline การวาด → การให้คะแนน โดยไม่ต้องใช้กล้องหรือหน้าจอ
+
+ตัวอย่าง:
+    python benchmark.py --record recordings/session.npz --duration 20
+    python benchmark.py --landmarks recordings/session.npz
+    python benchmark.py --video recordings/session.mp4 --realtime
+    python benchmark.py --images "recordings/frames/*.png" --fps 30
+    python benchmark.py --video recordings/session.mp4 --roi-sweep
+    python benchmark.py --landmarks recordings/session.npz --compare-raw-strokes --score-tolerance 1.0
+    python benchmark.py --landmarks recordings/session.npz --path-scoring
+    python benchmark.py --session recordings/sessions/20250101-120000-normal.ccs
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from drawing import DrawingApp
+from frame_sources import (CameraSource, ImageSequenceSource, LandmarkRecorder,
+                           LandmarkReplaySource, VideoFileSource)
+from hand_tracking import HandTracking
+from landmark_provider import HandLandmarkProvider
+from measure import ShapeMeasure
+from path_measure import PathMeasure, PathTemplate
+from players import Player
+from session_log import (EVENT, FINGERTIPS, GESTURE, METRICS, RESULT, SCORE, START, read_session)
+from tracking_roi import InferenceRoi
+
+# ต้องตรงกับขนาดที่ใช้ใน main.py
+DISPLAY_SIZE = (1200, 900)
+COOKIE_SIZE = (400, 400)
+
+# DrawingApp แบบเดิม (เก็บทุกจุด เส้นตรงระหว่างจุด) ใช้เทียบคะแนนใน --compare-raw-strokes
+RAW_STROKE_OPTIONS = {"min_distance": 0.0, "epsilon": 0.0, "smooth": False}
+# ค่าที่เทียบความต่างของคะแนนใน --compare-raw-strokes (ตรวจกับ --score-tolerance)
+SCORE_ERROR_KEYS = ("overall_score", "coverage", "out_of_bounds", "similarity")
+
+# ค่าที่เทียบระหว่างการให้คะแนนจากภาพ (raster) และจากเส้น (PathMeasure) ใน --path-scoring
+PATH_METRICS = ("coverage", "out_of_bounds", "accuracy", "overall_score")
+
+# ค่าที่ลองใน --roi-sweep (None = ภาพเต็มที่ความละเอียดเดิม ใช้เป็นค่าอ้างอิง)
+ROI_SWEEP = [
+    None,
+    {"detect_scale": 1.0, "crop_size": None},
+    {"detect_scale": 0.75, "crop_size": 320},
+    {"detect_scale": 0.5, "crop_size": 256},
+    {"detect_scale": 0.5, "crop_size": 192},
+    {"detect_scale": 0.35, "crop_size": 160},
+]
+
+
+def build_source(args):
+    """สร้าง FrameSource จาก argument ของ command line"""
+    if args.landmarks:
+        return LandmarkReplaySource(args.landmarks, realtime=args.realtime)
+    if args.video:
+        return VideoFileSource(args.video, realtime=args.realtime, mirror=args.mirror)
+    if args.images:
+        return ImageSequenceSource(args.images, fps=args.fps, realtime=args.realtime, mirror=args.mirror)
+    return CameraSource(args.camera)
+
+
+def crop_to_cookie(drawing_layer, cookie_size=COOKIE_SIZE, display_size=DISPLAY_SIZE):
+    """ตัด drawing layer เฉพาะส่วนที่อยู่ใต้รูปคุกกี้ (ตำแหน่งเดียวกับใน main.py)"""
+    portion = pygame.Surface(cookie_size, pygame.SRCALPHA)
+    portion.fill((0, 0, 0, 0))
+    offset_x = display_size[0] // 2 - cookie_size[0] // 2
+    offset_y = display_size[1] // 2 - cookie_size[1] // 2
+    portion.blit(drawing_layer, (0, 0), (offset_x, offset_y, cookie_size[0], cookie_size[1]))
+    return portion
+
+
+def has_ink(metrics):
+    """ภาพที่ให้คะแนนมีหมึกหรือไม่ (ช่วงแรก median filter ลบเส้นสั้นๆ ทิ้งจนภาพว่าง)"""
+    return metrics["coverage"] > 0 or metrics["out_of_bounds"] > 0
+
+
+def score_difference(drawing_app, raw_app, cookie_image, binary_template_path):
+    """
+    ให้คะแนนภาพของ drawing_app และ raw_app แล้วคืนความต่างของแต่ละค่าใน SCORE_ERROR_KEYS
+    (None ถ้าภาพใดภาพหนึ่งยังไม่มีหมึก)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        metrics, raw_metrics = [
+            ShapeMeasure.evaluate_drawing(crop_to_cookie(app.draw_layer()), cookie_image, binary_template_path,
+                                          save_debug=False)
+            for app in (drawing_app, raw_app)]
+    if not (has_ink(metrics) and has_ink(raw_metrics)):
+        return None
+    return [abs(metrics[key] - raw_metrics[key]) for key in SCORE_ERROR_KEYS]
+
+
+def check_score_error(score_error, tolerance):
+    """
+    คะแนนจากเส้นที่ถูกลดจุด (RDP) ต่างจากคะแนนจากเส้นแบบเก็บทุกจุดไม่เกิน tolerance หรือไม่
+    (score_error คือความต่างตอนยกปากกาแต่ละครั้ง ระหว่างลากเส้นโหมด smooth วาดช้ากว่านิ้วหนึ่งจุด
+    ภาพสองแบบจึงต่างกันชั่วคราวเสมอ)
+
+    ตรวจเฉพาะ overall_score ซึ่งเป็นคะแนนที่ผู้เล่นเห็น ค่าย่อย (coverage ฯลฯ) แสดงใน print_report
+    เพราะเส้นโค้งทับขอบ template ต่างจากเส้นตรงเล็กน้อย แต่ชดเชยกันในคะแนนรวม
+
+    Returns:
+        bool: True ถ้า overall_score ต่างกันไม่เกิน tolerance (percentage points) ทุกครั้ง
+    """
+    if score_error is None:
+        return True  # ไม่ได้เทียบกับเส้นแบบเก็บทุกจุด
+    worst = score_error[:, SCORE_ERROR_KEYS.index("overall_score")].max()
+    if worst > tolerance:
+        print(f"FAIL: overall_score vs raw strokes differs by {worst:.2f} points (tolerance {tolerance:.2f})")
+        return False
+    print(f"OK: overall_score vs raw strokes within {tolerance:.2f} points (max {worst:.2f})")
+    return True
+
+
+def run_pipeline(source, difficulty="normal", measure_interval=2, verbose=False, motion_gate=False,
+                 compare_raw=False, path_scoring=False, max_frames=None, max_seconds=None):
+    """
+    เล่น source จนจบแล้วส่งปลายนิ้วเข้า DrawingApp และ ShapeMeasure เหมือนในเกม
+    (ไม่บันทึกภาพ debug เพื่อไม่ให้เวลาเขียนไฟล์ถูกนับรวมใน eval_ms)
+
+    source ที่ไม่มีวันจบเอง (เช่น CameraSource) ต้องกำหนด max_frames หรือ max_seconds (เวลาจริง)
+
+    ถ้า compare_raw=True จะวาดด้วย DrawingApp แบบเดิม (RAW_STROKE_OPTIONS) คู่กันไป
+    แล้ววัดความต่างของคะแนนทุกครั้งที่ให้คะแนน
+    ถ้า path_scoring=True จะให้คะแนนจากเส้น (PathMeasure) คู่กันไปเพื่อเทียบกับคะแนนจากภาพ
+
+    Returns:
+        dict: สถิติของการรัน
+    """
+    tracker = HandTracking(preview_size=DISPLAY_SIZE, source=source, threaded=False)
+    tracker.set_motion_gate(motion_gate)
+    drawing_app = DrawingApp(*DISPLAY_SIZE)
+    raw_app = DrawingApp(*DISPLAY_SIZE, **RAW_STROKE_OPTIONS) if compare_raw else None
+    score_errors = []
+    score_skipped = 0  # ครั้งที่ภาพใดภาพหนึ่งยังไม่มีหมึก (ไม่นำมาเทียบ)
+    stroke_errors = []  # ความต่างของคะแนนตอนยกปากกา (ใช้กับ --score-tolerance)
+    strokes_compared = 0
+    cookie_offset = (DISPLAY_SIZE[0] // 2 - COOKIE_SIZE[0] // 2, DISPLAY_SIZE[1] // 2 - COOKIE_SIZE[1] // 2)
+    path_pairs = []
+    path_time = 0.0
+    cookie_image = pygame.transform.scale(
+        pygame.image.load(f"assets/cookie_template_{difficulty}.png"), COOKIE_SIZE)
+    binary_template_path = ShapeMeasure.load_binary_template(difficulty)
+    path_template = PathTemplate(cookie_image, binary_template_path) if path_scoring else None
+
+    scale_x = DISPLAY_SIZE[0] / max(1, tracker.original_width)
+    scale_y = DISPLAY_SIZE[1] / max(1, tracker.original_height)
+
+    frames = 0
+    evaluations = 0
+    eval_time = 0.0
+    first_timestamp = last_timestamp = None
+    metrics = None
+
+    start = time.perf_counter()
+    while not source.finished:
+        if max_frames is not None and frames >= max_frames:
+            break
+        if max_seconds is not None and time.perf_counter() - start >= max_seconds:
+            break
+        if not tracker.step():
+            continue
+        frames += 1
+
+        landmark_frame = tracker.provider.latest()
+        if first_timestamp is None:
+            first_timestamp = landmark_frame.timestamp
+        last_timestamp = landmark_frame.timestamp
+
+        hand_positions = [(int(x * scale_x), int(y * scale_y)) for (x, y) in tracker.get_hand_positions()]
+        drawing_app.update(hand_positions, landmark_frame.timestamp)
+        if raw_app:
+            raw_app.update(hand_positions, landmark_frame.timestamp)
+            if drawing_app.completed_strokes > strokes_compared:
+                strokes_compared = drawing_app.completed_strokes
+                difference = score_difference(drawing_app, raw_app, cookie_image, binary_template_path)
+                if difference is not None:
+                    stroke_errors.append(difference)
+
+        if frames % measure_interval == 0:
+            eval_start = time.perf_counter()
+            output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            with output:
+                metrics = ShapeMeasure.evaluate_drawing(
+                    crop_to_cookie(drawing_app.draw_layer()), cookie_image, binary_template_path,
+                    save_debug=False)
+            eval_time += time.perf_counter() - eval_start
+            evaluations += 1
+            if path_template:
+                path_start = time.perf_counter()
+                path_metrics = PathMeasure.evaluate_paths(drawing_app.strokes.strokes(), path_template,
+                                                          cookie_offset)
+                path_time += time.perf_counter() - path_start
+                path_pairs.append([(metrics[key], path_metrics[key]) for key in PATH_METRICS])
+            if raw_app:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    raw_metrics = ShapeMeasure.evaluate_drawing(
+                        crop_to_cookie(raw_app.draw_layer()), cookie_image, binary_template_path,
+                        save_debug=False)
+                if has_ink(metrics) and has_ink(raw_metrics):
+                    score_errors.append([abs(metrics[key] - raw_metrics[key]) for key in SCORE_ERROR_KEYS])
+                else:
+                    score_skipped += 1
+    wall_time = time.perf_counter() - start
+    if raw_app:
+        # จบการบันทึกนับเป็นการยกปากกา (วาดช่วงท้ายของเส้นสุดท้ายให้เสร็จก่อนเทียบ)
+        drawing_app.update([])
+        raw_app.update([])
+        if drawing_app.completed_strokes > strokes_compared:
+            difference = score_difference(drawing_app, raw_app, cookie_image, binary_template_path)
+            if difference is not None:
+                stroke_errors.append(difference)
+    tracker.close()
+
+    media_time = (last_timestamp - first_timestamp) if frames > 1 else 0.0
+    return {
+        "frames": frames,
+        "wall_time": wall_time,
+        "media_time": media_time,
+        "fps": frames / wall_time if wall_time > 0 else 0.0,
+        "speedup": media_time / wall_time if wall_time > 0 else 0.0,
+        "evaluations": evaluations,
+        "eval_ms": 1000 * eval_time / evaluations if evaluations else 0.0,
+        "metrics": metrics,
+        "motion": tracker.get_motion_stats(),
+        "strokes": stroke_stats(drawing_app),
+        "raw_strokes": stroke_stats(raw_app) if raw_app else None,
+        "score_error": np.array(score_errors) if score_errors else None,
+        "score_skipped": score_skipped,
+        "stroke_score_error": np.array(stroke_errors) if stroke_errors else None,
+        "path_pairs": np.array(path_pairs) if path_pairs else None,
+        "path_ms": 1000 * path_time / len(path_pairs) if path_pairs else 0.0,
+    }
+
+
+def stroke_stats(drawing_app):
+    store = drawing_app.strokes
+    return {
+        "points": len(store),
+        "strokes": store.stroke_count,
+        "simplified": store.simplified_points,
+        "draw_calls": drawing_app.draw_calls,
+    }
+
+
+def replay_session(path, verbose=False, tolerance=0.01):
+    """
+    เล่นเกมที่บันทึกด้วย SessionRecorder ซ้ำเร็วที่สุดเท่าที่ทำได้ ผ่าน DrawingApp และ ShapeMeasure
+
+    ทุกครั้งที่เกมเริ่มให้คะแนน (record SCORE) จะให้คะแนนภาพ ณ ตอนนั้นใหม่
+    แล้วเทียบกับคะแนนที่เกมได้จริง (record METRICS ถัดไปของผู้เล่นคนเดียวกัน)
+
+    Returns:
+        dict: สถิติการเล่นซ้ำและจำนวนคะแนนที่ไม่ตรงกับที่บันทึกไว้
+    """
+    players = []
+    cookie_image = binary_template_path = None
+    pending = {}
+    mismatches = []
+    evaluations = 0
+    eval_time = 0.0
+    fingertip_frames = 0
+    gestures = []
+    result = None
+    first_timestamp = last_timestamp = None
+
+    start = time.perf_counter()
+    for record in read_session(path):
+        if first_timestamp is None:
+            first_timestamp = record.timestamp
+        last_timestamp = record.timestamp
+
+        if record.kind == START:
+            difficulty = record.data["difficulty"].lower()
+            width, height = record.data["display_size"]
+            players = [Player(i, width, height) for i in range(record.data["num_players"])]
+            cookie_image = pygame.transform.scale(
+                pygame.image.load(f"assets/cookie_template_{difficulty}.png"), COOKIE_SIZE)
+            binary_template_path = ShapeMeasure.load_binary_template(difficulty)
+        elif record.kind == FINGERTIPS:
+            fingertip_frames += 1
+            for player, positions in zip(players, record.data):
+                player.drawing_app.update(positions, record.timestamp)
+        elif record.kind == SCORE:
+            player = players[record.data["player"]]
+            eval_start = time.perf_counter()
+            output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            with output:
+                pending[player.player_id] = ShapeMeasure.evaluate_drawing(
+                    crop_to_cookie(player.drawing_app.draw_layer()), cookie_image, binary_template_path,
+                    save_debug=False)
+            eval_time += time.perf_counter() - eval_start
+            evaluations += 1
+        elif record.kind == METRICS:
+            replayed = pending.pop(record.data["player"], None)
+            if replayed is None:
+                continue
+            recorded = record.data["metrics"]
+            players[record.data["player"]].latest_metrics = replayed
+            diff = max(abs((replayed[key] or 0.0) - (recorded[key] or 0.0)) for key in recorded)
+            if diff > tolerance:
+                mismatches.append((record.timestamp - first_timestamp, record.data["player"], diff))
+        elif record.kind == EVENT:
+            event = record.data["event"]
+            if event == "reset":
+                for player in players:
+                    player.drawing_app.reset()
+            elif event in ("undo", "redo"):
+                players[record.data["player"]].undo(redo=event == "redo")
+        elif record.kind == GESTURE:
+            gestures.append(record.data["gesture"])
+        elif record.kind == RESULT:
+            result = record.data
+    wall_time = time.perf_counter() - start
+
+    media_time = (last_timestamp - first_timestamp) if first_timestamp is not None else 0.0
+    return {
+        "fingertip_frames": fingertip_frames,
+        "wall_time": wall_time,
+        "media_time": media_time,
+        "speedup": media_time / wall_time if wall_time > 0 else 0.0,
+        "evaluations": evaluations,
+        "eval_ms": 1000 * eval_time / evaluations if evaluations else 0.0,
+        "mismatches": mismatches,
+        "gestures": gestures,
+        "result": result,
+        "final_metrics": [player.latest_metrics for player in players],
+    }
+
+
+def print_session_report(stats):
+    print("--- SESSION REPLAY ---")
+    print(f"Fingertip frames: {stats['fingertip_frames']}  Wall time: {stats['wall_time']:.2f}s  "
+          f"Recorded time: {stats['media_time']:.2f}s ({stats['speedup']:.1f}x real time)")
+    print(f"Evaluations: {stats['evaluations']}  Avg evaluate_drawing: {stats['eval_ms']:.1f} ms")
+    if stats["gestures"]:
+        print(f"Gestures: {', '.join(stats['gestures'])}")
+    if stats["result"]:
+        print(f"Recorded result: {stats['result']['result']} (leader: player {stats['result']['leader'] + 1})")
+    if stats["mismatches"]:
+        print(f"{len(stats['mismatches'])} evaluations differ from the recorded metrics:")
+        for t, player_id, diff in stats["mismatches"][:10]:
+            print(f"  t={t:.2f}s player {player_id + 1}: max difference {diff:.2f}")
+    else:
+        print("All replayed evaluations match the recorded metrics")
+
+
+def record_landmarks(source, path, duration):
+    """บันทึกพิกัดมือจาก source เป็นไฟล์ .npz สำหรับ LandmarkReplaySource"""
+    tracker = HandTracking(preview_size=DISPLAY_SIZE, source=source, threaded=False)
+    recorder = LandmarkRecorder()
+    subscription = tracker.provider.subscribe(recorder)
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end and not source.finished:
+        tracker.step()
+    subscription.close()
+    tracker.close()
+    recorder.save(path)
+    print(f"Recorded {len(recorder)} frames to {path}")
+
+
+def collect_landmarks(make_source, roi=None, provider_settings=None):
+    """
+    รัน inference กับทุกเฟรมของ source แล้วเก็บพิกัดมือของแต่ละเฟรม
+
+    Returns:
+        tuple: (list ของ hands ต่อเฟรม, ขนาดภาพ, เวลาที่ใช้ทั้งหมด)
+    """
+    provider = HandLandmarkProvider(roi=roi, **(provider_settings or {}))
+    source = make_source()
+    tracker = HandTracking(preview_size=(64, 48), provider=provider, source=source, threaded=False)
+    per_frame = []
+    start = time.perf_counter()
+    while not source.finished:
+        if tracker.step():
+            per_frame.append(provider.latest().hands)
+    elapsed = time.perf_counter() - start
+    frame_size = (tracker.original_width, tracker.original_height)
+    tracker.close()
+    provider.close()
+    return per_frame, frame_size, elapsed
+
+
+def compare_landmarks(reference, candidate, frame_size):
+    """
+    เทียบพิกัดมือกับค่าอ้างอิง
+
+    Returns:
+        tuple: (สัดส่วนเฟรมที่ยังตรวจเจอมือ, ระยะผิดพลาดเฉลี่ยเป็น pixel)
+    """
+    size = np.array(frame_size, dtype=np.float32)
+    reference_frames = 0
+    detected_frames = 0
+    errors = []
+    for ref_hands, hands in zip(reference, candidate):
+        if not ref_hands:
+            continue
+        reference_frames += 1
+        if not hands:
+            continue
+        detected_frames += 1
+        for ref in ref_hands:
+            # จับคู่มือด้วยตำแหน่งข้อมือที่ใกล้ที่สุด
+            match = min(hands, key=lambda hand: np.linalg.norm((hand[0, :2] - ref[0, :2]) * size))
+            errors.append(np.linalg.norm((match[:, :2] - ref[:, :2]) * size, axis=1).mean())
+    recall = detected_frames / reference_frames if reference_frames else 0.0
+    mean_error = float(np.mean(errors)) if errors else float("nan")
+    return recall, mean_error
+
+
+def run_roi_sweep(make_source, sweep=ROI_SWEEP):
+    """
+    วัด fps ของ inference และความแม่นยำเทียบกับภาพเต็ม สำหรับแต่ละค่า detect_scale / crop_size
+    """
+    reference = None
+    rows = []
+    for settings in sweep:
+        roi = InferenceRoi(**settings) if settings is not None else None
+        per_frame, frame_size, elapsed = collect_landmarks(make_source, roi)
+        if reference is None:
+            reference = per_frame
+        recall, mean_error = compare_landmarks(reference, per_frame, frame_size)
+        rows.append({
+            "settings": settings,
+            "fps": len(per_frame) / elapsed if elapsed > 0 else 0.0,
+            "ms": 1000 * elapsed / max(1, len(per_frame)),
+            "recall": recall,
+            "error_px": mean_error,
+        })
+
+    print("--- ROI SWEEP ---")
+    print(f"{'setting':<40} {'fps':>7} {'ms/frame':>9} {'recall':>7} {'err px':>7}")
+    for row in rows:
+        settings = row["settings"]
+        label = "full frame (reference)" if settings is None else \
+            f"detect_scale={settings['detect_scale']} crop_size={settings['crop_size']}"
+        print(f"{label:<40} {row['fps']:>7.1f} {row['ms']:>9.1f} {row['recall']:>7.2f} {row['error_px']:>7.2f}")
+    return rows
+
+
+def print_report(stats):
+    print("--- BENCHMARK ---")
+    print(f"Frames: {stats['frames']}  Wall time: {stats['wall_time']:.2f}s  "
+          f"Recorded time: {stats['media_time']:.2f}s")
+    print(f"Pipeline: {stats['fps']:.1f} fps ({stats['speedup']:.1f}x real time)")
+    print(f"Evaluations: {stats['evaluations']}  Avg evaluate_drawing: {stats['eval_ms']:.1f} ms")
+    motion = stats["motion"]
+    if motion["enabled"]:
+        print(f"Motion gate: skipped {motion['skipped']}/{motion['frames']} frames "
+              f"({100 * motion['skip_rate']:.1f}%), forced {motion['forced']}")
+    strokes = stats["strokes"]
+    print(f"Strokes: {strokes['strokes']}  points stored: {strokes['points']} "
+          f"(RDP removed {strokes['simplified']})  draw calls: {strokes['draw_calls']}")
+    if stats["raw_strokes"]:
+        raw = stats["raw_strokes"]
+        print(f"Raw strokes: points stored: {raw['points']}  draw calls: {raw['draw_calls']}")
+    if stats["score_error"] is not None:
+        error = stats["score_error"]
+        print(f"Score error vs raw strokes (percentage points, mean / max, "
+              f"{stats['score_skipped']} evaluations without ink skipped):")
+        for i, key in enumerate(SCORE_ERROR_KEYS):
+            print(f"  {key:<14} {error[:, i].mean():6.2f} / {error[:, i].max():6.2f}")
+    if stats["stroke_score_error"] is not None:
+        error = stats["stroke_score_error"]
+        print(f"Score error vs raw strokes at pen-up ({len(error)} strokes, mean / max):")
+        for i, key in enumerate(SCORE_ERROR_KEYS):
+            print(f"  {key:<14} {error[:, i].mean():6.2f} / {error[:, i].max():6.2f}")
+    if stats["path_pairs"] is not None:
+        print_path_calibration(stats["path_pairs"], stats["eval_ms"], stats["path_ms"])
+    if stats["metrics"]:
+        m = stats["metrics"]
+        print(f"Final score: {m['overall_score']:.1f}%  coverage={m['coverage']:.1f}%  "
+              f"out_of_bounds={m['out_of_bounds']:.1f}%  similarity={m['similarity']:.1f}%")
+
+
+def print_path_calibration(pairs, raster_ms, path_ms):
+    """
+    เทียบคะแนนจากเส้นกับคะแนนจากภาพ: ความต่างเฉลี่ย/สูงสุด, correlation และเส้นตรงที่ fit ได้
+    (raster ≈ slope * path + intercept)
+
+    Args:
+        pairs: array (จำนวนครั้งที่ให้คะแนน, len(PATH_METRICS), 2) ของ (raster, path)
+    """
+    # ช่วงแรกที่ภาพยังไม่มีหมึก (median filter ลบเส้นสั้นๆ ทิ้ง) ไม่นำมาเทียบ
+    drawn = (pairs[:, PATH_METRICS.index("coverage"), 0] > 0) | (pairs[:, PATH_METRICS.index("out_of_bounds"), 0] > 0)
+    skipped = len(pairs) - int(np.count_nonzero(drawn))
+    pairs = pairs[drawn]
+    print(f"--- PATH SCORING CALIBRATION ({len(pairs)} evaluations, {skipped} without raster ink skipped) ---")
+    print(f"Raster evaluate_drawing: {raster_ms:.1f} ms  PathMeasure: {path_ms:.2f} ms")
+    print(f"{'metric':<14} {'mean err':>8} {'max err':>8} {'corr':>6} {'slope':>6} {'intercept':>9}")
+    if not len(pairs):
+        return
+    for i, key in enumerate(PATH_METRICS):
+        raster, path = pairs[:, i, 0], pairs[:, i, 1]
+        error = np.abs(raster - path)
+        if np.std(raster) > 0 and np.std(path) > 0:
+            corr = np.corrcoef(raster, path)[0, 1]
+            slope, intercept = np.polyfit(path, raster, 1)
+        else:
+            corr, slope, intercept = float("nan"), float("nan"), float("nan")
+        print(f"{key:<14} {error.mean():>8.2f} {error.max():>8.2f} {corr:>6.2f} {slope:>6.2f} {intercept:>9.2f}")
+    print("(overall_score ของ PathMeasure ไม่มี similarity จึงใช้น้ำหนักที่ปรับสัดส่วนใหม่)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cookie Cutter headless pipeline benchmark")
+    parser.add_argument("--landmarks", help="ไฟล์ .npz ของพิกัดมือที่บันทึกไว้")
+    parser.add_argument("--video", help="ไฟล์วิดีโอ")
+    parser.add_argument("--images", help="glob pattern หรือโฟลเดอร์ของภาพ")
+    parser.add_argument("--camera", type=int, default=0, help="index ของกล้อง (ใช้เมื่อไม่ระบุไฟล์)")
+    parser.add_argument("--fps", type=float, default=30.0, help="อัตราเฟรมของ --images")
+    parser.add_argument("--mirror", action="store_true", help="พลิกภาพจากไฟล์เหมือนกระจก")
+    parser.add_argument("--realtime", action="store_true", help="เล่นตามเวลาจริงแทนการเล่นเร็วที่สุด")
+    parser.add_argument("--difficulty", default="normal", choices=["easy", "normal", "hard"])
+    parser.add_argument("--measure-interval", type=int, default=2)
+    parser.add_argument("--record", help="บันทึกพิกัดมือลงไฟล์ .npz แทนการ benchmark")
+    parser.add_argument("--duration", type=float, default=20.0,
+                        help="ระยะเวลาบันทึก และระยะเวลา benchmark เมื่อใช้กล้อง (วินาที)")
+    parser.add_argument("--max-frames", type=int, help="หยุด benchmark เมื่อครบจำนวนเฟรมนี้")
+    parser.add_argument("--verbose", action="store_true", help="แสดง log ของ ShapeMeasure")
+    parser.add_argument("--motion-gate", action="store_true",
+                        help="ข้าม inference เมื่อมือไม่ขยับ แล้วแสดงสถิติการข้าม")
+    parser.add_argument("--roi-sweep", action="store_true",
+                        help="เทียบ fps/ความแม่นยำของ InferenceRoi แต่ละค่า (ใช้กับ --video หรือ --images)")
+    parser.add_argument("--compare-raw-strokes", action="store_true",
+                        help="วาดแบบเก็บทุกจุด/เส้นตรงคู่กันไป แล้วแสดงความต่างของคะแนน")
+    parser.add_argument("--score-tolerance", type=float, default=1.0,
+                        help="ความต่างของ overall_score ตอนยกปากกา (percentage points) ที่ยอมรับได้กับ "
+                             "--compare-raw-strokes ถ้าเกินจะจบด้วย exit code 1")
+    parser.add_argument("--session", help="ไฟล์ .ccs ที่บันทึกจากเกม (เล่นซ้ำและเทียบคะแนน)")
+    parser.add_argument("--path-scoring", action="store_true",
+                        help="ให้คะแนนจากเส้น (PathMeasure) คู่กันไป แล้วแสดงผลเทียบกับคะแนนจากภาพ")
+    args = parser.parse_args()
+
+    pygame.init()
+    if args.session:
+        print_session_report(replay_session(args.session, args.verbose))
+        pygame.quit()
+        return
+    if args.roi_sweep:
+        if not (args.video or args.images):
+            parser.error("--roi-sweep needs --video or --images")
+        args.realtime = False
+        run_roi_sweep(lambda: build_source(args))
+        pygame.quit()
+        return
+
+    source = build_source(args)
+    if args.record:
+        record_landmarks(source, args.record, args.duration)
+    else:
+        stats = run_pipeline(source, args.difficulty, args.measure_interval, args.verbose,
+                             args.motion_gate, args.compare_raw_strokes,
+                             args.path_scoring, max_frames=args.max_frames,
+                             max_seconds=args.duration if isinstance(source, CameraSource) else None)
+        print_report(stats)
+        if not check_score_error(stats["stroke_score_error"], args.score_tolerance):
+            pygame.quit()
+            sys.exit(1)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import threading
+import time
+
+
+class CaptureHealth:
+    """
+    สถานะสุขภาพของการดึงภาพจากกล้อง และตัวนับสถิติ
+
+    สถานะ:
+        "ok"       ได้ภาพปกติ
+        "degraded" อ่านภาพไม่สำเร็จติดกันหรือไม่ได้ภาพใหม่เกิน degraded_after วินาที
+                   หรือ inference worker ตายและต้องทำ inference ใน capture thread แทน
+        "lost"     ไม่ได้ภาพใหม่เกิน lost_after วินาที (กำลังพยายามเปิดกล้องใหม่)
+        "paused"   หยุดดึงภาพเอง (เกมไม่ต้องการภาพ) ไม่นับว่ากล้องมีปัญหา
+    """
+
+    OK = "ok"
+    DEGRADED = "degraded"
+    LOST = "lost"
+    PAUSED = "paused"
+
+    def __init__(self, degraded_after=0.5, lost_after=3.0, base_backoff=0.01, max_backoff=1.0,
+                 reopen_after=10):
+        self.degraded_after = degraded_after
+        self.lost_after = lost_after
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.reopen_after = reopen_after  # จำนวนครั้งที่อ่านไม่สำเร็จติดกันก่อนเปิดกล้องใหม่
+
+        self._lock = threading.Lock()
+        self.last_good_time = time.perf_counter()
+        self.good_frames = 0
+        self.failed_reads = 0
+        self.consecutive_failures = 0
+        self.reconnects = 0
+        self.inference_failures = 0
+        self.paused = False
+
+    def record_success(self):
+        with self._lock:
+            self.last_good_time = time.perf_counter()
+            self.good_frames += 1
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        """
+        บันทึกการอ่านที่ไม่สำเร็จ
+
+        Returns:
+            float: เวลาที่ควรรอก่อนลองใหม่ (exponential backoff)
+        """
+        with self._lock:
+            self.failed_reads += 1
+            self.consecutive_failures += 1
+            exponent = min(self.consecutive_failures - 1, 16)
+            return min(self.max_backoff, self.base_backoff * (2 ** exponent))
+
+    def should_reopen(self):
+        return self.consecutive_failures > 0 and self.consecutive_failures % self.reopen_after == 0
+
+    def record_reconnect(self):
+        with self._lock:
+            self.reconnects += 1
+
+    def record_inference_failure(self):
+        with self._lock:
+            self.inference_failures += 1
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        """เริ่มนับเวลาใหม่ เพื่อไม่ให้ช่วงที่หยุดไว้ถูกนับเป็นกล้องหลุด"""
+        with self._lock:
+            self.paused = False
+            self.last_good_time = time.perf_counter()
+            self.consecutive_failures = 0
+
+    def time_since_last_good(self):
+        return time.perf_counter() - self.last_good_time
+
+    @property
+    def state(self):
+        if self.paused:
+            return self.PAUSED
+        since = self.time_since_last_good()
+        if since >= self.lost_after:
+            return self.LOST
+        if since >= self.degraded_after or self.consecutive_failures > 0 or self.inference_failures > 0:
+            return self.DEGRADED
+        return self.OK
+
+    def snapshot(self, dropped_frames=0):
+        """
+        Returns:
+            dict: สถานะและตัวนับทั้งหมด สำหรับแสดงผลหรือบันทึก log
+        """
+        return {
+            "state": self.state,
+            "since_last_good": self.time_since_last_good(),
+            "good_frames": self.good_frames,
+            "failed_reads": self.failed_reads,
+            "dropped_frames": dropped_frames,
+            "reconnects": self.reconnects,
+            "inference_failures": self.inference_failures,
+        }
@@ -0,0 +1,259 @@
+import json
+import os
+import platform
+import time
+
+import cv2
+import numpy as np
+
+from machine_id import machine_key
+
+
+class CaptureProfile:
+    """
+    การตั้งค่ากล้องที่ต้องการ (ความละเอียด, fps, fourcc, ขนาด buffer, การล็อก exposure)
+
+    Args:
+        width, height: ความละเอียดที่ขอจากกล้อง (ไม่จำเป็นต้องใหญ่ MediaPipe ทำงานที่ ~256px อยู่แล้ว)
+        fps: อัตราเฟรมที่ขอ
+        fourcc: รูปแบบภาพ เช่น "MJPG" (ส่งผ่าน USB ได้ fps สูงกว่า) หรือ "YUYV"
+        buffer_size: จำนวนเฟรมที่ driver เก็บไว้ ยิ่งน้อยยิ่ง latency ต่ำ
+        lock_exposure: ล็อก exposure หลังจากกล้องปรับแสงเสร็จ เพื่อไม่ให้ fps ตกตอนแสงน้อย
+    """
+
+    def __init__(self, width=640, height=480, fps=30, fourcc="MJPG", buffer_size=1, lock_exposure=True):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fourcc = fourcc
+        self.buffer_size = buffer_size
+        self.lock_exposure = lock_exposure
+
+    def __repr__(self):
+        return (f"CaptureProfile({self.width}x{self.height}@{self.fps} {self.fourcc}, "
+                f"buffer={self.buffer_size}, lock_exposure={self.lock_exposure})")
+
+    def to_dict(self):
+        return {
+            "width": self.width,
+            "height": self.height,
+            "fps": self.fps,
+            "fourcc": self.fourcc,
+            "buffer_size": self.buffer_size,
+            "lock_exposure": self.lock_exposure,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def apply(self, cap):
+        """
+        ส่งค่าที่ต้องการให้กล้อง (ต้องตั้ง fourcc ก่อนความละเอียดถึงจะมีผลในหลาย driver)
+
+        Returns:
+            dict: ค่าที่กล้องใช้จริงหลังจากตั้งค่า
+        """
+        if self.fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        cap.set(cv2.CAP_PROP_FPS, self.fps)
+        if self.buffer_size:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        if self.lock_exposure:
+            # เปิด auto exposure ก่อนเสมอ เพราะบาง driver (V4L2) จำค่าที่ล็อกไว้จากการเปิดครั้งก่อน
+            cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, _exposure_modes(cap)[0])
+        return read_actual_settings(cap)
+
+    def lock_current_exposure(self, cap):
+        """
+        ล็อก exposure ไว้ที่ค่าปัจจุบัน (เรียกหลังจากอ่านภาพไปสักพักให้กล้องปรับแสงเสร็จก่อน)
+        """
+        if not self.lock_exposure:
+            return
+        exposure = cap.get(cv2.CAP_PROP_EXPOSURE)
+        cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, _exposure_modes(cap)[1])
+        cap.set(cv2.CAP_PROP_EXPOSURE, exposure)
+
+
+def _exposure_modes(cap):
+    """ค่า CAP_PROP_AUTO_EXPOSURE (auto, manual) ของ backend: V4L2 ใช้ 3/1 ส่วน DirectShow/MSMF ใช้ 0.75/0.25"""
+    return (3, 1) if cap.getBackendName() == "V4L2" else (0.75, 0.25)
+
+
+def read_actual_settings(cap):
+    """อ่านค่าที่กล้องใช้อยู่จริง"""
+    fourcc_code = int(cap.get(cv2.CAP_PROP_FOURCC))
+    fourcc = "".join(chr((fourcc_code >> (8 * i)) & 0xFF) for i in range(4)) if fourcc_code else ""
+    return {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "fourcc": fourcc,
+    }
+
+
+# โหมดที่ลองตอนเริ่มเกม เรียงจากที่น่าจะดีที่สุด (ทุกโหมดล็อก exposure หลังกล้องปรับแสงเสร็จ)
+DEFAULT_CANDIDATES = [
+    CaptureProfile(640, 480, 30, "MJPG"),
+    CaptureProfile(640, 360, 60, "MJPG"),
+    CaptureProfile(1280, 720, 30, "MJPG"),
+    CaptureProfile(640, 480, 30, "YUYV"),
+    CaptureProfile(640, 480, 30, None),
+]
+
+CAPTURE_LOG_PATH = "logs/capture_probe.jsonl"
+PROFILE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cookie_cutter", "capture_profile.json")
+
+
+def probe_profile(index, profile, frames=20, warmup=5):
+    """
+    เปิดกล้องด้วย profile ที่กำหนดแล้ววัด fps ที่ได้จริงและเวลาที่ใช้ในการอ่านแต่ละเฟรม
+    (read() รอจนกว่ากล้องจะส่งเฟรมถัดไป เวลาที่วัดได้จึงเป็นคาบของเฟรม ไม่ใช่ latency ของภาพ)
+
+    Returns:
+        dict: ผลการวัด (opened, actual, achieved_fps, read_ms_mean, read_ms_p95, failed_reads)
+    """
+    result = {"profile": profile.to_dict(), "opened": False}
+    cap = cv2.VideoCapture(index)
+    try:
+        if not cap.isOpened():
+            return result
+        result["opened"] = True
+        result["actual"] = profile.apply(cap)
+
+        for _ in range(warmup):
+            cap.read()
+        profile.lock_current_exposure(cap)
+
+        read_times = []
+        failed_reads = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            read_start = time.perf_counter()
+            ret, _ = cap.read()
+            read_times.append(time.perf_counter() - read_start)
+            if not ret:
+                failed_reads += 1
+        elapsed = time.perf_counter() - start
+
+        read_ms = np.array(read_times) * 1000
+        result["achieved_fps"] = (frames - failed_reads) / elapsed if elapsed > 0 else 0.0
+        result["read_ms_mean"] = float(read_ms.mean())
+        result["read_ms_p95"] = float(np.percentile(read_ms, 95))
+        result["failed_reads"] = failed_reads
+        return result
+    finally:
+        cap.release()
+
+
+def _profile_rank(result):
+    """
+    ลำดับความดีของผลการวัด: fps ที่ได้จริง (ไม่เกิน 60), คาบของเฟรม (p95 ของเวลา read) สม่ำเสมอ,
+    จำนวน pixel น้อย (inference ถูกกว่า)
+    """
+    actual = result["actual"]
+    return (
+        min(result["achieved_fps"], 60.0) // 5,  # ต่างกันไม่ถึง 5 fps ถือว่าเท่ากัน
+        -round(result["read_ms_p95"]),
+        -(actual["width"] * actual["height"]),
+    )
+
+
+def select_best_profile(index=0, candidates=None, frames=20, log_path=CAPTURE_LOG_PATH):
+    """
+    ลองทุกโหมดใน candidates แล้วเลือกโหมดที่ดีที่สุด พร้อมบันทึกผลลง log
+
+    Returns:
+        CaptureProfile หรือ None ถ้าเปิดกล้องไม่ได้เลย
+    """
+    candidates = candidates or DEFAULT_CANDIDATES
+    results = []
+    for profile in candidates:
+        result = probe_profile(index, profile, frames=frames)
+        results.append(result)
+        if result["opened"]:
+            print(f"Capture probe {profile}: actual={result['actual']} "
+                  f"fps={result['achieved_fps']:.1f} frame period={result['read_ms_mean']:.1f}ms "
+                  f"(p95 {result['read_ms_p95']:.1f}ms) failed={result['failed_reads']}")
+        else:
+            print(f"Capture probe {profile}: could not open camera {index}")
+
+    usable = [r for r in results if r["opened"] and r["achieved_fps"] > 0]
+    best = max(usable, key=_profile_rank) if usable else None
+    chosen = CaptureProfile.from_dict(best["profile"]) if best else None
+    print(f"Selected capture profile: {chosen}")
+
+    if log_path:
+        write_probe_log(log_path, index, results, best)
+    return chosen
+
+
+def camera_key(index):
+    """ชื่อที่ใช้แยกผลของแต่ละเครื่องและแต่ละกล้อง"""
+    return f"{machine_key()}|camera{index}"
+
+
+def load_profile_cache(path=PROFILE_CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read capture profile cache {path}: {e}")
+        return {}
+
+
+def save_profile_cache(index, profile, path=PROFILE_CACHE_PATH):
+    cache = load_profile_cache(path)
+    cache[camera_key(index)] = {"profile": profile.to_dict(), "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(cache, f, indent=2)
+
+
+def load_or_select_profile(index=0, force=False, check_frames=5, path=PROFILE_CACHE_PATH,
+                           log_path=CAPTURE_LOG_PATH):
+    """
+    คืน CaptureProfile ของกล้องนี้บนเครื่องนี้
+    ใช้โหมดที่เคยเลือกไว้ถ้าเปิดกล้องและอ่านภาพได้ (ลองอ่านแค่ check_frames เฟรม)
+    ถ้าไม่มีค่าเดิม ใช้ไม่ได้แล้ว หรือ force=True จะ probe ทุกโหมดใหม่แล้วจำผลไว้
+
+    Returns:
+        CaptureProfile หรือ None ถ้าเปิดกล้องไม่ได้เลย
+    """
+    if not force:
+        entry = load_profile_cache(path).get(camera_key(index))
+        if entry:
+            cached = CaptureProfile.from_dict(entry["profile"])
+            result = probe_profile(index, cached, frames=check_frames, warmup=1)
+            if result["opened"] and result["failed_reads"] < check_frames:
+                print(f"Using cached capture profile: {cached}")
+                return cached
+            print(f"Cached capture profile {cached} failed, probing again")
+
+    chosen = select_best_profile(index, log_path=log_path)
+    if chosen is not None:
+        try:
+            save_profile_cache(index, chosen, path)
+        except OSError as e:
+            print(f"Could not save capture profile cache {path}: {e}")
+    return chosen
+
+
+def write_probe_log(log_path, index, results, best):
+    """บันทึกผลการ probe ต่อท้ายไฟล์ JSON lines เพื่อเปรียบเทียบระหว่างเครื่อง"""
+    log_dir = os.path.dirname(log_path)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    entry = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "host": platform.node(),
+        "camera": index,
+        "results": results,
+        "selected": best["profile"] if best else None,
+    }
+    with open(log_path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
@@ -0,0 +1,94 @@
+import pygame
+
+
+class FrameCompositor:
+    """
+    ประกอบภาพของหน้าเกม: ภาพกล้อง → คุกกี้ + template → เส้นของผู้เล่น
+
+    - คุกกี้และ template ที่ย่อ/ปรับความโปร่งใสแล้วมาจาก cache ของ AssetManager และถูกรวมเป็น surface เดียว
+      ไว้ล่วงหน้า (แต่ละคู่ของรูปสร้างครั้งเดียว)
+    - เส้นของผู้เล่นถูก blit เฉพาะกรอบที่มีหมึก (DrawingApp.ink_bounds) ไม่ใช่ทั้ง layer ขนาดเต็มจอ
+    - ถ้าภาพกล้องยังเป็นภาพเดิม จะวาดใหม่เฉพาะกรอบที่เปลี่ยน (redraw) แล้วใช้ display.update(rects)
+
+    Args:
+        screen_size: ขนาดหน้าจอ (width, height)
+        assets: AssetManager ที่ลงทะเบียนรูปคุกกี้และ template ไว้แล้ว
+        cookie_size: ขนาดที่ใช้แสดงคุกกี้ (width, height)
+    """
+
+    def __init__(self, screen_size, assets, cookie_size=(400, 400), cookie_alpha=200, template_alpha=180):
+        self.screen_size = tuple(screen_size)
+        self.assets = assets
+        self.cookie_size = tuple(cookie_size)
+        self.cookie_alpha = cookie_alpha
+        self.template_alpha = template_alpha
+        self.cookie_position = (self.screen_size[0] // 2 - self.cookie_size[0] // 2,
+                                self.screen_size[1] // 2 - self.cookie_size[1] // 2)
+        self.cookie_surface = None   # คุกกี้ที่ย่อแล้ว (ใช้ให้คะแนนด้วย)
+        self.static_layer = None     # คุกกี้ + template ที่รวมกันแล้ว
+        self._static_key = None
+        self._static_layers = {}     # (cookie_asset, template_asset) -> static_layer
+        self._composed_version = None  # preview_version ของภาพกล้องที่อยู่บนหน้าจอ
+
+    def set_static(self, cookie_asset, template_asset=None):
+        """
+        กำหนดรูปคุกกี้และ template ด้วยชื่อใน AssetManager (None = ไม่แสดง)
+        """
+        key = (cookie_asset, template_asset)
+        if key == self._static_key:
+            return
+        self._static_key = key
+        self.cookie_surface = None
+        self.static_layer = None
+        if cookie_asset is None:
+            return
+
+        self.cookie_surface = self.assets.get(cookie_asset, self.cookie_size)
+        static_layer = self._static_layers.get(key)
+        if static_layer is None:
+            static_layer = pygame.Surface(self.cookie_size, pygame.SRCALPHA)
+            static_layer.fill((0, 0, 0, 0))
+            static_layer.blit(self.assets.get(cookie_asset, self.cookie_size, self.cookie_alpha), (0, 0))
+            if template_asset is not None:
+                # ปรับความโปร่งใสให้เห็น camera feed ด้านหลัง
+                static_layer.blit(self.assets.get(template_asset, self.cookie_size, self.template_alpha), (0, 0))
+            self._static_layers[key] = static_layer
+        self.static_layer = static_layer
+
+    def can_redraw_partially(self, preview_version):
+        """True ถ้าภาพกล้องบนหน้าจอยังเป็นภาพล่าสุด (วาดใหม่เฉพาะบางส่วนได้)"""
+        return self._composed_version is not None and preview_version == self._composed_version
+
+    def invalidate(self):
+        """บังคับให้เฟรมถัดไปวาดใหม่ทั้งจอ"""
+        self._composed_version = None
+
+    def draw(self, screen, drawing_apps, preview_version=None):
+        """
+        วาดคุกกี้/template และเส้นของผู้เล่นทับภาพกล้องที่ blit ไว้แล้ว (วาดทั้งจอ)
+        """
+        self._draw_layers(screen, drawing_apps)
+        self._composed_version = preview_version
+
+    def redraw(self, screen, hand_tracker, drawing_apps, rects):
+        """
+        วาดภาพกล้อง คุกกี้ และเส้นใหม่เฉพาะใน rects (ใช้คืนพื้นหลังใต้ HUD และวาดเส้นใหม่)
+
+        Returns:
+            list: rects ที่วาดใหม่ (ส่งต่อให้ pygame.display.update)
+        """
+        rects = [pygame.Rect(rect) for rect in rects if rect]
+        for rect in rects:
+            screen.set_clip(rect)
+            hand_tracker.blit_frame(screen)
+            self._draw_layers(screen, drawing_apps)
+        screen.set_clip(None)
+        return rects
+
+    def _draw_layers(self, screen, drawing_apps):
+        if self.static_layer is not None:
+            screen.blit(self.static_layer, self.cookie_position)
+        for drawing_app in drawing_apps:
+            bounds = drawing_app.ink_bounds
+            if bounds is not None:
+                screen.blit(drawing_app.draw_layer(), bounds.topleft, bounds)
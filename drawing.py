@@ -1,30 +1,285 @@
+import numpy as np
 import pygame
 
+from stroke_store import STROKE, StrokeStore
+
+LINE_WIDTH = 12
+
+
+def catmull_rom(p0, p1, p2, p3, spacing=4.0, max_steps=16):
+    """
+    จุดบนเส้นโค้ง Catmull-Rom (uniform) จาก p1 ถึง p2 โดยใช้ p0 และ p3 กำหนดความโค้ง
+
+    Args:
+        spacing: ระยะห่างโดยประมาณระหว่างจุดที่สร้าง (พิกเซล)
+
+    Returns:
+        list: จุด (x, y) จาก p1 ถึง p2 (รวมทั้งสองจุด)
+    """
+    p0, p1, p2, p3 = (np.asarray(p, dtype=np.float64) for p in (p0, p1, p2, p3))
+    steps = int(min(max_steps, max(1, np.hypot(*(p2 - p1)) / spacing)))
+    t = np.linspace(0.0, 1.0, steps + 1)[:, None]
+    t2 = t * t
+    t3 = t2 * t
+    curve = 0.5 * (2 * p1 + (p2 - p0) * t + (2 * p0 - 5 * p1 + 4 * p2 - p3) * t2
+                   + (3 * p1 - p0 - 3 * p2 + p3) * t3)
+    return [(int(round(x)), int(round(y))) for x, y in curve]
+
+
 class DrawingApp:
-    def __init__(self, width, height):
-        self.prev_position = None  # เก็บพิกัดก่อนหน้า
-        self.positions = []        # เก็บตำแหน่งของนิ้วที่ลากไว้
+    def __init__(self, width, height, color=(255, 0, 0), min_distance=3.0, epsilon=1.5, smooth=True,
+                 checkpoint_interval=8, max_checkpoints=4):
+        """
+        undo/redo ทีละเส้น: ทุก checkpoint_interval เส้นจะเก็บสำเนาของ layer (เฉพาะกรอบที่มีหมึก)
+        การ undo วาด layer ใหม่จาก checkpoint ล่าสุดแล้ววาดเส้นหลังจากนั้นซ้ำ (ไม่เกิน checkpoint_interval เส้น)
+        จึงใช้เวลาคงที่ไม่ว่าจะวาดมานานแค่ไหน undo ย้อนได้ถึง checkpoint เก่าสุดที่เก็บไว้เท่านั้น
+        เส้นที่วาดซ้ำใช้จุดตามที่วาดจริง (ก่อนลดจุดด้วย RDP) ภาพหลัง undo จึงเหมือนตอนวาดทุกพิกเซล
+
+        Args:
+            color: สีของเส้น (แต่ละผู้เล่นใช้สีต่างกัน)
+            min_distance: จุดใหม่ที่ห่างจากจุดล่าสุดน้อยกว่านี้ (พิกเซล) จะไม่ถูกเก็บ (radial filter)
+            epsilon: ระยะที่ยอมให้เมื่อลดจุดของเส้นที่จบแล้ว (Ramer–Douglas–Peucker, 0 = ไม่ลด)
+            smooth: วาดเส้นเป็นโค้ง Catmull-Rom (ช้ากว่าตำแหน่งนิ้วหนึ่งจุด) แทนเส้นตรงระหว่างจุด
+            checkpoint_interval: จำนวนเส้นระหว่าง checkpoint
+            max_checkpoints: จำนวน checkpoint ที่เก็บไว้ (กำหนดว่า undo ย้อนได้กี่เส้น)
+        """
+        self.color = color         # สีของเส้น (แต่ละผู้เล่นใช้สีต่างกัน)
+        self.min_distance = min_distance
+        self.smooth = smooth
+        self.prev_position = None  # เก็บพิกัดก่อนหน้า (None = ยกปากกาอยู่)
+        self.strokes = StrokeStore(epsilon=epsilon)  # เก็บตำแหน่งของนิ้วที่ลากไว้ แยกตามเส้น
+        self.draw_calls = 0        # จำนวนครั้งที่วาดลง drawing_layer (ใช้ใน benchmark)
+        # เลขรุ่นของภาพวาด เพิ่มขึ้นทุกครั้งที่มีหมึกเพิ่มหรือถูกลบ (ไม่เคยลดลง) ภาพไม่เปลี่ยน = เลขเดิม
+        self.version = 0
+        self._tail = []            # จุดล่าสุดของเส้นปัจจุบันที่ใช้คำนวณโค้ง (สูงสุด 3 จุด)
+        self.checkpoint_interval = checkpoint_interval
+        self.max_checkpoints = max_checkpoints
+        # (จำนวนเส้นที่วาดเสร็จแล้ว, กรอบ, สำเนาของ layer ในกรอบนั้น) เรียงจากเก่าไปใหม่
+        self._checkpoints = [(0, None, None)]
+        self._redo = []            # (จุดของเส้น, serial, จุดที่วาดจริง) ที่ถูก undo ไว้
+        # serial -> จุดของเส้นตามที่วาดจริง (ก่อนลดจุด) เก็บเฉพาะเส้นที่ยัง undo/วาดซ้ำได้
+        self._drawn_points = {}
+        self._live_points = []     # จุดของเส้นที่กำลังวาด
+        # serial ไม่ซ้ำกันของแต่ละเส้นใน strokes ใช้ระบุสภาพภาพวาด (ดู state_key)
+        self._serials = []
+        self._next_serial = 1
         # สร้าง surface สำหรับวาดเส้นที่โปร่งแสง
         self.drawing_layer = pygame.Surface((width, height), pygame.SRCALPHA)
         self.drawing_layer.fill((0, 0, 0, 0))  # โปร่งแสง
+        # กรอบที่เปลี่ยนตั้งแต่เรียก take_dirty_rects ครั้งก่อน และกรอบรวมของหมึกทั้งหมด
+        self.dirty_rects = []
+        self.ink_bounds = None
+
+    @property
+    def positions(self):
+        """พิกัด (x, y) ของทุกจุดที่วาด เป็น numpy array ขนาด (จำนวนจุด, 2)"""
+        return self.strokes.xy()
 
     def reset(self):
         self.prev_position = None
-        self.positions = []
+        self.strokes.clear()
+        self._tail = []
+        self._checkpoints = [(0, None, None)]
+        self._redo = []
+        self._serials = []
+        self._drawn_points = {}
+        self._live_points = []
         self.drawing_layer.fill((0, 0, 0, 0))
+        if self.ink_bounds is not None:
+            self.dirty_rects.append(self.ink_bounds)
+            self.version += 1
+        self.ink_bounds = None
+
+    def update(self, hand_positions, timestamp=None):
+        """
+        อัปเดตการวาดเส้นลงใน drawing_layer จากตำแหน่งนิ้วที่ส่งเข้ามา
+        ถ้าไม่มีตำแหน่งนิ้ว (มือหายไป) จะยกปากกา เพื่อไม่ให้ลากเส้นยาวข้ามจอเมื่อมือกลับมา
+        """
+        if not hand_positions:
+            pen_was_down = self.strokes.pen_down
+            self.strokes.pen_up()
+            if pen_was_down:
+                self._end_stroke()
+            self.prev_position = None
+            return
+
+        for hand_position in hand_positions:
+            x, y = hand_position
+            # ตำแหน่งเดิมหรือใกล้จุดล่าสุดมาก (นิ้วสั่น/ยังไม่มีผลการตรวจจับใหม่) ไม่ต้องเก็บซ้ำ
+            last = self.strokes.last_point()
+            if last is not None and np.hypot(x - last[0], y - last[1]) < max(self.min_distance, 1):
+                self.strokes.touch(timestamp)
+                continue
+            # ถ้ามีตำแหน่งก่อนหน้าในเส้นเดียวกัน ให้วาดเส้นจากก่อนหน้ามายังตำแหน่งปัจจุบัน
+            previous = self.strokes.add(x, y, timestamp)
+            if previous is None:
+                # เริ่มเส้นใหม่ (หรือยกปากกาเพราะขาดช่วงนานเกิน gap) ให้วาดช่วงท้ายของเส้นเดิมให้เสร็จ
+                if self._tail:
+                    self._end_stroke()
+                self._tail = [(x, y)]
+                self._live_points = [(x, y)]
+                self._serials.append(self._next_serial)
+                self._next_serial += 1
+                self._redo = []
+            else:
+                self._tail.append((x, y))
+                self._live_points.append((x, y))
+                if not self.smooth:
+                    self._draw([previous, (x, y)])
+                elif len(self._tail) >= 3:
+                    # วาดช่วงก่อนหน้า (tail[-3] → tail[-2]) เมื่อรู้จุดถัดไปแล้ว
+                    p0 = self._tail[-4] if len(self._tail) >= 4 else self._tail[-3]
+                    self._draw(catmull_rom(p0, self._tail[-3], self._tail[-2], self._tail[-1]))
+                del self._tail[:-3]
+            self.prev_position = (x, y)
+
+    def _end_stroke(self):
+        """
+        วาดช่วงสุดท้ายของเส้นที่ยังค้างอยู่ (โหมด smooth วาดช้ากว่านิ้วหนึ่งจุด)
+        แล้วเก็บ checkpoint ถ้าวาดครบ checkpoint_interval เส้นนับจาก checkpoint ก่อน
+        """
+        if self.smooth and len(self._tail) >= 2:
+            p0 = self._tail[-3] if len(self._tail) >= 3 else self._tail[-2]
+            self._draw(catmull_rom(p0, self._tail[-2], self._tail[-1], self._tail[-1]))
+        self._tail = []
+        if self._live_points and self._serials:
+            self._drawn_points[self._serials[-1]] = np.array(self._live_points, dtype=np.float32)
+        self._live_points = []
+        self._maybe_checkpoint()
+
+    @property
+    def completed_strokes(self):
+        """จำนวนเส้นที่วาดเสร็จแล้ว (ไม่นับเส้นที่กำลังวาด)"""
+        return self.strokes.stroke_count - (1 if self.strokes.pen_down else 0)
+
+    @property
+    def state_key(self):
+        """
+        ค่าที่ระบุภาพวาดตอนยกปากกา (ภาพเดียวกันหลัง undo/redo ได้ค่าเดิม) หรือ None ถ้ากำลังวาดอยู่
+        ใช้เป็น key ของคะแนนที่คำนวณไว้แล้ว
+        """
+        if self.strokes.pen_down:
+            return None
+        return self._serials[-1] if self._serials else 0
+
+    def _maybe_checkpoint(self):
+        completed = self.completed_strokes
+        if completed - self._checkpoints[-1][0] < self.checkpoint_interval:
+            return
+        rect = self.ink_bounds
+        patch = self.drawing_layer.subsurface(rect).copy() if rect is not None else None
+        self._checkpoints.append((completed, rect, patch))
+        if len(self._checkpoints) > self.max_checkpoints:
+            del self._checkpoints[0]
+            # เส้นก่อน checkpoint เก่าสุดไม่ต้องวาดซ้ำอีกแล้ว
+            undoable = set(self._serials[self._checkpoints[0][0]:])
+            self._drawn_points = {serial: points for serial, points in self._drawn_points.items()
+                                  if serial in undoable}
+
+    def can_undo(self):
+        # ย้อนได้ถึง checkpoint เก่าสุด และเฉพาะเส้นที่ StrokeStore ยังเก็บไว้ครบ (ไม่ถูกทิ้งเมื่อเต็ม)
+        return self.strokes.stroke_count > max(self._checkpoints[0][0], self.strokes.first_stroke)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """
+        ลบเส้นล่าสุด (รวมถึงเส้นที่กำลังวาดอยู่)
+
+        Returns:
+            bool: True ถ้าลบได้
+        """
+        if not self.can_undo():
+            return False
+        live_points = self._live_points if self.strokes.pen_down else None
+        stroke = self.strokes.pop_stroke()
+        if stroke is None:
+            return False
+        serial = self._serials.pop()
+        drawn = self._drawn_points.pop(serial, None)
+        if live_points:
+            drawn = np.array(live_points, dtype=np.float32)
+        self._redo.append((stroke, serial, drawn))
+        self._live_points = []
+        self._tail = []
+        self.prev_position = None
+        # checkpoint ที่มีเส้นนี้อยู่แล้วใช้ไม่ได้อีก
+        while self._checkpoints[-1][0] > self.strokes.stroke_count:
+            self._checkpoints.pop()
+        self._rebuild()
+        return True
+
+    def redo(self):
+        """
+        วาดเส้นที่ undo ไว้ล่าสุดกลับมา (ใช้ได้จนกว่าจะเริ่มวาดเส้นใหม่)
+
+        Returns:
+            bool: True ถ้าวาดกลับได้
+        """
+        if not self._redo:
+            return False
+        stroke, serial, drawn = self._redo.pop()
+        self.strokes.push_stroke(stroke)
+        self._serials.append(serial)
+        if drawn is not None:
+            self._drawn_points[serial] = drawn
+        self._render_stroke(drawn if drawn is not None else stroke[:, :2])
+        self._maybe_checkpoint()
+        return True
+
+    def _rebuild(self):
+        """วาด layer ใหม่จาก checkpoint ล่าสุด แล้ววาดเส้นที่อยู่หลัง checkpoint ซ้ำ"""
+        completed, rect, patch = self._checkpoints[-1]
+        if self.ink_bounds is not None:
+            self.drawing_layer.fill((0, 0, 0, 0), self.ink_bounds)
+            self.dirty_rects.append(self.ink_bounds)
+        self.ink_bounds = None
+        self.version += 1
+        if patch is not None:
+            self.drawing_layer.blit(patch, rect.topleft)
+            self.dirty_rects.append(rect)
+            self.ink_bounds = rect
+        stored = {int(stroke[0, STROKE]): stroke for stroke in self.strokes.strokes_from(completed)}
+        for stroke_id in range(completed, self.strokes.stroke_count):
+            drawn = self._drawn_points.get(self._serials[stroke_id])
+            if drawn is None and stroke_id in stored:
+                drawn = stored[stroke_id][:, :2]
+            if drawn is not None:
+                self._render_stroke(drawn)
+
+    def _render_stroke(self, points):
+        """วาดทั้งเส้นจากจุดที่เก็บไว้ในครั้งเดียว (ใช้ตอน undo/redo)"""
+        points = [(int(x), int(y)) for x, y in points]
+        if len(points) < 2:
+            return
+        if not self.smooth:
+            self._draw(points)
+            return
+        curve = []
+        for i in range(len(points) - 1):
+            p0 = points[i - 1] if i > 0 else points[i]
+            p3 = points[i + 2] if i + 2 < len(points) else points[i + 1]
+            segment = catmull_rom(p0, points[i], points[i + 1], p3)
+            curve.extend(segment if not curve else segment[1:])
+        self._draw(curve)
+
+    def _draw(self, points):
+        if len(points) > 2:
+            rect = pygame.draw.lines(self.drawing_layer, self.color, False, points, LINE_WIDTH)
+        else:
+            rect = pygame.draw.line(self.drawing_layer, self.color, points[0], points[-1], LINE_WIDTH)
+        self.draw_calls += 1
+        self.version += 1
+        self.dirty_rects.append(rect)
+        self.ink_bounds = rect if self.ink_bounds is None else self.ink_bounds.union(rect)
 
-    def update(self, hand_positions):
-        """อัปเดตการวาดเส้นลงใน drawing_layer จากตำแหน่งนิ้วที่ส่งเข้ามา"""
-        # หากมีตำแหน่งนิ้วใหม่
-        if hand_positions:
-            for hand_position in hand_positions:
-                x, y = hand_position
-                # ถ้ามีตำแหน่งก่อนหน้า ให้วาดเส้นจากก่อนหน้ามายังตำแหน่งปัจจุบัน
-                if self.prev_position:
-                    pygame.draw.line(self.drawing_layer, (255, 0, 0), self.prev_position, (x, y), 12)
-                self.prev_position = (x, y)
-                self.positions.append((x, y))
+    def take_dirty_rects(self):
+        """คืนกรอบที่เปลี่ยนตั้งแต่ครั้งก่อน แล้วล้างรายการ"""
+        rects = self.dirty_rects
+        self.dirty_rects = []
+        return rects
 
     def draw_layer(self):
         """คืนค่า surface ที่มีเส้นที่วาดไว้ (layer เส้น)"""
-        return self.drawing_layer
\ No newline at end of file
+        return self.drawing_layer
@@ -0,0 +1,159 @@
+import time
+from contextlib import contextmanager
+
+import pygame
+
+
+class FrameScheduler:
+    """
+    คุมจังหวะของ main loop: render ที่ target_fps และอัปเดต logic ของเกมด้วย timestep คงที่ (logic_dt)
+
+    - begin_frame() คืนจำนวนรอบของ logic ที่ต้องทำในเฟรมนี้ตามเวลาที่ผ่านไปจริง
+      (ถ้าเครื่องช้ามากจะทำไม่เกิน max_catch_up รอบ แล้วทิ้งเวลาที่เหลือ ไม่ให้ loop ไล่ตามไม่ทัน)
+    - steps() คืนลำดับของแต่ละรอบนั้น ให้ main loop วนอัปเดต logic ที่ขึ้นกับเวลา
+      (นับถอยหลัง, เวลาเกม, เช็คความคงที่ของคะแนน) ทีละรอบ ผลจึงไม่ขึ้นกับ fps ของการ render
+    - logic_time_ms คือนาฬิกาของ logic (นับจากจำนวนรอบที่ทำไปแล้ว) ใช้แทน pygame.time.get_ticks()
+    - งานย่อยของเฟรม (ให้คะแนน, ตรวจท่ามือ, วาด HUD ใหม่ ฯลฯ) ลงทะเบียนด้วย add_task() พร้อมอัตราที่ต้องการ
+      และเวลาที่คาดว่าจะใช้ แล้วถาม due() ก่อนทำ: งานจะได้ทำเมื่อถึงรอบและเวลาที่เหลือของเฟรมพอ
+      (เวลาที่ใช้จริงวัดด้วย measure() แล้วเฉลี่ยแทนค่าที่คาดไว้) ส่วนการ render ทำทุกเฟรมเสมอ
+    - end_frame() รอด้วย pygame.time.Clock.tick() จนถึงเวลาของเฟรมถัดไป (ไม่วน loop เปล่าจน CPU เต็ม)
+
+    Args:
+        target_fps: อัตรา render ที่ต้องการ
+        logic_hz: อัตราการอัปเดต logic ของเกม
+        max_catch_up: จำนวนรอบ logic สูงสุดต่อเฟรม
+        cost_smoothing: น้ำหนักของค่าใหม่ใน EMA ของเวลาที่แต่ละงานใช้
+    """
+
+    def __init__(self, target_fps=60, logic_hz=30, max_catch_up=5, cost_smoothing=0.2):
+        self.target_fps = target_fps
+        self.logic_dt = 1.0 / logic_hz
+        self.max_catch_up = max_catch_up
+        self.cost_smoothing = cost_smoothing
+        self.clock = pygame.time.Clock()
+        self.logic_steps = 0
+        self._frame_steps = 0  # จำนวนรอบของ logic ในเฟรมปัจจุบัน
+        self.costs = {}  # EMA ของเวลาที่แต่ละงานใช้ (วินาที)
+        self._accumulator = 0.0
+        self._last_time = None
+        self._frame_start = None
+        self._fps = target_fps
+        self.frames = 0
+        self.missed_frames = 0
+        self.dropped_steps = 0
+        self.skipped = {}
+        self.tasks = {}  # name -> {"period", "max_delay", "last_run"}
+
+    def add_task(self, name, rate, cost=0.0, max_delay=4):
+        """
+        Args:
+            name: ชื่องาน (ใช้กับ due/measure)
+            rate: จำนวนครั้งต่อวินาทีที่ต้องการ
+            cost: เวลาที่คาดว่าจะใช้ต่อครั้ง (วินาที) ใช้จนกว่าจะวัดได้จริง
+            max_delay: ถ้างานถูกเลื่อนนานเกินกี่รอบ ให้ทำแม้เฟรมจะเกินงบ (ไม่ให้งานอดตลอดไป)
+        """
+        self.tasks[name] = {"period": 1.0 / rate, "max_delay": max_delay, "last_run": None}
+        self.costs.setdefault(name, cost)
+
+    def due(self, name):
+        """
+        งาน name ถึงรอบและมีเวลาพอในเฟรมนี้หรือไม่ (ถ้า True จะนับว่างานได้ทำแล้ว)
+        """
+        task = self.tasks[name]
+        now = time.perf_counter()
+        if task["last_run"] is not None:
+            waited = now - task["last_run"]
+            if waited < task["period"]:
+                return False
+            if waited < task["period"] * task["max_delay"] and not self.can_afford(name):
+                return False
+        task["last_run"] = now
+        return True
+
+    @contextmanager
+    def measure(self, name):
+        """วัดเวลาที่งาน name ใช้จริง (with frame_scheduler.measure("scoring"): ...)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    @property
+    def logic_time_ms(self):
+        return self.step_time_ms(self.logic_steps)
+
+    @property
+    def frame_budget(self):
+        return 1.0 / self._fps
+
+    def begin_frame(self):
+        """
+        Returns:
+            int: จำนวนรอบของ logic ที่ต้องทำในเฟรมนี้
+        """
+        now = time.perf_counter()
+        if self._last_time is not None:
+            self._accumulator += now - self._last_time
+        self._last_time = now
+        self._frame_start = now
+
+        steps = int(self._accumulator / self.logic_dt)
+        self._accumulator -= steps * self.logic_dt
+        if steps > self.max_catch_up:
+            self.dropped_steps += steps - self.max_catch_up
+            steps = self.max_catch_up
+        self.logic_steps += steps
+        self._frame_steps = steps
+        return steps
+
+    def steps(self):
+        """
+        ลำดับ (นับจาก 1) ของแต่ละรอบ logic ที่ต้องทำในเฟรมนี้ เรียงจากเก่าไปใหม่
+        (for step in frame_scheduler.steps(): ... เวลาของรอบนั้นคือ step_time_ms(step))
+        """
+        return range(self.logic_steps - self._frame_steps + 1, self.logic_steps + 1)
+
+    def step_time_ms(self, step):
+        """เวลาของ logic (ms) เมื่อจบรอบที่ step"""
+        return int(step * self.logic_dt * 1000)
+
+    def remaining(self):
+        """เวลาที่เหลือของเฟรมนี้ (วินาที, ติดลบถ้าเกินงบแล้ว)"""
+        return self.frame_budget - (time.perf_counter() - self._frame_start)
+
+    def can_afford(self, name):
+        """
+        งาน name ทำในเฟรมนี้ได้โดยไม่เกินงบหรือไม่ (ใช้เวลาที่วัดด้วย measure/record)
+        ถ้าไม่ได้จะนับเป็นงานที่ถูกข้าม
+        """
+        if self.remaining() >= self.costs.get(name, 0.0):
+            return True
+        self.skipped[name] = self.skipped.get(name, 0) + 1
+        return False
+
+    def record(self, name, seconds):
+        previous = self.costs.get(name)
+        self.costs[name] = seconds if previous is None else \
+            previous + self.cost_smoothing * (seconds - previous)
+
+    def end_frame(self, fps=None):
+        """
+        รอจนถึงเวลาของเฟรมถัดไป (fps=None ใช้ target_fps)
+        เฟรมนี้นับว่าเกินงบเทียบกับงบที่ใช้ตลอดเฟรม (fps ของเฟรมก่อน) ส่วน fps ใหม่มีผลกับเฟรมถัดไป
+        """
+        self.frames += 1
+        if time.perf_counter() - self._frame_start > self.frame_budget:
+            self.missed_frames += 1
+        self._fps = fps or self.target_fps
+        self.clock.tick(self._fps)
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "fps": self.clock.get_fps(),
+            "missed_frames": self.missed_frames,
+            "dropped_steps": self.dropped_steps,
+            "skipped": dict(self.skipped),
+            "costs_ms": {name: 1000 * cost for name, cost in self.costs.items()},
+        }
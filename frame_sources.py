@@ -0,0 +1,305 @@
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from landmark_provider import LandmarkFrame
+
+
+class FramePacer:
+    """
+    ควบคุมจังหวะการปล่อยเฟรมตาม timestamp ของไฟล์ที่บันทึกไว้
+
+    realtime=True จะรอให้ถึงเวลาจริงของแต่ละเฟรม (เหมือนเล่นซ้ำตามเวลาจริง)
+    realtime=False จะปล่อยเฟรมเร็วที่สุดเท่าที่ทำได้
+    """
+
+    def __init__(self, realtime=True, speed=1.0):
+        self.realtime = realtime
+        self.speed = speed
+        self._start_wall = None
+        self._start_media = None
+
+    def reset(self):
+        self._start_wall = None
+        self._start_media = None
+
+    def wait(self, media_timestamp):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._start_wall is None:
+            self._start_wall = now
+            self._start_media = media_timestamp
+            return
+        target = self._start_wall + (media_timestamp - self._start_media) / self.speed
+        delay = target - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FrameSource:
+    """
+    แหล่งภาพสำหรับ HandTracking
+
+    read() คืนค่า (ok, frame, timestamp) โดย frame เป็นภาพ BGR และ timestamp เป็นวินาที
+    แหล่งที่มี provides_landmarks = True จะใช้ read_landmarks() แทนและข้ามการทำ inference
+    """
+
+    provides_landmarks = False
+    mirror = False  # ต้องพลิกภาพให้เหมือนกระจกหรือไม่
+
+    def __init__(self):
+        self.finished = False  # True เมื่อไฟล์เล่นจบแล้ว (กล้องจะไม่มีวันจบ)
+
+    def frame_size(self):
+        """คืนค่าขนาด (width, height) ของภาพ"""
+        raise NotImplementedError
+
+    def read(self):
+        raise NotImplementedError
+
+    def read_landmarks(self):
+        raise NotImplementedError
+
+    def reopen(self):
+        """
+        พยายามเปิดแหล่งภาพใหม่หลังจากอ่านไม่สำเร็จติดกันหลายครั้ง
+
+        Returns:
+            bool: True ถ้าเปิดใหม่สำเร็จ
+        """
+        return False
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """
+    ภาพสดจากกล้อง
+
+    Args:
+        index: index ของกล้อง
+        profile: CaptureProfile ที่ใช้ตั้งค่ากล้อง (None = ใช้ค่าเริ่มต้นของ driver)
+    """
+
+    mirror = True
+    EXPOSURE_SETTLE_FRAMES = 10  # จำนวนเฟรมที่รอให้กล้องปรับแสงก่อนล็อก exposure
+
+    def __init__(self, index=0, profile=None):
+        super().__init__()
+        self.index = index
+        self.profile = profile
+        self.cap = None
+        self._open()
+
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.index)
+        if self.profile is not None:
+            self.profile.apply(self.cap)
+        self._frames_read = 0
+        return self.cap.isOpened()
+
+    def frame_size(self):
+        return (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    def read(self):
+        ret, frame = self.cap.read()
+        timestamp = time.perf_counter()
+        if ret and self.profile is not None and self._frames_read < self.EXPOSURE_SETTLE_FRAMES:
+            self._frames_read += 1
+            if self._frames_read == self.EXPOSURE_SETTLE_FRAMES:
+                self.profile.lock_current_exposure(self.cap)
+        return ret, frame, timestamp
+
+    def reopen(self):
+        """ปิดแล้วเปิดกล้องใหม่ (เช่น เมื่อสายหลุดหรือกล้องถูกโปรแกรมอื่นใช้อยู่)"""
+        self.cap.release()
+        return self._open()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """
+    ภาพจากไฟล์วิดีโอ
+
+    Args:
+        path: ที่อยู่ไฟล์วิดีโอ
+        realtime: เล่นตามเวลาจริงของวิดีโอ หรือเร็วที่สุดเท่าที่ทำได้
+        loop: เล่นวนเมื่อจบไฟล์
+        mirror: พลิกภาพเหมือนกระจก (ใช้เมื่อวิดีโอถูกบันทึกจากกล้องโดยตรง)
+    """
+
+    def __init__(self, path, realtime=True, loop=False, mirror=False):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.mirror = mirror
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video file {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.pacer = FramePacer(realtime)
+        self._frame_index = 0
+        self._time_offset = 0.0
+
+    def frame_size(self):
+        return (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop and self._frame_index > 0:
+            # เริ่มไฟล์ใหม่แต่ให้เวลายังเดินต่อ
+            self._time_offset += self._frame_index / self.fps
+            self._frame_index = 0
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            self.finished = True
+            return False, None, None
+
+        timestamp = self._time_offset + self._frame_index / self.fps
+        self._frame_index += 1
+        self.pacer.wait(timestamp)
+        return True, frame, timestamp
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """
+    ภาพจากไฟล์รูปภาพหลายไฟล์ เรียงตามชื่อไฟล์
+
+    Args:
+        pattern: glob pattern เช่น "recordings/session1/*.png" หรือโฟลเดอร์
+        fps: อัตราเฟรมที่ใช้กำหนด timestamp ของแต่ละภาพ
+    """
+
+    def __init__(self, pattern, fps=30.0, realtime=True, loop=False, mirror=False):
+        super().__init__()
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*")
+        extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff')
+        self.paths = sorted(p for p in glob.glob(pattern) if p.lower().endswith(extensions))
+        if not self.paths:
+            raise IOError(f"No images found for {pattern}")
+        self.fps = fps
+        self.loop = loop
+        self.mirror = mirror
+        self.pacer = FramePacer(realtime)
+        self._index = 0
+        self._size = None
+
+    def frame_size(self):
+        if self._size is None:
+            first = cv2.imread(self.paths[0])
+            self._size = (first.shape[1], first.shape[0])
+        return self._size
+
+    def read(self):
+        if self._index >= len(self.paths):
+            if not self.loop:
+                self.finished = True
+                return False, None, None
+        frame = cv2.imread(self.paths[self._index % len(self.paths)])
+        timestamp = self._index / self.fps
+        self._index += 1
+        if frame is None:
+            return False, None, timestamp
+        self.pacer.wait(timestamp)
+        return True, frame, timestamp
+
+
+class LandmarkReplaySource(FrameSource):
+    """
+    เล่นซ้ำพิกัดมือที่บันทึกไว้ (ไฟล์ .npz จาก LandmarkRecorder) โดยไม่ต้องทำ inference
+    """
+
+    provides_landmarks = True
+
+    def __init__(self, path, realtime=True, loop=False):
+        super().__init__()
+        data = np.load(path, allow_pickle=False)
+        self.timestamps = data["timestamps"]
+        self.hand_counts = data["hand_counts"]
+        self.landmarks = data["landmarks"]
+        self._size = tuple(int(v) for v in data["frame_size"])
+        self.loop = loop
+        self.pacer = FramePacer(realtime)
+        self._index = 0
+        self._time_offset = 0.0
+        # คาบเฉลี่ยของเฟรมที่บันทึกไว้ ใช้เป็นช่วงห่างระหว่างเฟรมสุดท้ายกับเฟรมแรกของรอบถัดไปตอน loop
+        if len(self.timestamps) > 1:
+            self.frame_period = float(self.timestamps[-1] - self.timestamps[0]) / (len(self.timestamps) - 1)
+        else:
+            self.frame_period = 1.0 / 30
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def frame_size(self):
+        return self._size
+
+    def read_landmarks(self):
+        """
+        Returns:
+            tuple: (ok, LandmarkFrame)
+        """
+        if self._index >= len(self.timestamps):
+            if not self.loop or len(self.timestamps) == 0:
+                self.finished = True
+                return False, None
+            self._time_offset += float(self.timestamps[-1] - self.timestamps[0]) + self.frame_period
+            self._index = 0
+
+        i = self._index
+        self._index += 1
+        timestamp = self._time_offset + float(self.timestamps[i] - self.timestamps[0])
+        hands = [self.landmarks[i, h] for h in range(int(self.hand_counts[i]))]
+        self.pacer.wait(timestamp)
+        return True, LandmarkFrame(hands, self._size, timestamp)
+
+
+class LandmarkRecorder:
+    """
+    บันทึก LandmarkFrame จาก provider เพื่อใช้กับ LandmarkReplaySource ภายหลัง
+
+    ใช้เป็น callback ของ provider.subscribe() ได้โดยตรง
+    """
+
+    def __init__(self, max_num_hands=2):
+        self.max_num_hands = max_num_hands
+        self.frame_size = None
+        self._timestamps = []
+        self._hand_counts = []
+        self._landmarks = []
+
+    def __call__(self, landmark_frame):
+        self.frame_size = landmark_frame.frame_size
+        hands = np.zeros((self.max_num_hands, 21, 3), dtype=np.float32)
+        count = min(len(landmark_frame.hands), self.max_num_hands)
+        for h in range(count):
+            hands[h] = landmark_frame.hands[h]
+        self._timestamps.append(landmark_frame.timestamp)
+        self._hand_counts.append(count)
+        self._landmarks.append(hands)
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            timestamps=np.array(self._timestamps, dtype=np.float64),
+            hand_counts=np.array(self._hand_counts, dtype=np.int8),
+            landmarks=np.array(self._landmarks, dtype=np.float32).reshape(-1, self.max_num_hands, 21, 3),
+            frame_size=np.array(self.frame_size or (0, 0), dtype=np.int32)
+        )
@@ -1,83 +1,91 @@
-import mediapipe as mp
 import time
 
+from gesture_engine import GestureEngine, GestureRule
+from landmark_provider import draw_hand_landmarks, get_shared_provider
+
+# ชื่อท่าใน GESTURE_PATTERNS -> ชื่อที่เก็บใน last_gesture
+GESTURE_NAMES = {"rock": "rock", "fist": "fist", "open_palm": "palm"}
+
+
 class HandGest:
-    def __init__(self):
-        self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
+    def __init__(self, provider=None):
+        # รับพิกัดมือจาก provider ตัวกลางแทนการใช้ MediaPipe เอง
+        self.provider = provider or get_shared_provider()
+        self.subscription = self.provider.subscribe()
         self.game_running = True  # สถานะของเกม
         self.paused = False  # สถานะ Pause
         self.last_gesture = None  # Gesture ล่าสุด
-        self.last_gesture_time = time.time()  # เวลา Gesture ล่าสุด
+        self.last_gesture_time = time.perf_counter()  # เวลา Gesture ล่าสุด
+        self.debounce = 1.0  # ป้องกัน Gesture ซ้อนกันภายใน 1 วินาที (นับจาก Gesture ที่ใช้ได้ล่าสุดเท่านั้น)
 
-    def _is_finger_up(self, tip, pip):
-        """ ตรวจสอบว่านิ้วชูขึ้นหรือไม่ """
-        return tip.y < pip.y
-
-    def _is_finger_down(self, tip, pip):
-        """ ตรวจสอบว่านิ้วงอลงหรือไม่ """
-        return tip.y > pip.y
+        # ตัดสินจากเฟรมล่าสุดในช่วงสั้นๆ engine บอกแค่ว่าท่าไหนกำลังทำค้างอยู่ (active)
+        # ส่วนการกันซ้อนและการข้ามท่าซ้ำทำใน _handle เพื่อไม่ให้ท่าซ้ำกินช่วงกันซ้อนของท่าอื่น
+        self.engine = GestureEngine(
+            [GestureRule.from_pattern(name, min_confidence=0.8, window=0.1, cooldown=0.0)
+             for name in GESTURE_NAMES])
 
     def is_rock_hand(self, landmarks):
         """ ตรวจจับ Rock (🤘) """
-        if not landmarks:
+        if landmarks is None or len(landmarks) < 21:
             return False
-
-        return (
-            self._is_finger_up(landmarks[8], landmarks[6]) and  # นิ้วชี้ขึ้น
-            self._is_finger_up(landmarks[20], landmarks[18]) and  # นิ้วก้อยขึ้น
-            self._is_finger_down(landmarks[12], landmarks[10]) and  # นิ้วกลางงอลง
-            self._is_finger_down(landmarks[16], landmarks[14])  # นิ้วนางงอลง
-        )
+        return self.engine.matches("rock", landmarks)
 
     def is_fist(self, landmarks):
         """ ตรวจจับ กำมือ (👊) """
-        if not landmarks:
+        if landmarks is None or len(landmarks) < 21:
             return False
-
-        return all(
-            self._is_finger_down(landmarks[i], landmarks[i - 2])
-            for i in [8, 12, 16, 20]
-        )
+        return self.engine.matches("fist", landmarks)
 
     def is_open_palm(self, landmarks):
         """ ตรวจจับ ชูฝ่ามือ (✋) """
-        if not landmarks:
+        if landmarks is None or len(landmarks) < 21:
             return False
+        return self.engine.matches("open_palm", landmarks)
 
-        return all(
-            self._is_finger_up(landmarks[i], landmarks[i - 2])
-            for i in [8, 12, 16, 20]
-        )
+    def update(self):
+        """ ดึงพิกัดมือใหม่จาก provider แล้วเช็ค Gesture """
+        landmark_frame = self.subscription.poll()
+        if landmark_frame is not None:
+            self.engine.update(landmark_frame)
+            self._handle(landmark_frame.timestamp)
 
     def process_gesture(self, landmarks):
-        """ เช็ค Gesture และเปลี่ยนสถานะเกม """
-        current_time = time.time()
-        if current_time - self.last_gesture_time < 1:  # ป้องกัน Gesture ซ้อนกัน
-            return
+        """ เช็ค Gesture และเปลี่ยนสถานะเกม (landmarks เป็นพิกัด normalized ขนาด (21, 3)) """
+        if landmarks is None or len(landmarks) < 21:
+            landmarks = None
+        current_time = time.perf_counter()
+        self.engine.update_hand(landmarks, current_time)
+        self._handle(current_time)
 
-        if self.is_rock_hand(landmarks):
-            if self.last_gesture != "rock":
+    def _handle(self, timestamp):
+        """
+        ใช้ท่าแรก (ตามลำดับใน GESTURE_NAMES) ที่กำลังทำค้างอยู่ ถ้าเป็นท่าเดิมจะไม่ทำอะไร
+        และไม่เริ่มช่วงกันซ้อนใหม่ ท่าอื่นที่ทำต่อทันทีจึงยังใช้ได้เมื่อพ้น 1 วินาทีจากท่าที่ใช้ได้ล่าสุด
+        """
+        if timestamp - self.last_gesture_time < self.debounce:
+            return
+        for name, active in zip(GESTURE_NAMES, self.engine.active):
+            if not active:
+                continue
+            gesture = GESTURE_NAMES[name]
+            if gesture == self.last_gesture:
+                return
+            if gesture == "rock":
                 print("🤘 Rock Gesture - Playing")
                 self.paused = False
-                self.last_gesture = "rock"
-                self.last_gesture_time = current_time
-
-        elif self.is_fist(landmarks):
-            if self.last_gesture != "fist":
+            elif gesture == "fist":
                 print("👊 Fist Gesture - Paused")
                 self.paused = True
-                self.last_gesture = "fist"
-                self.last_gesture_time = current_time
-
-        elif self.is_open_palm(landmarks):
-            if self.last_gesture != "palm":
+            elif gesture == "palm":
                 print("✋ Open Palm - Quitting")
                 self.game_running = False
-                self.last_gesture = "palm"
-                self.last_gesture_time = current_time
+            self.last_gesture = gesture
+            self.last_gesture_time = timestamp
+            return
 
     def draw_landmarks(self, frame, landmarks):
-        """ วาดจุดเชื่อมนิ้ว """
-        if landmarks:
-            self.mp_drawing.draw_landmarks(frame, landmarks, self.mp_hands.HAND_CONNECTIONS)
\ No newline at end of file
+        """ วาดจุดเชื่อมนิ้ว (landmarks เป็นพิกัด normalized ขนาด (21, 3)) """
+        if landmarks is not None and len(landmarks):
+            h, w = frame.shape[:2]
+            points = [tuple(p) for p in (landmarks[:, :2] * (w, h)).astype(int).tolist()]
+            draw_hand_landmarks(frame, points)
@@ -0,0 +1,191 @@
+"""
+ตัวตรวจจับท่ามือแบบกำหนดด้วยกฎ (ไม่ต้องเขียนโค้ดใหม่ต่อท่า)
+
+ท่ามือแต่ละท่าคือรูปแบบของนิ้วทั้งห้า (เหยียด / งอ / ไม่สนใจ) ใน GESTURE_PATTERNS
+สถานะนิ้ว (จากมุมงอของข้อ ดู hand_features.py) ถูกคำนวณครั้งเดียวต่อเฟรม แล้วเทียบกับทุกกฎพร้อมกันด้วย numpy
+การตัดสินใจใช้ประวัติใน ring buffer ที่อิงเวลา (วินาที) ไม่ใช่จำนวนเฟรม
+ผลจึงไม่เปลี่ยนตาม frame rate ของเกม
+"""
+import numpy as np
+
+from hand_features import FINGER_NAMES, hand_features
+
+# True = เหยียด, False = งอ, นิ้วที่ไม่ระบุ = ไม่สนใจ
+GESTURE_PATTERNS = {
+    "rock": {"thumb": False, "index": True, "middle": False, "ring": False, "pinky": True},
+    "fist": {"index": False, "middle": False, "ring": False, "pinky": False},
+    "open_palm": {"index": True, "middle": True, "ring": True, "pinky": True},
+}
+
+
+def finger_states(hands, aspect=1.0):
+    """
+    Returns:
+        numpy.ndarray: bool ขนาด (จำนวนมือ, 5) ว่านิ้วเหยียดหรือไม่ เรียงตาม FINGER_NAMES
+    """
+    return hand_features(hands, aspect).extended
+
+
+class GestureRule:
+    """
+    กฎของท่ามือหนึ่งท่า
+
+    Args:
+        name: ชื่อท่า
+        fingers: dict ชื่อนิ้ว -> True (เหยียด) / False (งอ) นิ้วที่ไม่ระบุจะไม่ถูกตรวจ
+        min_confidence: สัดส่วนของเฟรมในช่วง window ที่ต้องตรงกับท่าจึงจะ trigger
+        window: ความยาวของประวัติที่ใช้ตัดสินใจ (วินาที)
+        cooldown: เวลาขั้นต่ำระหว่างการ trigger ท่านี้สองครั้ง (วินาที)
+        release_confidence: ท่าจะ trigger ซ้ำได้เมื่อความมั่นใจลดต่ำกว่าค่านี้ก่อน (hysteresis)
+    """
+
+    def __init__(self, name, fingers, min_confidence=0.85, window=0.2, cooldown=1.0,
+                 release_confidence=0.5):
+        unknown = set(fingers) - set(FINGER_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown fingers in gesture {name}: {sorted(unknown)}")
+        self.name = name
+        self.fingers = dict(fingers)
+        self.min_confidence = min_confidence
+        self.window = window
+        self.cooldown = cooldown
+        self.release_confidence = release_confidence
+
+    @classmethod
+    def from_pattern(cls, name, **kwargs):
+        """สร้างกฎจากรูปแบบนิ้วใน GESTURE_PATTERNS"""
+        return cls(name, GESTURE_PATTERNS[name], **kwargs)
+
+    def pattern(self):
+        """
+        Returns:
+            tuple: (สถานะที่ต้องการ, mask ของนิ้วที่ต้องตรวจ) เป็น bool array ขนาด (5,)
+        """
+        required = np.array([bool(self.fingers.get(name, False)) for name in FINGER_NAMES])
+        mask = np.array([name in self.fingers for name in FINGER_NAMES])
+        return required, mask
+
+
+class GestureEngine:
+    """
+    ตรวจจับท่ามือหลายท่าพร้อมกันจาก LandmarkFrame
+
+    Args:
+        rules: list ของ GestureRule (ลำดับในนี้คือลำดับความสำคัญเมื่อหลายท่า trigger พร้อมกัน)
+        capacity: จำนวนเฟรมสูงสุดใน ring buffer (ต้องพอสำหรับ window ที่ยาวที่สุดที่ fps สูงสุด)
+        debounce: เวลาขั้นต่ำระหว่างการ trigger ของท่าใดๆ (วินาที, 0 = ไม่จำกัด)
+        hand_index: ลำดับของมือที่ใช้ตรวจ
+    """
+
+    def __init__(self, rules, capacity=64, debounce=0.0, hand_index=0):
+        self.capacity = capacity
+        self.debounce = debounce
+        self.hand_index = hand_index
+        self.set_rules(rules)
+
+    def set_rules(self, rules):
+        """เปลี่ยนชุดกฎ (ล้างประวัติทั้งหมด)"""
+        self.rules = list(rules)
+        patterns = [rule.pattern() for rule in self.rules]
+        self._required = np.array([required for required, _ in patterns], dtype=bool).reshape(-1, 5)
+        self._mask = np.array([mask for _, mask in patterns], dtype=bool).reshape(-1, 5)
+        self._windows = np.array([rule.window for rule in self.rules], dtype=np.float64)
+        self._min_confidence = np.array([rule.min_confidence for rule in self.rules])
+        self._release_confidence = np.array([rule.release_confidence for rule in self.rules])
+        self._cooldowns = np.array([rule.cooldown for rule in self.rules], dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        count = len(self.rules)
+        self._timestamps = np.full(self.capacity, -np.inf)
+        self._matches = np.zeros((self.capacity, count), dtype=bool)
+        self._index = 0
+        self.active = np.zeros(count, dtype=bool)
+        self.confidence = np.zeros(count)
+        self._last_trigger = np.full(count, -np.inf)
+        self._last_any_trigger = -np.inf
+
+    def classify(self, states):
+        """
+        Args:
+            states: สถานะนิ้ว bool ขนาด (5,) จาก finger_states
+
+        Returns:
+            numpy.ndarray: bool ขนาด (จำนวนกฎ,) ว่าตรงกับกฎไหนบ้าง
+        """
+        return np.all((self._required == states) | ~self._mask, axis=1)
+
+    def update(self, landmark_frame):
+        """
+        ส่งผลการตรวจจับมือหนึ่งเฟรมเข้า engine (เฟรมที่ไม่เจอมือนับว่าไม่ตรงกับท่าไหนเลย)
+
+        Returns:
+            list: ชื่อท่าที่ trigger ในเฟรมนี้
+        """
+        features = landmark_frame.features
+        if len(features) > self.hand_index:
+            matches = self.classify(features.extended[self.hand_index])
+        else:
+            matches = np.zeros(len(self.rules), dtype=bool)
+        return self.push(matches, landmark_frame.timestamp)
+
+    def update_hand(self, hand, timestamp):
+        """
+        เหมือน update แต่รับพิกัดมือ (21, 2+) โดยตรง (None = ไม่เจอมือ)
+        พิกัด normalized จะถูกคิดเหมือนภาพสี่เหลี่ยมจัตุรัส ถ้ามี LandmarkFrame ให้ใช้ update แทน
+        """
+        if hand is None:
+            matches = np.zeros(len(self.rules), dtype=bool)
+        else:
+            matches = self.classify(finger_states(hand)[0])
+        return self.push(matches, timestamp)
+
+    def push(self, matches, timestamp):
+        """
+        บันทึกผลการเทียบกฎของเฟรมหนึ่งลง ring buffer แล้วตัดสินใจ trigger / release
+
+        Returns:
+            list: ชื่อท่าที่ trigger ในเฟรมนี้
+        """
+        self._timestamps[self._index] = timestamp
+        self._matches[self._index] = matches
+        self._index = (self._index + 1) % self.capacity
+
+        # เฟรมที่อยู่ในช่วง window ของแต่ละกฎ (capacity, จำนวนกฎ)
+        age = timestamp - self._timestamps
+        in_window = (age[:, np.newaxis] <= self._windows) & (age[:, np.newaxis] >= 0)
+        counts = in_window.sum(axis=0)
+        hits = (in_window & self._matches).sum(axis=0)
+        self.confidence = hits / np.maximum(counts, 1)
+        # ต้องมีประวัติยาวอย่างน้อยครึ่งหนึ่งของ window ก่อนจึงจะตัดสินใจ (กันการ trigger จากเฟรมเดียว)
+        span = np.where(in_window, age[:, np.newaxis], 0.0).max(axis=0)
+        ready = span >= self._windows * 0.5
+
+        self.active &= self.confidence >= self._release_confidence
+        candidates = (ready & ~self.active & (self.confidence >= self._min_confidence)
+                      & (timestamp - self._last_trigger >= self._cooldowns))
+        if not candidates.any() or timestamp - self._last_any_trigger < self.debounce:
+            return []
+
+        indices = np.flatnonzero(candidates)
+        if self.debounce > 0:
+            indices = indices[:1]
+        self.active[indices] = True
+        self._last_trigger[indices] = timestamp
+        self._last_any_trigger = timestamp
+        return [self.rules[i].name for i in indices]
+
+    def rule_confidence(self, name):
+        """ความมั่นใจล่าสุดของท่าที่ระบุ (0-1)"""
+        for i, rule in enumerate(self.rules):
+            if rule.name == name:
+                return float(self.confidence[i])
+        raise KeyError(name)
+
+    def matches(self, name, hand):
+        """เช็คว่ามือนี้ตรงกับท่าที่ระบุหรือไม่ (เฉพาะเฟรมเดียว ไม่ใช้ประวัติ)"""
+        result = self.classify(finger_states(hand)[0])
+        for i, rule in enumerate(self.rules):
+            if rule.name == name:
+                return bool(result[i])
+        raise KeyError(name)
@@ -0,0 +1,172 @@
+"""
+วัดความแม่นยำของการตรวจจับท่ามือจากพิกัดมือที่บันทึกไว้และติดป้ายกำกับแล้ว
+
+บันทึกพิกัดด้วย `python benchmark.py --record recordings/rock_01.npz` แล้วเขียนไฟล์ป้ายกำกับ
+ชื่อเดียวกันแต่ลงท้ายด้วย .labels.json ระบุช่วงเวลา (วินาทีนับจากเฟรมแรก) ที่ทำท่าจริง:
+
+    [{"gesture": "rock", "start": 3.2, "end": 5.0}]
+
+ช่วงเวลาที่ไม่ได้ระบุถือว่าไม่ได้ทำท่านั้น ท่าที่ trigger นอกช่วงจึงนับเป็น false trigger
+
+    python gesture_eval.py recordings/*.npz
+    python gesture_eval.py recordings/*.npz --history 3 5 8 --confidence 0.7 0.85 0.95
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from frame_sources import LandmarkReplaySource
+from gesture_engine import GESTURE_PATTERNS
+from gestures import HandGesture
+
+DEFAULT_HISTORY = [3, 5, 8, 12]
+DEFAULT_CONFIDENCE = [0.7, 0.8, 0.85, 0.95]
+
+
+def labels_path(recording_path):
+    return os.path.splitext(recording_path)[0] + ".labels.json"
+
+
+def load_recording(path, gesture="rock"):
+    """
+    Returns:
+        tuple: (list ของ LandmarkFrame, list ของช่วงเวลา (start, end) ที่ทำท่า gesture)
+    """
+    source = LandmarkReplaySource(path, realtime=False)
+    frames = []
+    while not source.finished:
+        ret, landmark_frame = source.read_landmarks()
+        if ret:
+            frames.append(landmark_frame)
+
+    intervals = []
+    if os.path.exists(labels_path(path)):
+        with open(labels_path(path)) as f:
+            intervals = [(float(label["start"]), float(label["end"]))
+                         for label in json.load(f) if label["gesture"] == gesture]
+    else:
+        print(f"No labels for {path}, every trigger counts as false")
+    return frames, intervals
+
+
+def evaluate(recordings, history_length, min_gesture_confidence, gesture="rock"):
+    """
+    เล่นทุก recording ผ่าน engine แบบเดียวกับของ HandGesture ที่มีกฎของท่า gesture ด้วยค่าที่กำหนด
+
+    Args:
+        recordings: list ของ (frames, intervals) จาก load_recording
+
+    Returns:
+        dict: precision, recall, false trigger ต่อนาที, latency (ms) และเวลาที่ใช้ต่อเฟรม (ms)
+    """
+    true_triggers = 0
+    false_triggers = 0
+    detected = 0
+    total_intervals = 0
+    latencies = []
+    frame_count = 0
+    duration = 0.0
+    cost = 0.0
+
+    for frames, intervals in recordings:
+        engine = HandGesture.build_engine(history_length, min_gesture_confidence, gesture=gesture)
+        hit = [False] * len(intervals)
+        total_intervals += len(intervals)
+        if frames:
+            duration += frames[-1].timestamp - frames[0].timestamp
+
+        for landmark_frame in frames:
+            # ล้างค่า features ที่ cache ไว้ เพื่อให้เวลาที่วัดรวมการคำนวณ features ด้วย
+            landmark_frame._features = None
+            start = time.perf_counter()
+            triggered = engine.update(landmark_frame)
+            cost += time.perf_counter() - start
+            frame_count += 1
+            if gesture not in triggered:
+                continue
+
+            t = landmark_frame.timestamp
+            inside = [i for i, (begin, end) in enumerate(intervals) if begin <= t <= end]
+            if not inside:
+                false_triggers += 1
+                continue
+            true_triggers += 1
+            i = inside[0]
+            if not hit[i]:
+                hit[i] = True
+                detected += 1
+                latencies.append((t - intervals[i][0]) * 1000)
+
+    triggers = true_triggers + false_triggers
+    return {
+        "history_length": history_length,
+        "min_gesture_confidence": min_gesture_confidence,
+        "precision": true_triggers / triggers if triggers else float("nan"),
+        "recall": detected / total_intervals if total_intervals else float("nan"),
+        "false_per_min": false_triggers / (duration / 60) if duration > 0 else 0.0,
+        "latency_ms": float(np.mean(latencies)) if latencies else float("nan"),
+        "frame_us": 1e6 * cost / frame_count if frame_count else 0.0,
+    }
+
+
+_worker_recordings = None
+
+
+def _init_worker(paths, gesture):
+    global _worker_recordings
+    _worker_recordings = [load_recording(path, gesture) for path in paths]
+
+
+def _evaluate_in_worker(args):
+    history_length, min_gesture_confidence, gesture = args
+    return evaluate(_worker_recordings, history_length, min_gesture_confidence, gesture)
+
+
+def sweep(paths, history_lengths=DEFAULT_HISTORY, confidences=DEFAULT_CONFIDENCE, gesture="rock",
+          workers=None):
+    """
+    ลองทุกคู่ของ history_length / min_gesture_confidence พร้อมกันหลาย process
+
+    Returns:
+        list: ผลของ evaluate สำหรับทุกคู่ เรียงตาม precision แล้ว recall
+    """
+    grid = [(h, c, gesture) for h in history_lengths for c in confidences]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(paths, gesture)) as executor:
+        rows = list(executor.map(_evaluate_in_worker, grid))
+    return sorted(rows, key=lambda r: (np.nan_to_num(r["precision"]), np.nan_to_num(r["recall"])),
+                  reverse=True)
+
+
+def print_table(rows):
+    print("--- GESTURE TUNING ---")
+    print(f"{'history':>7} {'conf':>5} {'precision':>9} {'recall':>7} {'false/min':>9} "
+          f"{'latency ms':>10} {'us/frame':>8}")
+    for row in rows:
+        print(f"{row['history_length']:>7} {row['min_gesture_confidence']:>5.2f} {row['precision']:>9.2f} "
+              f"{row['recall']:>7.2f} {row['false_per_min']:>9.2f} {row['latency_ms']:>10.0f} "
+              f"{row['frame_us']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate gesture recognition on labelled recordings")
+    parser.add_argument("recordings", nargs="+", help="ไฟล์ .npz (หรือ glob pattern)")
+    parser.add_argument("--gesture", default="rock", choices=sorted(GESTURE_PATTERNS))
+    parser.add_argument("--history", type=int, nargs="+", default=DEFAULT_HISTORY)
+    parser.add_argument("--confidence", type=float, nargs="+", default=DEFAULT_CONFIDENCE)
+    parser.add_argument("--workers", type=int, default=None, help="จำนวน process (ค่าเริ่มต้น = จำนวน CPU)")
+    args = parser.parse_args()
+
+    paths = sorted({path for pattern in args.recordings for path in glob.glob(pattern)})
+    if not paths:
+        parser.error("no recordings found")
+    print_table(sweep(paths, args.history, args.confidence, args.gesture, args.workers))
+
+
+if __name__ == "__main__":
+    main()
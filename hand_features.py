@@ -0,0 +1,100 @@
+"""
+คุณลักษณะของนิ้วที่ไม่ขึ้นกับการหมุนและขนาดของมือ (ใช้ตัดสินท่ามือ)
+
+พิกัดของมือถูกย้ายให้ข้อมือเป็นจุดกำเนิด หมุนให้แนวข้อมือ → โคนนิ้วกลางชี้ขึ้น
+และย่อให้ความยาวฝ่ามือเท่ากับ 1 จากนั้นวัดมุมงอของข้อนิ้วทั้งห้านิ้วพร้อมกันใน numpy ครั้งเดียว
+"""
+import numpy as np
+
+FINGER_NAMES = ("thumb", "index", "middle", "ring", "pinky")
+WRIST = 0
+INDEX_MCP = 5
+MIDDLE_MCP = 9
+FINGER_TIPS = np.array([4, 8, 12, 16, 20])
+
+# ข้อของแต่ละนิ้วเรียงจากข้อมือถึงปลายนิ้ว (5 นิ้ว x 5 จุด)
+FINGER_CHAINS = np.array([
+    [0, 1, 2, 3, 4],
+    [0, 5, 6, 7, 8],
+    [0, 9, 10, 11, 12],
+    [0, 13, 14, 15, 16],
+    [0, 17, 18, 19, 20],
+])
+
+# นิ้วเหยียดเมื่อผลรวมมุมงอของข้อน้อยกว่าค่านี้ (องศา)
+FINGER_CURL_LIMIT = 80.0
+# นิ้วโป้งวัดเฉพาะข้อ MCP และ IP และปลายนิ้วต้องอยู่ห่างจากโคนนิ้วชี้ (หน่วยความยาวฝ่ามือ)
+THUMB_CURL_LIMIT = 60.0
+THUMB_MIN_SPREAD = 0.6
+
+
+class HandFeatures:
+    """
+    คุณลักษณะของทุกมือในเฟรมหนึ่ง
+
+    Attributes:
+        aligned: พิกัดในกรอบของข้อมือ ขนาด (จำนวนมือ, 21, 2) ฝ่ามือชี้ขึ้น (-y) และยาว 1 หน่วย
+        palm_size: ความยาวฝ่ามือในหน่วยของพิกัดเดิม ขนาด (จำนวนมือ,)
+        joint_angles: มุมงอของข้อแต่ละข้อ (องศา) ขนาด (จำนวนมือ, 5, 3)
+        curl: ผลรวมมุมงอของแต่ละนิ้ว (องศา) ขนาด (จำนวนมือ, 5)
+        extended: นิ้วเหยียดหรือไม่ ขนาด (จำนวนมือ, 5) เรียงตาม FINGER_NAMES
+    """
+
+    def __init__(self, aligned, palm_size, joint_angles, curl, extended):
+        self.aligned = aligned
+        self.palm_size = palm_size
+        self.joint_angles = joint_angles
+        self.curl = curl
+        self.extended = extended
+
+    def __len__(self):
+        return len(self.extended)
+
+
+def hand_features(hands, aspect=1.0):
+    """
+    คำนวณคุณลักษณะของนิ้วสำหรับทุกมือพร้อมกัน
+
+    Args:
+        hands: พิกัดของมือ ขนาด (21, 2+) หรือ (จำนวนมือ, 21, 2+)
+        aspect: width / height ของภาพ ใช้เมื่อพิกัดเป็น normalized เพื่อให้มุมไม่บิด
+            (พิกัด pixel ใช้ 1.0)
+
+    Returns:
+        HandFeatures
+    """
+    points = np.asarray(hands, dtype=np.float32)
+    if points.ndim == 2:
+        points = points[np.newaxis]
+    if len(points) == 0:
+        return HandFeatures(np.zeros((0, 21, 2), np.float32), np.zeros(0, np.float32),
+                            np.zeros((0, 5, 3), np.float32), np.zeros((0, 5), np.float32),
+                            np.zeros((0, 5), bool))
+    points = points[..., :2] * np.array([aspect, 1.0], dtype=np.float32)
+
+    # ย้ายข้อมือไปที่จุดกำเนิด แล้วหมุนและย่อให้ข้อมือ → โคนนิ้วกลางเป็น (0, -1)
+    centered = points - points[:, WRIST:WRIST + 1]
+    palm = centered[:, MIDDLE_MCP]
+    palm_size = np.maximum(np.linalg.norm(palm, axis=1), 1e-6)
+    up = palm / palm_size[:, np.newaxis]
+    # แกน y ใหม่ชี้จากโคนนิ้วกลางไปข้อมือ (ภาพมี y ชี้ลง) แกน x ตั้งฉากกับแกน y
+    rotation = np.stack([np.stack([-up[:, 1], up[:, 0]], axis=1), -up], axis=1)
+    aligned = np.einsum("hij,hnj->hni", rotation, centered) / palm_size[:, np.newaxis, np.newaxis]
+
+    # มุมงอของข้อ = มุมระหว่างกระดูกสองท่อนที่ต่อกัน
+    chains = aligned[:, FINGER_CHAINS]               # (มือ, 5, 5, 2)
+    bones = np.diff(chains, axis=2)                   # (มือ, 5, 4, 2)
+    bones /= np.maximum(np.linalg.norm(bones, axis=3, keepdims=True), 1e-6)
+    cosines = np.sum(bones[:, :, :-1] * bones[:, :, 1:], axis=3)
+    joint_angles = np.degrees(np.arccos(np.clip(cosines, -1.0, 1.0)))  # (มือ, 5, 3)
+
+    curl = joint_angles.sum(axis=2)
+    extended = curl < FINGER_CURL_LIMIT
+
+    # นิ้วโป้ง: ข้อ CMC งอตามธรรมชาติจึงไม่นับ และต้องกางออกจากฝ่ามือ
+    thumb_curl = joint_angles[:, 0, 1:].sum(axis=1)
+    curl[:, 0] = thumb_curl
+    spread = np.linalg.norm(aligned[:, FINGER_TIPS[0]] - aligned[:, INDEX_MCP], axis=1)
+    extended[:, 0] = (thumb_curl < THUMB_CURL_LIMIT) & (spread > THUMB_MIN_SPREAD)
+
+    return HandFeatures(aligned, palm_size, joint_angles, curl, extended)
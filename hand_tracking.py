@@ -1,107 +1,362 @@
 import cv2
-import mediapipe as mp
 import threading
+import time
 import numpy as np
 import pygame
 from collections import deque
 
+from capture_health import CaptureHealth
+from frame_sources import CameraSource
+from inference_process import ProcessHandInference
+from landmark_provider import HAND_CONNECTIONS, INDEX_FINGER_TIP, get_shared_provider
+from motion_gate import MotionGate
+
+# ระดับความต้องการพิกัดมือของเกม
+DEMAND_PAUSED = "paused"    # ไม่ดึงภาพและไม่ทำ inference เลย (เมนู)
+DEMAND_PREVIEW = "preview"  # ดึงภาพและทำ inference ด้วยอัตราต่ำ (นับถอยหลัง, หน้าผลลัพธ์)
+DEMAND_FULL = "full"        # ทำงานเต็มอัตราของกล้อง (ตอนวาด)
+DEMAND_LEVELS = (DEMAND_PAUSED, DEMAND_PREVIEW, DEMAND_FULL)
+
 
 class HandTracking:
-    def __init__(self):
+    def __init__(self, preview_size=(300, 200), provider=None, source=None, threaded=True,
+                 inference="thread", motion_gate=None, preview_fps=10):
         """
         คลาสสำหรับตรวจจับมือและแสดงผลลัพธ์เป็น Pygame Surface
+
+        Args:
+            preview_size: ขนาด (width, height) ของภาพ preview ควรเท่ากับขนาดหน้าจอ
+                เพื่อให้ main thread blit ได้เลยโดยไม่ต้อง scale
+            provider: HandLandmarkProvider ที่ใช้ตรวจจับมือ (ค่าเริ่มต้นคือตัวกลางของเกม)
+            source: FrameSource ที่ใช้ดึงภาพ (ค่าเริ่มต้นคือกล้องตัวแรก)
+            threaded: เริ่ม thread ดึงภาพเอง ถ้า False ผู้เรียกต้องเรียก step() เอง (ใช้ใน benchmark)
+            inference: "thread" = ตรวจจับมือใน thread นี้, "process" = ส่งภาพไปตรวจจับใน process แยก
+                ผ่าน shared memory (ไม่แย่ง GIL กับ render loop)
+            motion_gate: MotionGate สำหรับข้าม inference เมื่อมือไม่ขยับ
+                (ค่าเริ่มต้นปิดไว้ เปิดด้วย set_motion_gate)
+            preview_fps: อัตราเฟรมเมื่อ demand เป็น DEMAND_PREVIEW
         """
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
-        self.mp_drawing = mp.solutions.drawing_utils
+        self.provider = provider or get_shared_provider()
 
-        self.cap = cv2.VideoCapture(0)
+        self.source = source or CameraSource(0)
         self.frame_surface = None
+        self.preview_size = tuple(preview_size)
+
+        # buffer ของ preview จองไว้ครั้งเดียวแล้วใช้ซ้ำ (double buffering)
+        # surface แต่ละอันแชร์หน่วยความจำกับ buffer ของมันผ่าน frombuffer แบบ "BGR"
+        # จึงไม่ต้องแปลงสีและไม่ต้อง copy ทุกเฟรม
+        preview_w, preview_h = self.preview_size
+        self._preview_buffers = [np.zeros((preview_h, preview_w, 3), dtype=np.uint8) for _ in range(2)]
+        self._preview_surfaces = [pygame.image.frombuffer(buf, self.preview_size, "BGR")
+                                  for buf in self._preview_buffers]
+        self._back_index = 0
+        self.preview_version = 0   # เพิ่มขึ้นทุกครั้งที่มีภาพ preview ใหม่
+        self.blitted_version = None  # preview_version ของภาพที่ blit_frame วาดล่าสุด
+        self.frame_lock = threading.Lock()
         self.running = True
+        self._stop_event = threading.Event()  # ใช้ปลุก thread ที่กำลังรอ backoff ตอนปิด
+
+        # ระดับความต้องการจากสถานะของเกม เปลี่ยนด้วย set_demand (ปลุก capture thread ทันที)
+        self.demand = DEMAND_FULL
+        self.preview_fps = preview_fps
+        self._demand_changed = threading.Condition()
+        self._last_step_time = 0.0
+
+        # สถานะของกล้องและตัวนับสถิติ (ok / degraded / lost)
+        self.health = CaptureHealth()
+        self.motion_gate = motion_gate or MotionGate(enabled=False)
         self.hand_positions = []  # เก็บค่าพิกัดของนิ้วที่ตรวจพบ
-        self.smooth_positions = deque(maxlen=5)
+        # ประวัติปลายนิ้วของแต่ละมือ (smooth แยกต่อมือ ไม่เฉลี่ยปนกันเมื่อมีหลายมือ)
+        self.smooth_positions = []
+        self.smooth_match_distance = 0.15  # ระยะสูงสุด (สัดส่วนของด้านยาวของภาพ) ที่ถือว่าเป็นมือเดิม
         
-        # เก็บพิกัดทั้ง 21 จุดของมือ
+        # เก็บพิกัดทั้ง 21 จุดของมือแรก และของทุกมือที่เจอ
         self.all_hand_landmarks = []
+        self.hands_landmarks = []
+        # พิกัด normalized (21, 2) ของทุกมือที่เจอ ใช้วาด overlay ที่ main thread
+        self.landmark_arrays = []
+        self._overlay_font = None
+
+        self.original_width, self.original_height = self.source.frame_size()
+
+        # รับผลการตรวจจับจาก provider (ทั้งจาก thread นี้และจากผู้ใช้ provider คนอื่น)
+        self.subscription = self.provider.subscribe(self._on_landmarks)
+
+        self.inference_worker = None
+        self._worker_dropped_frames = 0  # เฟรมที่ worker ตัวที่ปิดไปแล้วข้าม
+        if inference == "process" and not self.source.provides_landmarks:
+            if self.original_width > 0 and self.original_height > 0:
+                # ผลจาก worker ถูกส่งให้ provider เพื่อกระจายให้ทุก subscriber เหมือนเดิม
+                self.inference_worker = ProcessHandInference(
+                    (self.original_width, self.original_height), self.provider.publish,
+                    settings=self.provider.settings, roi=self.provider.roi,
+                    on_exit=self._on_inference_exit)
+            else:
+                print("Frame size unknown, falling back to in-thread inference")
 
-        self.original_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.original_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # แหล่งที่เป็นพิกัดมือล้วนไม่มีภาพ ให้ใช้ preview สีดำแทน
+        if self.source.provides_landmarks:
+            self.frame_surface = self._preview_surfaces[0]
+            self._back_index = 1
 
-        self.thread = threading.Thread(target=self.capture_hand_tracking, daemon=True)
-        self.thread.start()
+        self.thread = None
+        if threaded:
+            self.thread = threading.Thread(target=self.capture_hand_tracking, daemon=True)
+            self.thread.start()
 
     def capture_hand_tracking(self):
         """
         ดึงภาพจากกล้อง ตรวจจับมือ และบันทึกพิกัดของนิ้ว
+        (thread นี้ทำแค่การตรวจจับ ส่วน overlay สำหรับ debug วาดที่ main thread ด้วย draw_debug_overlay)
+        """
+        while self.running and not self.source.finished:
+            if self._wait_for_demand():
+                self._last_step_time = time.perf_counter()
+                self.step()
+
+    def _wait_for_demand(self):
+        """
+        รอจนกว่าจะถึงเวลาดึงเฟรมถัดไปตาม demand ปัจจุบัน
+
+        Returns:
+            bool: True ถ้าควรดึงเฟรมตอนนี้ (False = demand เปลี่ยนหรือกำลังปิด ให้ตรวจใหม่)
+        """
+        with self._demand_changed:
+            if self.demand == DEMAND_PAUSED:
+                self._demand_changed.wait_for(lambda: self.demand != DEMAND_PAUSED or not self.running)
+                return False
+            if self.demand == DEMAND_PREVIEW:
+                remaining = self._last_step_time + 1 / self.preview_fps - time.perf_counter()
+                if remaining > 0:
+                    self._demand_changed.wait(remaining)
+                    return False
+        return True
+
+    def set_demand(self, level):
+        """
+        กำหนดว่าเกมต้องการพิกัดมือมากแค่ไหน (DEMAND_PAUSED / DEMAND_PREVIEW / DEMAND_FULL)
+        เปลี่ยนเป็น DEMAND_FULL แล้ว capture thread จะดึงเฟรมถัดไปทันทีโดยไม่รอรอบ preview
+        """
+        if level not in DEMAND_LEVELS:
+            raise ValueError(f"Unknown demand level: {level}")
+        with self._demand_changed:
+            if level == self.demand:
+                return
+            self.demand = level
+            if level == DEMAND_PAUSED:
+                self.health.pause()
+            else:
+                self.health.resume()
+            self._demand_changed.notify_all()
+
+    def step(self):
         """
-        while self.running:
-            ret, frame = self.cap.read()
+        ดึงภาพหนึ่งเฟรมจาก source แล้วตรวจจับมือ
+
+        Returns:
+            bool: True ถ้าได้เฟรมใหม่
+        """
+        if self.source.provides_landmarks:
+            # แหล่งที่บันทึกพิกัดไว้แล้ว ส่งให้ provider ได้เลยโดยไม่ต้องทำ inference
+            ret, landmark_frame = self.source.read_landmarks()
             if not ret:
-                continue
-            
+                return False
+            self.health.record_success()
+            self.provider.publish(landmark_frame)
+            return True
+
+        ret, frame, timestamp = self.source.read()
+        if not ret:
+            if not self.source.finished:
+                self._handle_read_failure()
+            return False
+        self.health.record_success()
+
+        if self.source.mirror:
             frame = cv2.flip(frame, 1)  # พลิกภาพเพื่อให้สอดคล้องกับกระจก
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) #BGR -> RGB
-            results = self.hands.process(rgb_frame) #ตรวจจับมือจากภาพที่แปลงแล้ว
-
-            self.hand_positions = []  # เคลียร์ค่าเดิมทุกเฟรม
-            self.all_hand_landmarks = []  # เคลียร์ค่าจุดมือทั้งหมด
-
-            if results.multi_hand_landmarks: #ถ้าเจอมือ
-                for hand_landmarks in results.multi_hand_landmarks:
-                    self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS) #วาดตัวtrackมือ
-
-                    # เก็บพิกัดทั้งหมด 21 จุด 
-                    hand_points = []
-                    h, w, _ = frame.shape
-                    for landmark in hand_landmarks.landmark:
-                        x, y = int(landmark.x * w), int(landmark.y * h)
-                        hand_points.append((x, y))
-                    
-                    # เก็บข้อมูลจุดทั้งหมดของมือ
-                    self.all_hand_landmarks = hand_points
-
-                    # ดึงค่าพิกัดของปลายนิ้วชี้ (landmark 8)
-                    index_finger_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-
-                    # ตรวจสอบว่าอยู่ในช่วง 0-1 (เป็นพิกัดที่ถูกต้อง)
-                    if not (0 <= index_finger_tip.x <= 1 and 0 <= index_finger_tip.y <= 1):
-                        continue  # ข้ามไปถ้าค่าผิดปกติ
-
-                    cx, cy = int(index_finger_tip.x * w), int(index_finger_tip.y * h) #แปลงพิกัดเปนpixel(ให้ตรงกับขนาดจริงบนจอ)
-                    self.smooth_positions.append((cx, cy))
-
-                    # คำนวณ avg ของพิกัด
-                    if len(self.smooth_positions) > 0:
-                        avg_x = int(np.mean([pos[0] for pos in self.smooth_positions]))
-                        avg_y = int(np.mean([pos[1] for pos in self.smooth_positions]))
-                    else:
-                        avg_x, avg_y = cx, cy
-
-                    self.hand_positions.append((avg_x, avg_y))
-
-                    # กรอบสี่เหลี่ยมรอบปลายนิ้วชี้
-                    rect_size = 30
-                    cv2.rectangle(frame, (cx - rect_size, cy - rect_size),
-                                  (cx + rect_size, cy + rect_size), (0, 255, 0), 1)
-
-                    # วาดจุดที่ปลายนิ้วชี้
-                    cv2.circle(frame, (cx, cy), 5, (0, 0, 255), -1)
-
-                    # แสดงพิกัดของปลายนิ้วชี้
-                    cv2.putText(frame, f"({cx}, {cy})", (cx + 20, cy - 20),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-
-            # แปลงภาพ OpenCV เป็น Pygame Surface
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) 
-            frame = cv2.resize(frame, (300, 200))
-            self.frame_surface = pygame.image.frombuffer(frame.tobytes(), frame.shape[1::-1], "RGB")
+        if self.inference_worker is not None and self.inference_worker.exited:
+            self._fall_back_to_thread_inference()
+        previous = self.provider.latest()
+        if not self.motion_gate.should_infer(frame, previous):
+            # มือแทบไม่ขยับ ใช้พิกัดเดิมกับเฟรมนี้แทนการทำ inference
+            self.provider.publish(MotionGate.reuse(previous, timestamp))
+        elif self.inference_worker is not None:
+            # ส่งภาพให้ worker แล้วทำงานต่อทันที ผลลัพธ์จะกลับมาที่ _on_landmarks ผ่าน provider
+            self.inference_worker.submit(frame, timestamp)
+        else:
+            self.provider.process(frame, timestamp) #ตรวจจับมือ ผลลัพธ์จะถูกส่งมาที่ _on_landmarks
+
+        self._publish_preview(frame)
+        return True
+
+    def _handle_read_failure(self):
+        """
+        รอแบบ exponential backoff แทนการวนอ่านทันที (ไม่กิน CPU 100%)
+        และเปิดกล้องใหม่เมื่ออ่านไม่สำเร็จติดกันหลายครั้ง
+        """
+        delay = self.health.record_failure()
+        if self.health.should_reopen():
+            print(f"Camera read failed {self.health.consecutive_failures} times, reopening device...")
+            if self.source.reopen():
+                self.health.record_reconnect()
+                print("Camera reopened")
+        self._stop_event.wait(delay)
+
+    def _on_inference_exit(self, exit_code):
+        """worker ตาย (เรียกบน reader thread ของ worker) step() ถัดไปจะเปลี่ยนไปทำ inference ใน thread นี้"""
+        self.health.record_inference_failure()
+
+    def _fall_back_to_thread_inference(self):
+        """ปิด worker ที่ตายแล้ว แล้วให้ provider ทำ inference ใน thread นี้แทน (ช้ากว่าแต่เกมเล่นต่อได้)"""
+        self._worker_dropped_frames += self.inference_worker.dropped_frames
+        self.inference_worker.close()
+        self.inference_worker = None
+        print("Falling back to in-thread inference")
+
+    def get_health(self):
+        """
+        คืนค่าสถานะของกล้อง (state, since_last_good, good_frames, failed_reads, dropped_frames, reconnects,
+        inference_failures)
+        """
+        dropped_frames = self._worker_dropped_frames
+        if self.inference_worker is not None:
+            dropped_frames += self.inference_worker.dropped_frames
+        return self.health.snapshot(dropped_frames)
+
+    def set_motion_gate(self, enabled):
+        """เปิด/ปิดการข้าม inference เมื่อมือไม่ขยับ (เปิดในหน้าเมนู ปิดตอนวาด)"""
+        self.motion_gate.enabled = enabled
+
+    def get_motion_stats(self):
+        """
+        คืนค่าสถิติของ motion gate (frames, inferred, skipped, forced, skip_rate, last_motion)
+        """
+        return self.motion_gate.stats()
+
+    def _on_landmarks(self, landmark_frame):
+        """
+        รับผลการตรวจจับจาก provider แล้วคำนวณพิกัดปลายนิ้วชี้และพิกัดทั้ง 21 จุด
+        """
+        # สร้างค่าใหม่ทั้งชุดก่อนแล้วค่อยสลับ เพื่อไม่ให้ main thread อ่านเจอข้อมูลครึ่งๆ กลางๆ
+        hand_positions = []
+        hands_landmarks = []
+        landmark_arrays = []
+        smooth_positions = []
+        unmatched = list(self.smooth_positions)
+        w, h = landmark_frame.frame_size
+
+        for hand_index, hand in enumerate(landmark_frame.hands): #ถ้าเจอมือ
+            # เก็บพิกัด normalized (0-1) ทั้ง 21 จุด
+            points = hand[:, :2]
+            landmark_arrays.append(points)
+
+            # เก็บข้อมูลจุดทั้งหมดของแต่ละมือ (พิกัด pixel ของกล้อง)
+            hands_landmarks.append(landmark_frame.pixel_landmarks(hand_index))
+
+            # ดึงค่าพิกัดของปลายนิ้วชี้ (landmark 8)
+            tip_x, tip_y = points[INDEX_FINGER_TIP]
+
+            # ตรวจสอบว่าอยู่ในช่วง 0-1 (เป็นพิกัดที่ถูกต้อง)
+            if not (0 <= tip_x <= 1 and 0 <= tip_y <= 1):
+                continue  # ข้ามไปถ้าค่าผิดปกติ
+
+            cx, cy = int(tip_x * w), int(tip_y * h) #แปลงพิกัดเปนpixel(ให้ตรงกับขนาดจริงบนจอ)
+            history = self._match_history((cx, cy), unmatched, max(w, h) * self.smooth_match_distance)
+            history.append((cx, cy))
+            smooth_positions.append(history)
+
+            # คำนวณ avg ของพิกัด (เฉพาะของมือนี้)
+            avg_x, avg_y = np.mean(history, axis=0).astype(int).tolist()
+            hand_positions.append((avg_x, avg_y))
+
+        self.landmark_arrays = landmark_arrays
+        self.hands_landmarks = hands_landmarks
+        self.all_hand_landmarks = hands_landmarks[0] if hands_landmarks else []
+        self.hand_positions = hand_positions
+        self.smooth_positions = smooth_positions
+
+    @staticmethod
+    def _match_history(position, histories, max_distance):
+        """
+        เลือกประวัติของมือที่ปลายนิ้วล่าสุดอยู่ใกล้ position ที่สุด (ไม่เกิน max_distance) แล้วเอาออกจาก histories
+        ถ้าไม่มีให้เริ่มประวัติใหม่
+        """
+        best, best_distance = None, max_distance
+        for history in histories:
+            last_x, last_y = history[-1]
+            distance = np.hypot(position[0] - last_x, position[1] - last_y)
+            if distance <= best_distance:
+                best, best_distance = history, distance
+        if best is None:
+            return deque(maxlen=5)
+        histories.remove(best)
+        return best
+
+    def _publish_preview(self, frame):
+        """
+        ย่อ/ขยายภาพ BGR ลง back buffer โดยตรงที่ขนาดหน้าจอ แล้วสลับ buffer
+        """
+        back = self._back_index
+        cv2.resize(frame, self.preview_size, dst=self._preview_buffers[back],
+                   interpolation=cv2.INTER_LINEAR)
+        with self.frame_lock:
+            self.frame_surface = self._preview_surfaces[back]
+            self._back_index = 1 - back
+            self.preview_version += 1
 
     def get_frame(self):
         """
         คืนค่าภาพที่ถูกแปลงเป็น Pygame Surface
+        (surface นี้แชร์ buffer กับ capture thread ควรใช้ blit_frame เพื่อกันภาพฉีก)
         """
         return self.frame_surface
 
+    def blit_frame(self, target, position=(0, 0)):
+        """
+        วาดภาพ preview ล่าสุดลงบน target โดยไม่ scale และไม่ copy
+
+        Returns:
+            bool: True ถ้ามีภาพให้วาด
+        """
+        with self.frame_lock:
+            if self.frame_surface is None:
+                return False
+            target.blit(self.frame_surface, position)
+            self.blitted_version = self.preview_version
+            return True
+
+    def draw_debug_overlay(self, target):
+        """
+        วาดเส้นโครงมือ กรอบปลายนิ้วชี้ และพิกัด ลงบน target ที่ความละเอียดของ target
+        เรียกจาก main thread เฉพาะตอนต้องการ debug เท่านั้น
+        """
+        landmark_arrays = self.landmark_arrays
+        if not landmark_arrays:
+            return
+
+        if self._overlay_font is None:
+            self._overlay_font = pygame.font.SysFont("Arial", 16)
+
+        size = target.get_size()
+        tip_index = INDEX_FINGER_TIP
+        for points in landmark_arrays:
+            pixel_points = (points * size).astype(int).tolist()
+
+            # วาดเส้นเชื่อมและจุดของมือ
+            for start, end in HAND_CONNECTIONS:
+                pygame.draw.line(target, (255, 255, 255), pixel_points[start], pixel_points[end], 2)
+            for point in pixel_points:
+                pygame.draw.circle(target, (255, 0, 0), point, 4)
+
+            # กรอบสี่เหลี่ยมรอบปลายนิ้วชี้ และพิกัดของกล้อง
+            cx, cy = pixel_points[tip_index]
+            rect_size = 30
+            pygame.draw.rect(target, (0, 255, 0), (cx - rect_size, cy - rect_size, rect_size * 2, rect_size * 2), 1)
+            cam_x = int(points[tip_index][0] * self.original_width)
+            cam_y = int(points[tip_index][1] * self.original_height)
+            label = self._overlay_font.render(f"({cam_x}, {cam_y})", True, (255, 255, 255))
+            target.blit(label, (cx + 20, cy - 20))
+
     def get_hand_positions(self):
         """
         คืนค่าพิกัดของปลายนิ้วที่ตรวจจับได้
@@ -110,10 +365,32 @@ class HandTracking:
         
     def get_all_hand_landmarks(self): 
         """
-        คืนค่าพิกัดทั้ง 21 จุดของมือที่ตรวจจับได้
+        คืนค่าพิกัดทั้ง 21 จุดของมือแรกที่ตรวจจับได้
         """
         return self.all_hand_landmarks
 
-    def stop(self): #
+    def get_hands_landmarks(self):
+        """
+        คืนค่าพิกัดทั้ง 21 จุดของทุกมือที่ตรวจจับได้ (list ต่อมือ)
+        """
+        return self.hands_landmarks
+
+    def close(self, timeout=2.0):
+        """
+        หยุด capture thread, ปิด inference worker (ถ้ามี), คืน shared memory และปล่อยกล้อง
+        """
         self.running = False
-        self.cap.release()
\ No newline at end of file
+        self._stop_event.set()
+        with self._demand_changed:
+            self._demand_changed.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=timeout)
+        if self.inference_worker is not None:
+            self.inference_worker.close(timeout=timeout)
+            self.inference_worker = None
+        self.subscription.close()
+        self.source.release()
+
+    def stop(self): #
+        """เก็บไว้เพื่อความเข้ากันได้ ใช้ close() แทน"""
+        self.close()
\ No newline at end of file
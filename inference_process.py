@@ -0,0 +1,224 @@
+"""
+รัน MediaPipe hand inference ใน process แยก เพื่อไม่ให้แย่ง GIL กับ render loop และการให้คะแนน
+
+ภาพถูกส่งผ่าน ring slot ใน multiprocessing.shared_memory และพิกัดมือถูกส่งกลับผ่าน
+shared array อีกก้อนหนึ่ง สิ่งที่ส่งผ่าน pipe มีแค่หมายเลข slot (ไม่มีการ pickle ภาพ)
+
+worker ถูกเปิดด้วย subprocess แทน multiprocessing.Process เพราะ main.py เป็นสคริปต์
+ที่ไม่มี `if __name__ == "__main__"` การ spawn แบบปกติจะรันเกมซ้ำใน process ลูก
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from landmark_provider import LandmarkFrame, run_hands
+from tracking_roi import InferenceRoi
+
+HANDEDNESS_CODES = {None: 0, "Left": 1, "Right": 2}
+HANDEDNESS_NAMES = {code: name for name, code in HANDEDNESS_CODES.items()}
+
+
+def result_stride(max_num_hands):
+    """จำนวน float64 ต่อ slot: timestamp, จำนวนมือ, handedness ของแต่ละมือ, พิกัด 21x3 ของแต่ละมือ"""
+    return 2 + max_num_hands + max_num_hands * 21 * 3
+
+
+class ProcessHandInference:
+    """
+    ตัวจัดการ worker process สำหรับ inference
+
+    Args:
+        frame_size: ขนาด (width, height) ของภาพที่จะส่งเข้ามา
+        on_result: ฟังก์ชันที่รับ LandmarkFrame เมื่อ worker ประมวลผลเสร็จ (เรียกบน reader thread)
+        settings: ค่าที่ส่งให้ mp.solutions.hands.Hands
+        slots: จำนวน slot ของภาพ ถ้าทุก slot ไม่ว่าง เฟรมใหม่จะถูกข้าม (นับใน dropped_frames)
+        roi: InferenceRoi ที่ใช้เป็นค่าตั้งต้นของ ROI ใน worker (None = ใช้ภาพเต็ม)
+        on_exit: ฟังก์ชันที่รับ exit code เมื่อ worker ตายเองโดยไม่ได้สั่งปิด (เรียกบน reader thread)
+    """
+
+    def __init__(self, frame_size, on_result, settings=None, slots=3, roi=None, on_exit=None):
+        self.frame_size = tuple(frame_size)
+        self.on_result = on_result
+        self.settings = dict(settings or {})
+        self.max_num_hands = self.settings.get("max_num_hands", 2)
+        self.on_exit = on_exit
+        self.slots = slots
+        self.dropped_frames = 0
+        self.exited = False  # worker ตายเองแล้ว (submit จะคืน False เสมอ)
+        self.exit_code = None
+
+        width, height = self.frame_size
+        self._frame_shm = shared_memory.SharedMemory(create=True, size=slots * height * width * 3)
+        self._frames = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=self._frame_shm.buf)
+        stride = result_stride(self.max_num_hands)
+        self._result_shm = shared_memory.SharedMemory(create=True, size=slots * stride * 8)
+        self._results = np.ndarray((slots, stride), dtype=np.float64, buffer=self._result_shm.buf)
+
+        self._free_slots = queue.Queue()
+        for slot in range(slots):
+            self._free_slots.put(slot)
+
+        config = {
+            "frame_shm": self._frame_shm.name,
+            "result_shm": self._result_shm.name,
+            "frame_size": [width, height],
+            "slots": slots,
+            "settings": self.settings,
+            "roi": roi.settings() if roi is not None else None,
+        }
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), json.dumps(config)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+
+    def submit(self, frame, timestamp):
+        """
+        คัดลอกภาพ BGR ลง slot ที่ว่างแล้วสั่ง worker ให้ประมวลผล
+
+        Returns:
+            bool: False ถ้าไม่มี slot ว่าง (เฟรมนี้ถูกข้าม)
+        """
+        if self._closed or self.exited:
+            return False
+        try:
+            slot = self._free_slots.get_nowait()
+        except queue.Empty:
+            self.dropped_frames += 1
+            return False
+
+        target = self._frames[slot]
+        if frame.shape == target.shape:
+            np.copyto(target, frame)
+        else:
+            cv2.resize(frame, self.frame_size, dst=target)
+
+        try:
+            self.process.stdin.write(f"{slot} {timestamp!r}\n")
+        except (BrokenPipeError, ValueError, OSError):
+            self._free_slots.put(slot)
+            return False
+        return True
+
+    def _read_results(self):
+        """
+        อ่านหมายเลข slot ที่ worker ทำเสร็จ แล้วแปลงผลใน shared array เป็น LandmarkFrame
+        ถ้า stdout ปิดโดยที่ยังไม่ได้สั่ง close() แปลว่า worker ตาย จะแจ้งผ่าน on_exit
+        """
+        for line in self.process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            slot = int(line)
+            row = self._results[slot].copy()
+            self._free_slots.put(slot)
+
+            hand_count = int(row[1])
+            handedness = [HANDEDNESS_NAMES.get(int(code)) for code in row[2:2 + hand_count]]
+            landmarks = row[2 + self.max_num_hands:].reshape(self.max_num_hands, 21, 3)
+            hands = [landmarks[h].astype(np.float32) for h in range(hand_count)]
+            self.on_result(LandmarkFrame(hands, self.frame_size, float(row[0]), handedness))
+
+        if self._closed:
+            return
+        try:
+            self.exit_code = self.process.wait(timeout=2.0)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.exit_code = self.process.wait()
+        self.exited = True
+        print(f"Inference worker exited unexpectedly (exit code {self.exit_code})")
+        if self.on_exit is not None:
+            self.on_exit(self.exit_code)
+
+    def close(self, timeout=2.0):
+        """
+        หยุด worker อย่างเรียบร้อย แล้วคืน shared memory ทั้งหมด
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.process.stdin.write("quit\n")
+            self.process.stdin.close()
+        except (BrokenPipeError, ValueError, OSError):
+            pass
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self._reader.join(timeout=timeout)
+
+        # ต้องปล่อย numpy view ก่อน ไม่อย่างนั้น shared memory จะ close ไม่ได้
+        self._frames = None
+        self._results = None
+        for shm in (self._frame_shm, self._result_shm):
+            shm.close()
+            shm.unlink()
+
+
+def worker_main(config):
+    """ส่วนที่ทำงานใน worker process"""
+    # ใช้ stdout เดิมเป็นช่องทางส่งหมายเลข slot เท่านั้น log อื่นๆ ให้ไปที่ stderr
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    import mediapipe as mp
+
+    width, height = config["frame_size"]
+    slots = config["slots"]
+    settings = config["settings"]
+    max_num_hands = settings.get("max_num_hands", 2)
+    stride = result_stride(max_num_hands)
+
+    frame_shm = shared_memory.SharedMemory(name=config["frame_shm"])
+    result_shm = shared_memory.SharedMemory(name=config["result_shm"])
+    frames = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=frame_shm.buf)
+    results_array = np.ndarray((slots, stride), dtype=np.float64, buffer=result_shm.buf)
+    hands_model = mp.solutions.hands.Hands(static_image_mode=False, **settings)
+    roi = InferenceRoi(**config["roi"]) if config.get("roi") else None
+    row = None
+
+    for line in sys.stdin:
+        line = line.strip()
+        if line == "quit":
+            break
+        if not line:
+            continue
+        slot_text, timestamp_text = line.split()
+        slot = int(slot_text)
+
+        hands, handedness = run_hands(hands_model, frames[slot], roi)
+
+        row = results_array[slot]
+        row[:] = 0
+        row[0] = float(timestamp_text)
+        row[1] = min(len(hands), max_num_hands)
+        for h in range(int(row[1])):
+            row[2 + h] = HANDEDNESS_CODES.get(handedness[h], 0)
+            start = 2 + max_num_hands + h * 63
+            row[start:start + 63] = hands[h].ravel()
+        protocol_out.write(f"{slot}\n")
+
+    hands_model.close()
+    del frames, results_array, row
+    frame_shm.close()
+    result_shm.close()
+
+
+if __name__ == "__main__":
+    # shared memory เป็นของ process หลัก ไม่ให้ resource tracker ของ worker ลบทิ้งตอนจบ
+    from multiprocessing import resource_tracker
+    resource_tracker.register = lambda *args, **kwargs: None
+    worker_main(json.loads(sys.argv[1]))
@@ -0,0 +1,238 @@
+import threading
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from hand_features import hand_features
+from tracking_roi import InferenceRoi
+
+# เส้นเชื่อมระหว่างจุดของมือ (ใช้วาดโครงมือ)
+HAND_CONNECTIONS = mp.solutions.hands.HAND_CONNECTIONS
+INDEX_FINGER_TIP = int(mp.solutions.hands.HandLandmark.INDEX_FINGER_TIP)
+
+
+class LandmarkFrame:
+    """
+    ผลการตรวจจับมือของภาพหนึ่งเฟรม
+
+    Attributes:
+        hands: list ของ numpy array ขนาด (21, 3) เก็บพิกัด normalized (x, y, z) ของแต่ละมือ
+        handedness: list ของชื่อมือ ("Left"/"Right") เรียงตาม hands
+        frame_size: ขนาด (width, height) ของภาพต้นทาง
+        timestamp: เวลาที่ได้ภาพ (วินาที, time.perf_counter)
+        sequence: ลำดับเฟรมที่ provider กำหนดให้ตอน publish
+        features: HandFeatures ของทุกมือ (คำนวณครั้งแรกที่ใช้แล้วเก็บไว้ให้ผู้ใช้คนอื่นใช้ต่อ)
+    """
+
+    def __init__(self, hands, frame_size, timestamp, handedness=None):
+        self.hands = hands
+        self.handedness = handedness if handedness is not None else [None] * len(hands)
+        self.frame_size = frame_size
+        self.timestamp = timestamp
+        self.sequence = 0
+        self._features = None
+
+    @property
+    def features(self):
+        if self._features is None:
+            w, h = self.frame_size
+            self._features = hand_features(np.stack(self.hands) if self.hands else [],
+                                           aspect=w / h if h else 1.0)
+        return self._features
+
+    def pixel_landmarks(self, hand_index=0, size=None):
+        """
+        คืนค่าพิกัด pixel (x, y) ทั้ง 21 จุดของมือที่เลือก
+
+        Args:
+            hand_index: ลำดับของมือ
+            size: ขนาด (width, height) ที่ต้องการ ถ้าไม่กำหนดจะใช้ขนาดภาพต้นทาง
+        """
+        if hand_index >= len(self.hands):
+            return []
+        size = size or self.frame_size
+        return [tuple(p) for p in (self.hands[hand_index][:, :2] * size).astype(int).tolist()]
+
+
+class LandmarkSubscription:
+    """
+    ตัวรับข้อมูลจาก HandLandmarkProvider
+
+    ใช้ได้สองแบบ: ส่ง callback มาเพื่อรับทุกเฟรมบน thread ที่ทำ inference
+    หรือเรียก poll() จาก thread ของตัวเองเพื่อรับเฉพาะเฟรมใหม่ล่าสุด
+    """
+
+    def __init__(self, provider, callback=None):
+        self.provider = provider
+        self.callback = callback
+        self._last_sequence = 0
+
+    def poll(self):
+        """
+        คืนค่า LandmarkFrame ล่าสุดถ้ายังไม่เคยอ่าน ไม่อย่างนั้นคืน None
+        """
+        frame = self.provider.latest()
+        if frame is None or frame.sequence == self._last_sequence:
+            return None
+        self._last_sequence = frame.sequence
+        return frame
+
+    def close(self):
+        self.provider.unsubscribe(self)
+
+
+class HandLandmarkProvider:
+    """
+    ตัวตรวจจับมือ MediaPipe ตัวเดียวที่ทุกส่วนของเกมใช้ร่วมกัน
+    (การวาด, การตรวจจับท่ามือ, การควบคุมเมนู)
+    """
+
+    def __init__(self, max_num_hands=2, model_complexity=1,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.7, roi=None):
+        """
+        Args:
+            roi: InferenceRoi สำหรับย่อภาพ/ตัดเฉพาะรอบมือก่อนส่งให้ MediaPipe (None = ใช้ภาพเต็ม)
+        """
+        self.mp_hands = mp.solutions.hands
+        self.settings = {
+            "max_num_hands": max_num_hands,
+            "model_complexity": model_complexity,
+            "min_detection_confidence": min_detection_confidence,
+            "min_tracking_confidence": min_tracking_confidence,
+        }
+        # โหลดโมเดลเมื่อมีการเรียก process ครั้งแรก (การ replay พิกัดจะไม่ต้องโหลดเลย)
+        self.hands = None
+        self.roi = roi
+
+        # MediaPipe Hands ไม่ thread-safe จึงต้องให้ process ทีละเฟรม
+        self._process_lock = threading.Lock()
+        self._subscribers_lock = threading.Lock()
+        self._subscribers = []
+        self._latest = None
+        self._sequence = 0
+
+    def process(self, frame, timestamp=None):
+        """
+        ตรวจจับมือจากภาพ BGR แล้วส่งผลให้ทุก subscriber
+
+        Args:
+            frame (numpy.ndarray): ภาพ BGR จากกล้อง (พลิกกระจกแล้ว)
+            timestamp: เวลาของภาพ ถ้าไม่กำหนดจะใช้เวลาปัจจุบัน
+
+        Returns:
+            LandmarkFrame: ผลการตรวจจับ
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        h, w = frame.shape[:2]
+        with self._process_lock:
+            if self.hands is None:
+                self.hands = self.mp_hands.Hands(static_image_mode=False, **self.settings)
+            hands, handedness = run_hands(self.hands, frame, self.roi)
+
+        landmark_frame = LandmarkFrame(hands, (w, h), timestamp, handedness)
+        self.publish(landmark_frame)
+        return landmark_frame
+
+    def publish(self, landmark_frame):
+        """
+        ส่ง LandmarkFrame ที่ได้มา (จาก inference หรือจากการ replay) ให้ทุก subscriber
+        """
+        with self._subscribers_lock:
+            self._sequence += 1
+            landmark_frame.sequence = self._sequence
+            self._latest = landmark_frame
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            if subscription.callback is not None:
+                subscription.callback(landmark_frame)
+
+    def latest(self):
+        """คืนค่า LandmarkFrame ล่าสุด (หรือ None ถ้ายังไม่มี)"""
+        return self._latest
+
+    def subscribe(self, callback=None):
+        """
+        ลงทะเบียนรับข้อมูลมือ
+
+        Args:
+            callback: ฟังก์ชันที่รับ LandmarkFrame (ถูกเรียกบน thread ที่ทำ inference)
+
+        Returns:
+            LandmarkSubscription
+        """
+        subscription = LandmarkSubscription(self, callback)
+        with self._subscribers_lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._subscribers_lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def close(self):
+        with self._process_lock:
+            if self.hands is not None:
+                self.hands.close()
+                self.hands = None
+
+
+def extract_hands(results):
+    """
+    แปลงผลลัพธ์ของ MediaPipe เป็น list ของ array (21, 3) และ list ของชื่อมือ
+    """
+    hands = []
+    handedness = []
+    if results.multi_hand_landmarks:
+        for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
+            hands.append(np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark],
+                                  dtype=np.float32))
+            label = None
+            if results.multi_handedness and i < len(results.multi_handedness):
+                label = results.multi_handedness[i].classification[0].label
+            handedness.append(label)
+    return hands, handedness
+
+
+def run_hands(hands_model, frame, roi=None):
+    """
+    ส่งภาพ BGR (หรือเฉพาะส่วนที่ roi เลือก) ให้ MediaPipe แล้วคืนพิกัด normalized ของภาพเต็ม
+    """
+    h, w = frame.shape[:2]
+    image, region = roi.prepare(frame) if roi is not None else (frame, (0, 0, w, h))
+    results = hands_model.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    hands, handedness = extract_hands(results)
+    if roi is not None:
+        hands = InferenceRoi.map_to_frame(hands, region, (w, h))
+        roi.update(hands, (w, h))
+    return hands, handedness
+
+
+_shared_provider = None
+_shared_provider_lock = threading.Lock()
+
+
+def get_shared_provider():
+    """
+    คืนค่า HandLandmarkProvider ตัวกลางของทั้งเกม (สร้างครั้งแรกที่เรียก)
+    """
+    global _shared_provider
+    with _shared_provider_lock:
+        if _shared_provider is None:
+            _shared_provider = HandLandmarkProvider()
+        return _shared_provider
+
+
+def draw_hand_landmarks(image, points, color=(0, 0, 255), joint_color=(0, 255, 0)):
+    """
+    วาดโครงมือลงบนภาพ OpenCV จากพิกัด pixel ทั้ง 21 จุด
+    """
+    for start, end in HAND_CONNECTIONS:
+        cv2.line(image, points[start], points[end], color, 2)
+    for point in points:
+        cv2.circle(image, point, 4, joint_color, -1)
@@ -0,0 +1,10 @@
+"""
+ชื่อเครื่องที่ใช้เป็น key ของไฟล์ cache ที่ผูกกับเครื่อง (ผล auto_tune และโปรไฟล์กล้องของ capture_profile)
+"""
+import os
+import platform
+
+
+def machine_key():
+    """ชื่อที่ใช้แยกผลของแต่ละเครื่อง"""
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}"
@@ -6,10 +6,18 @@ import numpy as np
 import math
 
 from drawing import DrawingApp
-from hand_tracking import HandTracking
+from asset_manager import AssetManager
+from compositor import FrameCompositor
+from frame_scheduler import FrameScheduler
+from hand_tracking import DEMAND_FULL, DEMAND_PAUSED, DEMAND_PREVIEW, HandTracking
+from frame_sources import CameraSource
+from capture_profile import load_or_select_profile
+from auto_tune import create_game_provider, load_or_calibrate
 from sound_manager import SoundManager
 from measure import ShapeMeasure 
 from gestures import HandGesture  # ใช้ gestures.py ทีถูกต้อง
+from players import MAX_PLAYERS, PlayerScorer, PlayerTracker
+from session_log import SessionRecorder, session_path
  
 # กำหนดค่าพื้นฐาน
 WIDTH, HEIGHT = 1200, 900
@@ -21,52 +29,59 @@ BUTTON_BORDER_COLOR = (255, 0, 0)      # สีกรอบปุ่มเป็
 FONT_COLOR = (255, 0, 0)               # สีฟอนต์เป็นสีแดง
 
 # ฟังก์ชันสำหรับโหลด binary template
-def load_binary_template(difficulty):
+def load_binary_image(binary_path):
     """
-    โหลด binary template และแปลงเป็น Pygame surface ที่มองเห็นได้ชัดเจน
+    อ่านไฟล์ binary template เป็น Pygame surface (ยังไม่ convert จึงเรียกจาก thread ของ AssetManager ได้)
     
     Args:
-        difficulty: ระดับความยาก ("Easy", "Normal", "Hard")
+        binary_path: เส้นทางไปยังไฟล์ binary template
         
     Returns:
-        pygame.Surface: Surface ที่พร้อมแสดงผล หรือ None ถ้าโหลดไม่สำเร็จ
+        pygame.Surface: เส้นของ template เป็นสีขาวบนพื้นดำ (raise ถ้าโหลดไม่สำเร็จ)
     """
-    binary_path = f"assets/bin2/cookie_template_{difficulty.lower()}_bin.png"
     try:
         # วิธีที่ 1: ใช้ pygame โหลดโดยตรง (เร็วกว่า)
-        binary_surface = pygame.image.load(binary_path).convert_alpha()
-        # แปลงสีให้เป็นสีฟ้า
-        blue_overlay = pygame.Surface(binary_surface.get_size()).convert_alpha()
-        blue_overlay.fill((0, 180, 255))
-        binary_surface.blit(blue_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        return binary_surface
+        return pygame.image.load(binary_path)
     except Exception as e:
         print(f"Error loading binary template with pygame: {e}")
-        try:
-            # วิธีที่ 2: ใช้ OpenCV ถ้าโหลดด้วย pygame ไม่สำเร็จ
-            binary_img = cv2.imread(binary_path, cv2.IMREAD_GRAYSCALE)
-            if binary_img is None:
-                print(f"Could not load binary template from {binary_path}")
-                return None
-                
-            # ทำให้เส้นสว่างขึ้น
-            _, binary_img = cv2.threshold(binary_img, 50, 255, cv2.THRESH_BINARY)
-            
-            # แปลงเป็น RGB ก่อนที่จะเปลี่ยนสี
-            colored = cv2.cvtColor(binary_img, cv2.COLOR_GRAY2BGR)
-            
-            # เปลี่ยนสีขาวให้เป็นสีฟ้า (BGR ใน OpenCV)
-            colored[binary_img > 0] = [255, 180, 0]  # สีฟ้า (BGR)
-            
-            # แปลงเป็น Pygame surface
-            colored = cv2.transpose(colored)
-            colored = cv2.flip(colored, 1)
-            binary_surface = pygame.surfarray.make_surface(colored)
+        # วิธีที่ 2: ใช้ OpenCV ถ้าโหลดด้วย pygame ไม่สำเร็จ
+        binary_img = cv2.imread(binary_path, cv2.IMREAD_GRAYSCALE)
+        if binary_img is None:
+            raise FileNotFoundError(f"Could not load binary template from {binary_path}")
             
-            return binary_surface
-        except Exception as e:
-            print(f"Error loading binary template with OpenCV: {e}")
-            return None
+        # ทำให้เส้นสว่างขึ้น
+        _, binary_img = cv2.threshold(binary_img, 50, 255, cv2.THRESH_BINARY)
+        
+        # แปลงเป็น RGB (สีฟ้าถูกใส่ทีหลังใน tint_binary_template)
+        colored = cv2.cvtColor(binary_img, cv2.COLOR_GRAY2RGB)
+        
+        # แปลงเป็น Pygame surface
+        return pygame.surfarray.make_surface(colored.transpose(1, 0, 2))
+
+def tint_binary_template(binary_surface):
+    """แปลงเส้นของ binary template ให้เป็นสีฟ้าที่มองเห็นได้ชัดเจน (ทำครั้งเดียวหลัง convert)"""
+    blue_overlay = pygame.Surface(binary_surface.get_size()).convert_alpha()
+    blue_overlay.fill((0, 180, 255))
+    binary_surface.blit(blue_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    return binary_surface
+
+def load_binary_template(difficulty):
+    """
+    โหลด binary template ของระดับความยาก (จาก cache ของ AssetManager)
+    
+    Args:
+        difficulty: ระดับความยาก ("Easy", "Normal", "Hard")
+        
+    Returns:
+        str: ชื่อ asset ของ template ที่พร้อมแสดงผล หรือ None ถ้าโหลดไม่สำเร็จ
+    """
+    name = f"binary_{difficulty.lower()}"
+    try:
+        assets.get(name)
+        return name
+    except Exception as e:
+        print(f"Error loading binary template: {e}")
+        return None
 
 def evaluate_win_condition(metrics, difficulty):
     """
@@ -145,7 +160,7 @@ def display_result_message(screen, result, metrics, difficulty, time_font, font)
     # Calculate pulsing effect for the first 2 seconds
     global result_effect_active, result_effect_start
     if result_effect_active:
-        elapsed = pygame.time.get_ticks() - result_effect_start
+        elapsed = frame_scheduler.logic_time_ms - result_effect_start
         if elapsed < 2000:  # 2 seconds of pulsing
             # Oscillate between 150 and 255 for pulsing effect
             alpha = 150 + int(105 * abs(math.sin(elapsed / 200)))
@@ -210,13 +225,14 @@ def display_result_message(screen, result, metrics, difficulty, time_font, font)
         y_pos += y_spacing
     
     # Draw continue message
-    if pygame.time.get_ticks() - result_time > 1500:  # After 1.5 seconds show continue message
+    if frame_scheduler.logic_time_ms - result_time > 1500:  # After 1.5 seconds show continue message
         continue_text = font.render("Game will continue... Keep drawing!", True, (200, 200, 200))
         screen.blit(continue_text, (WIDTH // 2 - continue_text.get_width() // 2, HEIGHT * 3/4))
 
 def metrics_are_stable(current_metrics, last_metrics, threshold=2.0):
     """
     ตรวจสอบว่าเมทริกซ์คงที่หรือไม่โดยเปรียบเทียบกับเมทริกซ์ก่อนหน้า
+    ถ้าทั้งสองมี "version" (ภาพวาดที่ถูกให้คะแนน) และเป็นภาพเดียวกัน ถือว่าคงที่ทันทีโดยไม่ต้องเทียบค่า
     
     Args:
         current_metrics: เมทริกซ์ปัจจุบัน
@@ -228,6 +244,10 @@ def metrics_are_stable(current_metrics, last_metrics, threshold=2.0):
     """
     if not current_metrics or not last_metrics:
         return False
+
+    # ภาพวาดไม่เปลี่ยนตั้งแต่ครั้งก่อน คะแนนก็ต้องเท่าเดิม
+    if current_metrics.get("version") is not None and current_metrics.get("version") == last_metrics.get("version"):
+        return True
         
     # ตรวจสอบความแตกต่างของเมทริกซ์หลัก
     metrics_to_check = ['overall_score', 'coverage', 'out_of_bounds', 'similarity']
@@ -280,11 +300,44 @@ def draw_button(text, x, y, width, height, color, hover_color, border_color):
                                y + (height - text_surface.get_height()) // 2))
 
 # เริ่ม Hand Tracking และ Drawing App
-hand_tracker = HandTracking()
-drawing_app = DrawingApp(WIDTH, HEIGHT)
+# ลองโหมดของกล้องแล้วเลือกโหมดที่ได้ fps สูงและคาบของเฟรมสม่ำเสมอที่สุด (ผลการ probe ถูกบันทึกใน logs/)
+# โหมดที่เลือกถูกจำไว้ต่อเครื่องและกล้อง จะ probe ใหม่เมื่อโหมดเดิมใช้ไม่ได้เท่านั้น
+camera_profile = load_or_select_profile(0)
+# ตัวตรวจจับมือตัวเดียวของเกม: ย่อภาพตอนหามือ และตัดเฉพาะรอบมือเมื่อเจอแล้ว
+# model_complexity/confidence ถูกเลือกตามความเร็วของเครื่อง (calibrate ครั้งแรกแล้วจำไว้)
+model_settings = load_or_calibrate()
+# หามือให้ได้ครบทุกผู้เล่นที่เลือกได้ (worker process ใช้ settings ชุดเดียวกับ provider)
+# auto_tune วัดเวลาด้วย provider แบบเดียวกันนี้ งบเวลาที่ calibrate จึงตรงกับในเกม
+hand_provider = create_game_provider(model_settings)
+# ตรวจจับมือใน process แยก เพื่อไม่ให้ inference แย่ง GIL กับการวาดและการให้คะแนน
+hand_tracker = HandTracking(preview_size=(WIDTH, HEIGHT), provider=hand_provider,
+                            source=CameraSource(0, profile=camera_profile), inference="process")
+# ผู้เล่นแต่ละคนใช้มือหนึ่งข้างและมี DrawingApp ของตัวเอง (drawing_app คือของผู้เล่นคนแรก)
+player_tracker = PlayerTracker(hand_tracker.provider, num_players=1, display_size=(WIDTH, HEIGHT))
+player_scorer = PlayerScorer()
+drawing_app = player_tracker.players[0].drawing_app
 # สร้างออบเจกต์ HandGesture จาก gestures.py 
-gesture_recognizer = HandGesture()
+gesture_recognizer = HandGesture(provider=hand_tracker.provider)
 shape_measure = ShapeMeasure()
+# รูปของทุกระดับความยาก: อ่านไฟล์บน thread แยกตั้งแต่อยู่หน้าเมนู แล้ว convert ทีละรูประหว่างเฟรมของเมนู
+assets = AssetManager()
+for level in ("easy", "normal", "hard"):
+    assets.add(f"cookie_{level}", f"assets/cookie_template_{level}.png")
+    assets.add(f"binary_{level}", f"assets/bin2/cookie_template_{level}_bin.png", alpha=True,
+               prepare=tint_binary_template, loader=load_binary_image)
+assets.preload()
+# ประกอบภาพหน้าเกม (คุกกี้/template ที่ย่อไว้ล่วงหน้า และวาดใหม่เฉพาะส่วนที่เปลี่ยน)
+compositor = FrameCompositor((WIDTH, HEIGHT), assets)
+# คุมจังหวะของ loop: render ที่ GAME_FPS (เมนู MENU_FPS) และ logic ของเกม (นับถอยหลัง, เวลาเกม,
+# เช็คความคงที่ของคะแนน) ด้วย timestep คงที่ ถ้าเฟรมเกินงบจะข้ามการให้คะแนน ไม่ข้ามการ render
+GAME_FPS = 60
+MENU_FPS = 30
+frame_scheduler = FrameScheduler(target_fps=GAME_FPS, logic_hz=30)
+# งานย่อยของแต่ละเฟรม: อัตราที่ต้องการ (ครั้ง/วินาที) และเวลาที่คาดไว้ (แทนด้วยเวลาที่วัดได้จริงระหว่างเล่น)
+frame_scheduler.add_task("scoring", rate=15, cost=0.004)
+frame_scheduler.add_task("gestures", rate=30, cost=0.001)
+frame_scheduler.add_task("hud", rate=10, cost=0.002)
+frame_scheduler.add_task("debug_dump", rate=0.5)  # ภาพ debug_*.png ของการให้คะแนน
 
 # ตัวแปรควบคุมสถานะเกม
 running = True
@@ -294,18 +347,18 @@ difficulty = None
 countdown = False
 start_game_page = False
 countdown_time = 3
-cookie_image = None
+countdown_elapsed = 0.0  # เวลาของ logic ที่ผ่านไปตั้งแต่ตัวเลขนับถอยหลังเปลี่ยนครั้งล่าสุด (วินาที)
+cookie_asset = None  # ชื่อรูปคุกกี้ใน assets ของระดับที่เลือก
 
 # ควบคุมการชนะเกม
 game_result = None  # Can be "win", "lose", or None
 result_time = None
 result_effect_active = False
 result_effect_start = None
-result_cooldown = 0  # เวลาขั้นต่ำระหว่างการเช็คผลลัพธ์
 min_drawing_time = 10000  # เวลาขั้นต่ำที่ต้องวาดก่อนที่จะเช็คผล (5 วินาที)
-last_check_time = 0  # เวลาล่าสุดที่เช็คผลลัพธ์
 metrics_stable_count = 0  # นับจำนวนครั้งที่เมทริกซ์คงที่
 required_stable_metrics = 3  # จำนวนครั้งที่ต้องการให้เมทริกซ์คงที่ก่อนประเมินผล
+RESULT_CHECK_STEPS = 3  # เช็คความคงที่ของคะแนนทุกกี่รอบของ logic (logic_hz=30 → 10 ครั้งต่อวินาที)
 last_metrics = None  # เมทริกซ์ล่าสุดเพื่อเช็คความคงที่
 result_display_time = 4000
 # Thresholds for different difficulty levels
@@ -335,14 +388,48 @@ game_duration = 60000         # ระยะเวลาเกม 1 นาที
 game_over_time = None         # เวลาเกมจบ
 
 # ตัวแปรสำหรับการวัดความแม่นยำของการวาด
-frame_count = 0
-measure_interval = 2  # วัดทุก 2 เฟรม
 latest_metrics = None
-binary_template_surface = None
+template_asset = None  # ชื่อ binary template ใน assets (None = โหลดไม่สำเร็จ)
 show_template = True  # ตัวแปรควบคุมการแสดง binary template
+show_debug_overlay = False  # แสดงโครงมือจาก HandTracking (กด D)
+record_sessions = True  # บันทึกทุกเกมลง recordings/sessions/ (เล่นซ้ำด้วย benchmark.py --session)
+session_recorder = None
+session_landmarks = None
+undo_requests = []  # (player, redo) จากคีย์ Z/Y ที่รอทำในเฟรมถัดไป
+hud_items = None  # ข้อความ/คะแนนที่ render ไว้แล้ว [(surface, position)] (render ใหม่ตามรอบของงาน "hud")
+hud_rects = []  # กรอบของข้อความ/คะแนนที่วาดทับภาพเกมในเฟรมก่อน (ต้องลบออกเมื่อวาดใหม่บางส่วน)
 
 while running:
-    screen.fill(BLACK)  # พื้นหลังสีดำ
+    # เริ่มเฟรม: logic ที่ขึ้นกับเวลาจะวนทำตาม frame_scheduler.steps() (0 รอบได้ถ้า render เร็วกว่า logic)
+    frame_scheduler.begin_frame()
+
+    # บอก HandTracking ว่าหน้าจอนี้ต้องการพิกัดมือแค่ไหน
+    # เมนู: หยุดกล้อง, นับถอยหลัง/หน้าผลลัพธ์: อัตราต่ำ, ระหว่างวาด: เต็มอัตรา
+    playing = countdown and countdown_time == 0
+    if playing and game_result is None and game_over_time is None:
+        hand_tracker.set_demand(DEMAND_FULL)
+    elif playing or countdown or start_game_page:
+        hand_tracker.set_demand(DEMAND_PREVIEW)
+    else:
+        hand_tracker.set_demand(DEMAND_PAUSED)
+    # นอกจากตอนวาด ให้ข้าม inference เมื่อมือไม่ขยับ (ลดความร้อนของเครื่อง)
+    hand_tracker.set_motion_gate(not playing or game_result is not None)
+
+    # ระหว่างวาด ถ้าภาพกล้องยังไม่เปลี่ยนตั้งแต่เฟรมก่อน ให้วาดใหม่เฉพาะเส้นใหม่และ HUD
+    # แล้วส่งเฉพาะกรอบเหล่านั้นขึ้นจอ (ภาพกล้องใหม่ต้องวาดใหม่ทั้งจออยู่แล้ว)
+    compositor.set_static(cookie_asset, template_asset if show_template else None)
+    partial_redraw = (playing and game_result is None and game_over_time is None and not show_debug_overlay
+                      and compositor.can_redraw_partially(hand_tracker.preview_version))
+    if partial_redraw:
+        dirty_rects = hud_rects
+    else:
+        screen.fill(BLACK)  # พื้นหลังสีดำ
+        compositor.invalidate()
+    hud_rects = []
+
+    # ระหว่างอยู่หน้าเมนู convert รูปที่ preload เสร็จแล้วทีละรูป (เฟรมของเมนูมีเวลาเหลือ)
+    if main_menu or difficulty_selected:
+        assets.warm()
 
     # หน้า Main Menu
     if main_menu:
@@ -353,6 +440,8 @@ while running:
                     BUTTON_COLOR, BUTTON_HOVER_COLOR, BUTTON_BORDER_COLOR)
         draw_button("Quit", WIDTH // 4 - 150, HEIGHT // 2 + 100, 300, 80,
                     BUTTON_COLOR, BUTTON_HOVER_COLOR, BUTTON_BORDER_COLOR)
+        players_text = font.render(f"Players: {player_tracker.num_players} (1-{MAX_PLAYERS})", True, RED)
+        screen.blit(players_text, (WIDTH // 4 - players_text.get_width() // 2, HEIGHT // 2 + 220))
 
     # หน้าเลือกระดับความยาก
     if difficulty_selected:
@@ -383,45 +472,61 @@ while running:
         countdown_text = font.render(str(countdown_time), True, RED)
         screen.blit(countdown_text, (WIDTH // 2 - countdown_text.get_width() // 2,
                                      HEIGHT // 2 - countdown_text.get_height() // 2))
-        if time.time() - countdown_start >= 1 and countdown_time > 0:
-            countdown_time -= 1
-            countdown_start = time.time()
+        for _ in frame_scheduler.steps():
+            if countdown_time == 0:
+                break
+            countdown_elapsed += frame_scheduler.logic_dt
+            if countdown_elapsed >= 1:
+                countdown_time -= 1
+                countdown_elapsed = 0.0
+                if countdown_time == 0:
+                    # เริ่มดึงภาพเต็มอัตราตั้งแต่เฟรมนี้ ไม่ต้องรอรอบถัดไปของ loop
+                    hand_tracker.set_demand(DEMAND_FULL)
+                    if record_sessions:
+                        session_recorder = SessionRecorder(session_path(difficulty=difficulty))
+                        session_recorder.start(difficulty, player_tracker.num_players, (WIDTH, HEIGHT))
+                        session_landmarks = hand_tracker.provider.subscribe(session_recorder.record_landmarks)
         if countdown_time == 0:
             # เมื่อหมดนับถอยหลัง ให้เริ่มเกมจริง
             start_game_page = False
 
-            # ดึงภาพจาก Hand Tracking แล้วปรับขนาดให้เต็มหน้าจอ
-            frame_surface = hand_tracker.get_frame()
-            if frame_surface:
-                frame_surface = pygame.transform.scale(frame_surface, (WIDTH, HEIGHT))
-
-                # ดึงพิกัดนิ้วจาก HandTracking
-                hand_positions = hand_tracker.get_hand_positions()
-
-                # ดึงพิกัดทั้ง 21 จุดของมือ
-                all_hand_landmarks = hand_tracker.get_all_hand_landmarks()
-                
-                # ปรับพิกัดจากความละเอียดของกล้อง
-                if hand_positions:
-                    scale_x = WIDTH / hand_tracker.original_width
-                    scale_y = HEIGHT / hand_tracker.original_height
-                    hand_positions = [(int(x * scale_x), int(y * scale_y)) for (x, y) in hand_positions]
-
-                    # ปรับพิกัดของจุดทั้งหมดของมือ (ถ้ามี)
-                    if all_hand_landmarks:
-                        all_hand_landmarks = [(int(x * scale_x), int(y * scale_y)) for (x, y) in all_hand_landmarks]
-
-                # อัปเดตเลเยอร์เส้นใน DrawingApp
-                drawing_app.update(hand_positions)
+            # วาดภาพจาก Hand Tracking ลงหน้าจอโดยตรง (preview ถูก render ที่ขนาดหน้าจอแล้ว)
+            if partial_redraw or hand_tracker.blit_frame(screen):
+                # อัปเดตเลเยอร์เส้นของผู้เล่นแต่ละคนจากมือที่จับคู่ไว้ (พิกัดของหน้าจอแล้ว)
+                # ใช้ timestamp เดียวกันทั้งเฟรม และบันทึกไว้เพื่อให้เล่นซ้ำได้ผลเหมือนเดิม
+                now = time.perf_counter()
+                player_positions = [player_tracker.positions(player) for player in player_tracker.players]
+                for player, positions in zip(player_tracker.players, player_positions):
+                    player.drawing_app.update(positions, now)
+                if session_recorder:
+                    session_recorder.record_fingertips(player_positions, now)
+
+                # undo/redo จากคีย์บอร์ด (ผู้เล่นคนแรก) และท่าแบมือ (ของผู้เล่นแต่ละคน)
+                for player in player_tracker.players:
+                    while player.undo_requests:
+                        player.undo_requests.popleft()
+                        undo_requests.append((player, False))
+                for player, redo in undo_requests:
+                    if player.undo(redo):
+                        # คะแนนที่กำลังคำนวณเป็นของภาพก่อน undo และความคงที่ของคะแนนต้องนับใหม่
+                        player_scorer.discard(player)
+                        metrics_stable_count = 0
+                        last_metrics = None
+                        latest_metrics = player_tracker.leader().latest_metrics
+                        if session_recorder:
+                            session_recorder.event("redo" if redo else "undo", player=player.player_id)
+                undo_requests = []
                 drawing_layer = drawing_app.draw_layer()
 
-                # ตรวจจับท่าทางจากมือ
-                if all_hand_landmarks:
-                    # เรียกใช้ process_gesture จาก gestures.py
-                    gesture_recognizer.process_gesture(all_hand_landmarks)
+                # ตรวจจับท่าทางจากมือ (ดึงผลใหม่จาก provider ตัวเดียวกับ HandTracking)
+                if frame_scheduler.due("gestures"):
+                    with frame_scheduler.measure("gestures"):
+                        gesture_recognizer.update()
 
                 # ตรวจสอบว่าเกมกำลังดำเนินการหรือไม่
                 if not gesture_recognizer.game_running:
+                    if session_recorder:
+                        session_recorder.gesture("rock")
                     screen.fill((0, 0, 0))
                     print("Rock Hand Sign Detected! Quitting...")
                     title_text = font.render("EXIT GAME BYE!", True, (0, 0, 255))
@@ -431,36 +536,26 @@ while running:
                     pygame.time.wait(3000)  # แสดง Game Over สักพัก
                     running = False  # หยุดเกม
 
-                # สร้างพื้นหลังใหม่ (background) โดยเริ่มจากภาพจากกล้อง
-                base_surface = frame_surface.copy()
-
-                # วางรูปคุกกี้ลงบนพื้นหลัง
-                cookie_position = (0, 0)  # ค่าเริ่มต้น
-                if cookie_image:
-                    cookie_image.set_alpha(200)
-                    cookie_image_scaled = pygame.transform.scale(cookie_image, (400, 400))
-                    cookie_position = (WIDTH // 2 - cookie_image_scaled.get_width() // 2,
-                                      HEIGHT // 2 - cookie_image_scaled.get_height() // 2)
-                    base_surface.blit(cookie_image_scaled, cookie_position)
-                    
-                    # แสดง binary template ถ้ามี และเปิดการแสดง
-                    if binary_template_surface and show_template:
-                        # ปรับขนาดให้ตรงกับ cookie image
-                        binary_scaled = pygame.transform.scale(binary_template_surface, (400, 400))
-                        # ปรับความโปร่งใสให้เห็น camera feed ด้านหลัง
-                        binary_scaled.set_alpha(180)
-                        # วาง binary template ลงบนพื้นหลัง
-                        base_surface.blit(binary_scaled, cookie_position)
-
-                # นำ drawing_layer (เส้นที่วาด) มาวางซ้อนบนพื้นหลัง
-                base_surface.blit(drawing_layer, (0, 0))
-
-                # แสดงผลลงหน้าจอ
-                screen.blit(base_surface, (0, 0))
+                # วางรูปคุกกี้ template และเส้นของทุกผู้เล่นลงบนภาพจากกล้อง
+                drawing_apps = [player.drawing_app for player in player_tracker.players]
+                if partial_redraw:
+                    for app in drawing_apps:
+                        dirty_rects.extend(app.take_dirty_rects())
+                    dirty_rects = compositor.redraw(screen, hand_tracker, drawing_apps, dirty_rects)
+                else:
+                    for app in drawing_apps:
+                        app.take_dirty_rects()
+                    compositor.draw(screen, drawing_apps, hand_tracker.blitted_version)
+                cookie_image_scaled = compositor.cookie_surface
+
+                # วาด overlay สำหรับ debug จากพิกัดมือล่าสุด (เฉพาะเมื่อเปิดไว้)
+                if show_debug_overlay:
+                    hand_tracker.draw_debug_overlay(screen)
                 
-                # คำนวณความแม่นยำทุก 2 เฟรมเพื่อลดภาระการประมวลผล
-                frame_count += 1
-                if difficulty and cookie_image and frame_count % measure_interval == 0:
+                # คำนวณความแม่นยำตามรอบของงาน "scoring" เพื่อลดภาระการประมวลผล
+                # (ถ้าเวลาที่เหลือของเฟรมไม่พอ ให้ข้ามไปก่อน ภาพยังต้องขึ้นจอตามเวลา)
+                if difficulty and cookie_asset and frame_scheduler.due("scoring"):
+                    scoring_start = time.perf_counter()
                     try:
                         # สร้างโฟลเดอร์ assets/bin ถ้ายังไม่มี
                         import os
@@ -504,32 +599,30 @@ while running:
                         cookie_size = (cookie_image_scaled.get_width(), cookie_image_scaled.get_height())
                         drawing_size = (drawing_layer.get_width(), drawing_layer.get_height())
                         
-                        print(f"Cookie size: {cookie_size}, Drawing size: {drawing_size}")
-                        
-                        # ตัดขนาด drawing_layer ให้เท่ากับ cookie_image_scaled
-                        if cookie_size != drawing_size:
-                            print("Resizing for evaluation...")
-                            drawing_portion = pygame.Surface(cookie_size, pygame.SRCALPHA)
-                            drawing_portion.fill((0, 0, 0, 0))  # โปร่งใส
-                            
-                            # คำนวณตำแหน่งที่จะ blit (ตำแหน่งเดียวกับ cookie_image บนหน้าจอ)
-                            offset_x = WIDTH // 2 - cookie_size[0] // 2
-                            offset_y = HEIGHT // 2 - cookie_size[1] // 2
-                            
-                            # คัดลอกเฉพาะส่วนที่ตรงกับ cookie
-                            drawing_portion.blit(drawing_layer, (0, 0), (offset_x, offset_y, cookie_size[0], cookie_size[1]))
-                            
-                            latest_metrics = shape_measure.evaluate_drawing(
-                                drawing_portion, 
-                                cookie_image_scaled, 
-                                binary_template_path
-                            )
-                        else:
-                            latest_metrics = shape_measure.evaluate_drawing(
-                                drawing_layer, 
-                                cookie_image_scaled, 
-                                binary_template_path
-                            )
+                        # คำนวณตำแหน่งที่จะตัด (ตำแหน่งเดียวกับคุกกี้บนหน้าจอ)
+                        offset_x = WIDTH // 2 - cookie_size[0] // 2
+                        offset_y = HEIGHT // 2 - cookie_size[1] // 2
+
+                        # ให้คะแนนทุกผู้เล่นพร้อมกันบน thread pool ผลจะถูกเก็บด้วย player_scorer.collect
+                        # ภาพ debug_*.png ใช้ชื่อไฟล์ตายตัว จึงบันทึกเฉพาะของผู้เล่นที่นำอยู่ (ไม่ให้ thread เขียนทับกัน)
+                        debug_player = player_tracker.leader() if frame_scheduler.due("debug_dump") else None
+                        for player in player_tracker.players:
+                            # ภาพที่ไม่เปลี่ยนตั้งแต่ให้คะแนนครั้งก่อน (มือนิ่งหรือไม่อยู่ในภาพ) ไม่ต้องให้คะแนนซ้ำ
+                            if player_scorer.is_scored(player, cookie_image_scaled, binary_template_path):
+                                continue
+                            # ตัดขนาด drawing_layer ให้เท่ากับ cookie_image_scaled
+                            # (เป็น surface ใหม่เสมอ เพราะ layer จริงยังถูกวาดต่อระหว่างคำนวณ)
+                            if cookie_size != drawing_size:
+                                drawing_portion = pygame.Surface(cookie_size, pygame.SRCALPHA)
+                                drawing_portion.fill((0, 0, 0, 0))  # โปร่งใส
+                                drawing_portion.blit(player.drawing_app.draw_layer(), (0, 0),
+                                                     (offset_x, offset_y, cookie_size[0], cookie_size[1]))
+                            else:
+                                drawing_portion = player.drawing_app.draw_layer().copy()
+                            if (player_scorer.submit(player, drawing_portion, cookie_image_scaled, binary_template_path,
+                                                     save_debug=player is debug_player) and session_recorder):
+                                session_recorder.score(player.player_id)
+                        frame_scheduler.record("scoring", time.perf_counter() - scoring_start)
                     except Exception as e:
                         print(f"Error measuring drawing: {e}")
                         import traceback
@@ -545,119 +638,166 @@ while running:
                                 "similarity": 0
                             }
 
-                # แสดงผลลัพธ์การวัดบนหน้าจอ (ใช้ค่าล่าสุดที่คำนวณไว้)
-                if latest_metrics:
-                    y_offset = 20
-                    # แสดงคะแนนรวม
-                    score_text = font.render(f"Score: {latest_metrics['overall_score']:.1f}%", True, (255, 0, 0))
-                    screen.blit(score_text, (WIDTH - score_text.get_width() - 20, y_offset))
-                    y_offset += 50
-                    
-                    # แสดงความครอบคลุม
-                    coverage_text = font.render(f"Coverage: {latest_metrics['coverage']:.1f}%", True, (0, 255, 0))
-                    screen.blit(coverage_text, (WIDTH - coverage_text.get_width() - 20, y_offset))
-                    y_offset += 40
-                    
-                    # แสดงค่านอกขอบเขต
-                    out_text = font.render(f"Out of bounds: {latest_metrics['out_of_bounds']:.1f}%", True, (255, 0, 0))
-                    screen.blit(out_text, (WIDTH - out_text.get_width() - 20, y_offset))
-                    y_offset += 40
-                    
-                    # แสดงค่าความแม่นยำ
-                    if latest_metrics['accuracy'] is not None:
-                        accuracy_text = font.render(f"Accuracy: {latest_metrics['accuracy']:.1f}%", True, (0, 0, 255))
-                        screen.blit(accuracy_text, (WIDTH - accuracy_text.get_width() - 20, y_offset))
-                    
-                    # แสดงค่าความคล้ายคลึง
-                    if latest_metrics['similarity'] is not None:
-                        similarity_text = font.render(f"Similarity: {latest_metrics['similarity']:.1f}%", True, (0, 0, 255))
-                        screen.blit(similarity_text, (WIDTH - similarity_text.get_width() - 20, y_offset + 40))
-
-                # แสดงสถานะเปิด/ปิด template
-                template_status = "ON" if show_template else "OFF"
-                template_text = font.render(f"Template: {template_status} (T)", True, (255, 255, 255))
-                screen.blit(template_text, (20, 20))
+                # เก็บคะแนนที่คำนวณเสร็จแล้ว คะแนนที่ใช้ตัดสินคือของผู้เล่นที่คะแนนสูงสุด
+                scored_players = player_scorer.collect(player_tracker.players)
+                if session_recorder:
+                    for player in scored_players:
+                        session_recorder.metrics(player.player_id, player.latest_metrics)
+                leader = player_tracker.leader()
+                if leader.latest_metrics:
+                    latest_metrics = leader.latest_metrics
 
                 # จับเวลาเริ่มเกมและเล่นเพลงในเกม
                 if game_start_time is None:
-                    game_start_time = pygame.time.get_ticks()
+                    game_start_time = frame_scheduler.logic_time_ms
                     sound_manager.play_in_game_music()
 
-                # คำนวณเวลาและแสดงนับถอยหลังบนหน้าจอ
-                elapsed_time = pygame.time.get_ticks() - game_start_time
+                # คำนวณเวลาที่เหลือของเกม
+                elapsed_time = frame_scheduler.logic_time_ms - game_start_time
                 remaining_time = max(0, game_duration - elapsed_time)
-                minutes = remaining_time // 60000
-                seconds = (remaining_time // 1000) % 60
-                time_text = time_font.render(f"{minutes:02}:{seconds:02}", True, RED)
-                screen.blit(time_text, ((WIDTH - time_text.get_width()) // 2, 80))
+
+                # render ข้อความของ HUD ใหม่ตามรอบของงาน "hud" (เฟรมอื่นใช้ surface เดิม)
+                if hud_items is None or frame_scheduler.due("hud"):
+                    with frame_scheduler.measure("hud"):
+                        hud_items = []
+                        # แสดงผลลัพธ์การวัดบนหน้าจอ (ใช้ค่าล่าสุดที่คำนวณไว้)
+                        if latest_metrics:
+                            y_offset = 20
+                            # แสดงคะแนนรวม
+                            score_text = font.render(f"Score: {latest_metrics['overall_score']:.1f}%", True, (255, 0, 0))
+                            hud_items.append((score_text, (WIDTH - score_text.get_width() - 20, y_offset)))
+                            y_offset += 50
+
+                            # แสดงความครอบคลุม
+                            coverage_text = font.render(f"Coverage: {latest_metrics['coverage']:.1f}%", True, (0, 255, 0))
+                            hud_items.append((coverage_text, (WIDTH - coverage_text.get_width() - 20, y_offset)))
+                            y_offset += 40
+
+                            # แสดงค่านอกขอบเขต
+                            out_text = font.render(f"Out of bounds: {latest_metrics['out_of_bounds']:.1f}%", True, (255, 0, 0))
+                            hud_items.append((out_text, (WIDTH - out_text.get_width() - 20, y_offset)))
+                            y_offset += 40
+
+                            # แสดงค่าความแม่นยำ
+                            if latest_metrics['accuracy'] is not None:
+                                accuracy_text = font.render(f"Accuracy: {latest_metrics['accuracy']:.1f}%", True, (0, 0, 255))
+                                hud_items.append((accuracy_text, (WIDTH - accuracy_text.get_width() - 20, y_offset)))
+
+                            # แสดงค่าความคล้ายคลึง
+                            if latest_metrics['similarity'] is not None:
+                                similarity_text = font.render(f"Similarity: {latest_metrics['similarity']:.1f}%", True, (0, 0, 255))
+                                hud_items.append((similarity_text, (WIDTH - similarity_text.get_width() - 20, y_offset + 40)))
+
+                        # แสดงสถานะเปิด/ปิด template
+                        template_status = "ON" if show_template else "OFF"
+                        template_text = font.render(f"Template: {template_status} (T)", True, (255, 255, 255))
+                        hud_items.append((template_text, (20, 20)))
+
+                        # คะแนนของแต่ละผู้เล่น (เฉพาะโหมดหลายผู้เล่น)
+                        if player_tracker.num_players > 1:
+                            for i, player in enumerate(player_tracker.players):
+                                player_score = player.latest_metrics["overall_score"] if player.latest_metrics else 0.0
+                                player_text = font.render(f"{player.name}: {player_score:.1f}%", True, player.color)
+                                hud_items.append((player_text, (20, 70 + i * 45)))
+
+                        # แสดงนับถอยหลังของเวลาเกม
+                        minutes = remaining_time // 60000
+                        seconds = (remaining_time // 1000) % 60
+                        time_text = time_font.render(f"{minutes:02}:{seconds:02}", True, RED)
+                        hud_items.append((time_text, ((WIDTH - time_text.get_width()) // 2, 80)))
+
+                for hud_surface, hud_position in hud_items:
+                    hud_rects.append(screen.blit(hud_surface, hud_position))
                 
-                current_time = pygame.time.get_ticks()
-                elapsed_since_start = current_time - game_start_time if game_start_time else 0
+                current_time = frame_scheduler.logic_time_ms
+
+                # logic ที่ขึ้นกับเวลาของเกม ทำทีละรอบของ logic (timestep คงที่) ไม่ใช่ทีละเฟรมที่ render
+                for step in frame_scheduler.steps():
+                    step_time = frame_scheduler.step_time_ms(step)
+                    elapsed_since_start = step_time - game_start_time
+
+                    # หมดเวลาเกม (ข้อความ "Time's Up!" และการกลับเมนูอยู่ด้านล่าง)
+                    if elapsed_since_start >= game_duration and game_over_time is None:
+                        game_over_time = step_time
+                        if session_recorder:
+                            session_recorder.result("time_up", player_tracker.leader().player_id)
+                        pygame.mixer.music.stop()
 
-                # ตรวจสอบเงื่อนไขชนะ-แพ้เฉพาะเมื่อเกมกำลังดำเนินอยู่และไม่มีผลลัพธ์
-                if (difficulty and latest_metrics and game_result is None and 
-                        elapsed_since_start > min_drawing_time and 
-                        current_time - last_check_time > result_cooldown):
+                    # ตรวจสอบเงื่อนไขชนะ-แพ้เฉพาะเมื่อเกมกำลังดำเนินอยู่และไม่มีผลลัพธ์
+                    # เช็คทุก RESULT_CHECK_STEPS รอบ และเฉพาะเมื่อคะแนนเป็นของภาพปัจจุบันแล้ว (การให้คะแนนทำแบบ async)
+                    # ภาพที่ไม่เปลี่ยนตั้งแต่เช็คครั้งก่อนนับว่าคงที่เลยโดยไม่ต้องให้คะแนนซ้ำ
+                    if (step % RESULT_CHECK_STEPS == 0 and difficulty and latest_metrics and game_result is None and
+                            leader.metrics_version == leader.drawing_app.version and
+                            elapsed_since_start > min_drawing_time):
                     
-                    # ทำสำเนาเมทริกซ์ปัจจุบันเพื่อเปรียบเทียบ
-                    current_metrics_copy = {}
-                    for key in ['overall_score', 'coverage', 'out_of_bounds', 'similarity']:
-                        if key in latest_metrics:
-                            current_metrics_copy[key] = latest_metrics[key]
+                        # ทำสำเนาเมทริกซ์ปัจจุบันเพื่อเปรียบเทียบ (พร้อมรุ่นของภาพที่ถูกให้คะแนน)
+                        current_metrics_copy = {"version": (leader.player_id, leader.metrics_version)}
+                        for key in ['overall_score', 'coverage', 'out_of_bounds', 'similarity']:
+                            if key in latest_metrics:
+                                current_metrics_copy[key] = latest_metrics[key]
                     
-                    # ตรวจสอบความคงที่ของเมทริกซ์เฉพาะเมื่อมีค่า last_metrics
-                    if last_metrics:
-                        if metrics_are_stable(current_metrics_copy, last_metrics):
-                            metrics_stable_count += 1
-                            print(f"Metrics stable: {metrics_stable_count}/{required_stable_metrics}")
+                        # ตรวจสอบความคงที่ของเมทริกซ์เฉพาะเมื่อมีค่า last_metrics
+                        if last_metrics:
+                            if metrics_are_stable(current_metrics_copy, last_metrics):
+                                metrics_stable_count += 1
+                                print(f"Metrics stable: {metrics_stable_count}/{required_stable_metrics}")
+                            else:
+                                # รีเซ็ตตัวนับเมื่อเมทริกซ์เปลี่ยนแปลง
+                                metrics_stable_count = 0
+                                print("Metrics changed, resetting stability counter")
                         else:
-                            # รีเซ็ตตัวนับเมื่อเมทริกซ์เปลี่ยนแปลง
-                            metrics_stable_count = 0
-                            print("Metrics changed, resetting stability counter")
-                    else:
-                        # กรณีที่เพิ่งเริ่มต้น ให้ข้ามการตรวจสอบความคงที่ครั้งแรก
-                        print("First metrics check, initializing last_metrics")
+                            # กรณีที่เพิ่งเริ่มต้น ให้ข้ามการตรวจสอบความคงที่ครั้งแรก
+                            print("First metrics check, initializing last_metrics")
                     
-                    # เก็บเมทริกซ์ปัจจุบันเป็นเมทริกซ์ล่าสุดสำหรับการเปรียบเทียบครั้งต่อไป
-                    last_metrics = current_metrics_copy
-                    last_check_time = current_time
+                        # เก็บเมทริกซ์ปัจจุบันเป็นเมทริกซ์ล่าสุดสำหรับการเปรียบเทียบครั้งต่อไป
+                        last_metrics = current_metrics_copy
                     
-                    # ประเมินผลเมื่อเมทริกซ์คงที่เพียงพอ
-                    if metrics_stable_count >= required_stable_metrics:
-                        print(f"Metrics stable for {required_stable_metrics} checks, evaluating win/lose condition")
-                        # ตรวจสอบว่ามีการวาดเพียงพอแล้วหรือไม่ (ป้องกันการชนะ/แพ้เมื่อยังไม่ได้วาด)
-                        if latest_metrics['coverage'] > 5.0:  # มีการวาดอย่างน้อย 5% ของพื้นที่
-                            # ประเมินเงื่อนไขชนะ-แพ้
-                            result = evaluate_win_condition(latest_metrics, difficulty)
+                        # ประเมินผลเมื่อเมทริกซ์คงที่เพียงพอ
+                        if metrics_stable_count >= required_stable_metrics:
+                            print(f"Metrics stable for {required_stable_metrics} checks, evaluating win/lose condition")
+                            # ตรวจสอบว่ามีการวาดเพียงพอแล้วหรือไม่ (ป้องกันการชนะ/แพ้เมื่อยังไม่ได้วาด)
+                            if latest_metrics['coverage'] > 5.0:  # มีการวาดอย่างน้อย 5% ของพื้นที่
+                                # ประเมินเงื่อนไขชนะ-แพ้
+                                result = evaluate_win_condition(latest_metrics, difficulty)
                             
-                            if result:  # ถ้าได้ผลลัพธ์ชนะหรือแพ้
-                                game_result = result
-                                result_time = current_time
-                                result_effect_active = True
-                                result_effect_start = current_time
-                                metrics_stable_count = 0  # รีเซ็ตตัวนับ
-                                print(f"Game result: {result}")
-                        else:
-                            print("Not enough drawing yet, skipping win/lose evaluation")
+                                if result:  # ถ้าได้ผลลัพธ์ชนะหรือแพ้
+                                    game_result = result
+                                    if session_recorder:
+                                        session_recorder.result(result, player_tracker.leader().player_id)
+                                    result_time = step_time
+                                    result_effect_active = True
+                                    result_effect_start = step_time
+                                    metrics_stable_count = 0  # รีเซ็ตตัวนับ
+                                    print(f"Game result: {result}")
+                            else:
+                                print("Not enough drawing yet, skipping win/lose evaluation")
 
                 # แสดงข้อความชนะ-แพ้ถ้ามีการกำหนดผลลัพธ์
                 if game_result:
                     display_result_message(screen, game_result, latest_metrics, difficulty, time_font, font)
+                    if player_tracker.num_players > 1:
+                        leader_text = font.render(f"Best: {leader.name}", True, leader.color)
+                        hud_rects.append(screen.blit(leader_text, ((WIDTH - leader_text.get_width()) // 2, HEIGHT - 120)))
                     
                     # ถ้าแสดงผลเพียงพอแล้ว ให้รีเซ็ตเกมเหมือนตอนหมดเวลา
                     if current_time - result_time > result_display_time:
                         print(f"Game {game_result}, resetting to main menu")
                         # รีเซ็ตสถานะเกม
-                        drawing_app.reset()
+                        player_tracker.reset()
+                        if session_recorder:
+                            session_landmarks.close()
+                            session_recorder.close()
+                            session_recorder = None
+                        player_scorer.cancel()
                         main_menu = True
                         difficulty_selected = False
                         start_game_page = False
                         countdown = False
                         countdown_time = 3
                         game_start_time = None
-                        cookie_image = None
+                        cookie_asset = None
                         game_over_time = None
-                        binary_template_surface = None
+                        template_asset = None
                         latest_metrics = None
                         game_result = None
                         result_time = None
@@ -665,35 +805,54 @@ while running:
                         result_effect_start = None
                         metrics_stable_count = 0
                         last_metrics = None
+                        hud_items = None
                         pygame.mixer.music.stop()
                         sound_manager.play_bg_music()
 
 
 
                 # เมื่อหมดเวลาเกม
-                if remaining_time <= 0:
-                    if game_over_time is None:
-                        game_over_time = pygame.time.get_ticks()
-                        pygame.mixer.music.stop()
+                if game_over_time is not None:
                     title_text = font.render("Time's Up!", True, RED)
                     screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2,
                                              HEIGHT // 2 - title_text.get_height() // 2))
-                    if pygame.time.get_ticks() - game_over_time >= 2000:
+                    if frame_scheduler.logic_time_ms - game_over_time >= 2000:
                         # รีเซ็ตสถานะเกม
-                        drawing_app.reset()
+                        player_tracker.reset()
+                        if session_recorder:
+                            session_landmarks.close()
+                            session_recorder.close()
+                            session_recorder = None
+                        player_scorer.cancel()
                         main_menu = True
                         difficulty_selected = False
                         start_game_page = False
                         countdown = False
                         countdown_time = 3
                         game_start_time = None
-                        cookie_image = None
+                        cookie_asset = None
                         game_over_time = None
-                        binary_template_surface = None
+                        template_asset = None
                         latest_metrics = None
+                        hud_items = None
                         sound_manager.play_bg_music()
                 
 
+    # แสดงสถานะกล้องเมื่อมีปัญหา (อ่านภาพไม่ได้ / กำลังเชื่อมต่อใหม่)
+    camera_health = hand_tracker.get_health()
+    if camera_health["state"] not in ("ok", "paused"):
+        if camera_health["state"] == "lost":
+            health_message = f"Camera lost - reconnecting... ({camera_health['since_last_good']:.0f}s)"
+            health_color = (255, 50, 50)
+        elif camera_health["inference_failures"]:
+            health_message = "Hand tracking worker stopped - using slower fallback"
+            health_color = (255, 150, 50)
+        else:
+            health_message = f"Camera unstable ({camera_health['failed_reads']} failed reads)"
+            health_color = (255, 150, 50)
+        health_text = font.render(health_message, True, health_color)
+        hud_rects.append(screen.blit(health_text, (20, HEIGHT - health_text.get_height() - 20)))
+
     # จับ event
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -702,14 +861,28 @@ while running:
         # จับการกดปุ่ม
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_r:
-                # กด r เพื่อลบเส้นที่วาด
-                drawing_app.reset()
+                # กด r เพื่อลบเส้นที่วาด (ของทุกผู้เล่น)
+                for player in player_tracker.players:
+                    player.drawing_app.reset()
+                if session_recorder:
+                    session_recorder.event("reset")
+            elif event.key in (pygame.K_z, pygame.K_y) and countdown and countdown_time == 0:
+                # กด z เพื่อ undo เส้นล่าสุด, y เพื่อ redo (ของผู้เล่นคนแรก)
+                undo_requests.append((player_tracker.players[0], event.key == pygame.K_y))
+            elif main_menu and pygame.K_1 <= event.key < pygame.K_1 + MAX_PLAYERS:
+                # กด 1-4 ที่หน้าเมนูเพื่อเลือกจำนวนผู้เล่น
+                player_tracker.set_num_players(event.key - pygame.K_1 + 1)
             elif event.key == pygame.K_ESCAPE:
                 # กด ESC เพื่อออกจากเกม
                 running = False
             elif event.key == pygame.K_t:
                 # กด t เพื่อเปิด/ปิดการแสดง template
                 show_template = not show_template
+                compositor.invalidate()
+                hud_items = None
+            elif event.key == pygame.K_d:
+                # กด d เพื่อเปิด/ปิด overlay โครงมือสำหรับ debug
+                show_debug_overlay = not show_debug_overlay
 
         if event.type == pygame.MOUSEBUTTONDOWN:
             mouse_x, mouse_y = pygame.mouse.get_pos()
@@ -732,35 +905,50 @@ while running:
                     if button_y_start < mouse_y < button_y_start + button_height:
                         difficulty = "Easy"
                         sound_manager.play_click_sound()
-                        cookie_image = pygame.image.load("assets/cookie_template_easy.png")
+                        cookie_asset = "cookie_easy"
                         # โหลด binary template ด้วยฟังก์ชันที่สร้างไว้
-                        binary_template_surface = load_binary_template("Easy")
+                        template_asset = load_binary_template("Easy")
                         start_game_page = True
                     elif button_y_start + button_height + button_spacing < mouse_y < button_y_start + button_height * 2 + button_spacing:
                         difficulty = "Normal"
                         sound_manager.play_click_sound()
-                        cookie_image = pygame.image.load("assets/cookie_template_normal.png")
+                        cookie_asset = "cookie_normal"
                         # โหลด binary template ด้วยฟังก์ชันที่สร้างไว้
-                        binary_template_surface = load_binary_template("Normal")
+                        template_asset = load_binary_template("Normal")
                         start_game_page = True
                     elif button_y_start + (button_height + button_spacing) * 2 < mouse_y < button_y_start + (button_height + button_spacing) * 3:
                         difficulty = "Hard"
                         sound_manager.play_click_sound()
-                        cookie_image = pygame.image.load("assets/cookie_template_hard.png")
+                        cookie_asset = "cookie_hard"
                         # โหลด binary template ด้วยฟังก์ชันที่สร้างไว้
-                        binary_template_surface = load_binary_template("Hard")
+                        template_asset = load_binary_template("Hard")
                         start_game_page = True
 
             # เมื่ออยู่ในหน้า Start Game ให้เริ่มนับถอยหลัง
-            if start_game_page and cookie_image:
+            if start_game_page and cookie_asset:
                 difficulty_selected = False
                 pygame.mixer.music.stop()
                 print(f"Starting Game with Difficulty: {difficulty}")
                 countdown = True
-                countdown_start = time.time()
-
-    pygame.display.flip()
+                countdown_elapsed = 0.0
 
-hand_tracker.stop()
+    # เฟรมที่เพิ่งได้ผลชนะ/แพ้หรือหมดเวลามีข้อความเต็มจอ ต้อง flip ทั้งจอ
+    if partial_redraw and game_result is None and game_over_time is None:
+        pygame.display.update(dirty_rects + hud_rects)
+    else:
+        pygame.display.flip()
+
+    # รอจนถึงเวลาของเฟรมถัดไป (หน้าเมนูไม่มีอะไรเคลื่อนไหวมาก ใช้ fps ต่ำกว่า)
+    frame_scheduler.end_frame(GAME_FPS if countdown else MENU_FPS)
+
+frame_stats = frame_scheduler.stats()
+print(f"Frames: {frame_stats['frames']}, missed budget: {frame_stats['missed_frames']}, "
+      f"dropped logic steps: {frame_stats['dropped_steps']}, skipped: {frame_stats['skipped']}")
+if session_recorder:
+    session_landmarks.close()
+    session_recorder.close()
+player_scorer.close()
+player_tracker.close()
+hand_tracker.close()
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -42,13 +42,14 @@ class ShapeMeasure:
         return binary
         
     @staticmethod
-    def calculate_coverage(drawing_surface, template_surface):
+    def calculate_coverage(drawing_surface, template_surface, save_debug=True):
         """
         Calculate the coverage ratio: intersection area / template area
         
         Args:
             drawing_surface: The Pygame surface containing the user's drawing
             template_surface: The Pygame surface containing the template
+            save_debug: Write the binary images to debug_*.png
             
         Returns:
             float: Coverage percentage (0-100)
@@ -63,8 +64,9 @@ class ShapeMeasure:
                 template_binary = cv2.resize(template_binary, 
                                            (drawing_binary.shape[1], drawing_binary.shape[0]))
                 
-            cv2.imwrite('debug_drawing_cov.png', drawing_binary)
-            cv2.imwrite('debug_template_cov.png', template_binary)
+            if save_debug:
+                cv2.imwrite('debug_drawing_cov.png', drawing_binary)
+                cv2.imwrite('debug_template_cov.png', template_binary)
             
             # คำนวณ intersection (พิกเซลที่อยู่ทั้งในภาพวาดและ template)
             intersection = cv2.bitwise_and(drawing_binary, template_binary)
@@ -92,13 +94,14 @@ class ShapeMeasure:
             return 0.0
         
     @staticmethod
-    def calculate_out_of_bounds(drawing_surface, template_surface):
+    def calculate_out_of_bounds(drawing_surface, template_surface, save_debug=True):
         """
         Calculate the out-of-bounds ratio: (drawing area - intersection) / drawing area
         
         Args:
             drawing_surface: The Pygame surface containing the user's drawing
             template_surface: The Pygame surface containing the template
+            save_debug: Write the binary images to debug_*.png
             
         Returns:
             float: Out-of-bounds percentage (0-100)
@@ -114,8 +117,9 @@ class ShapeMeasure:
                                            (drawing_binary.shape[1], drawing_binary.shape[0]))
                 
             
-            cv2.imwrite('debug_drawing_ofb.png', drawing_binary)
-            cv2.imwrite('debug_template_ofb.png', template_binary)
+            if save_debug:
+                cv2.imwrite('debug_drawing_ofb.png', drawing_binary)
+                cv2.imwrite('debug_template_ofb.png', template_binary)
             
             # Calculate intersection
             intersection = cv2.bitwise_and(drawing_binary, template_binary)
@@ -140,13 +144,14 @@ class ShapeMeasure:
             return 0.0
     
     @staticmethod
-    def calculate_similarity(drawing_surface, template_surface):
+    def calculate_similarity(drawing_surface, template_surface, save_debug=True):
         """
         Calculate the structural similarity between the drawing and template
         
         Args:
             drawing_surface: The Pygame surface containing the user's drawing
             template_surface: The Pygame surface containing the template
+            save_debug: Write the binary images to debug_*.png
             
         Returns:
             float: Similarity score (0-100)
@@ -161,8 +166,9 @@ class ShapeMeasure:
                 template_binary = cv2.resize(template_binary, 
                                           (drawing_binary.shape[1], drawing_binary.shape[0]))
                 
-            cv2.imwrite('debug_drawing_sim.png', drawing_binary)
-            cv2.imwrite('debug_template_sim.png', template_binary)
+            if save_debug:
+                cv2.imwrite('debug_drawing_sim.png', drawing_binary)
+                cv2.imwrite('debug_template_sim.png', template_binary)
             
             # Calculate structural similarity
             score, _ = ssim(drawing_binary, template_binary, full=True, data_range=255)
@@ -177,13 +183,14 @@ class ShapeMeasure:
             return 0.0
     
     @staticmethod
-    def calculate_accuracy(drawing_surface, binary_template_path):
+    def calculate_accuracy(drawing_surface, binary_template_path, save_debug=True):
         """
         Calculate the accuracy based on how well the drawing follows the template lines
         
         Args:
             drawing_surface: The Pygame surface containing the user's drawing
             binary_template_path: Path to the binary template image file
+            save_debug: Write the binary images to debug_*.png
             
         Returns:
             float: Accuracy score (0-100)
@@ -237,8 +244,9 @@ class ShapeMeasure:
                                        (drawing_binary.shape[1], drawing_binary.shape[0]))
             
             # ดีบัก: บันทึกรูปภาพเพื่อตรวจสอบ
-            cv2.imwrite('debug_binary_drawing_acc.png', drawing_binary)
-            cv2.imwrite('debug_binary_template_acc.png', binary_template)
+            if save_debug:
+                cv2.imwrite('debug_binary_drawing_acc.png', drawing_binary)
+                cv2.imwrite('debug_binary_template_acc.png', binary_template)
             
             # สร้าง distance transform จาก template
             # นี่จะให้ค่าระยะห่างจากเส้น template ที่ใกล้ที่สุดสำหรับแต่ละพิกเซล
@@ -289,7 +297,7 @@ class ShapeMeasure:
             return 0.0
     
     @staticmethod
-    def evaluate_drawing(drawing_surface, template_surface, binary_template_path=None):
+    def evaluate_drawing(drawing_surface, template_surface, binary_template_path=None, save_debug=True):
         """
         Comprehensive evaluation of a drawing against a template
         
@@ -297,6 +305,7 @@ class ShapeMeasure:
             drawing_surface: The Pygame surface containing the user's drawing
             template_surface: The Pygame surface containing the template
             binary_template_path: Optional path to a pre-processed binary template
+            save_debug: Write the intermediate binary images to debug_*.png
             
         Returns:
             dict: Dictionary containing all metrics
@@ -305,14 +314,14 @@ class ShapeMeasure:
             print("\n--- EVALUATING DRAWING ---")
             
             # Calculate basic metrics
-            coverage = ShapeMeasure.calculate_coverage(drawing_surface, template_surface)
-            out_of_bounds = ShapeMeasure.calculate_out_of_bounds(drawing_surface, template_surface)
-            similarity = ShapeMeasure.calculate_similarity(drawing_surface, template_surface)
+            coverage = ShapeMeasure.calculate_coverage(drawing_surface, template_surface, save_debug)
+            out_of_bounds = ShapeMeasure.calculate_out_of_bounds(drawing_surface, template_surface, save_debug)
+            similarity = ShapeMeasure.calculate_similarity(drawing_surface, template_surface, save_debug)
             
             # Calculate accuracy if binary template is provided
             accuracy = 0.0
             if binary_template_path:
-                accuracy = ShapeMeasure.calculate_accuracy(drawing_surface, binary_template_path)
+                accuracy = ShapeMeasure.calculate_accuracy(drawing_surface, binary_template_path, save_debug)
             
             # Combine metrics into overall score
             if binary_template_path:
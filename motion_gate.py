@@ -0,0 +1,114 @@
+import cv2
+import numpy as np
+
+from landmark_provider import LandmarkFrame
+
+
+class MotionGate:
+    """
+    ข้าม inference ของ MediaPipe เมื่อมือแทบไม่ขยับ โดยใช้พิกัดมือของเฟรมก่อนหน้าแทน
+
+    ภาพทุกเฟรมถูกย่อเป็นภาพขาวดำขนาด sample_size แล้วเทียบค่าต่างเฉลี่ย (0-255)
+    เฉพาะในกรอบรอบมือล่าสุด กับภาพของเฟรมที่ทำ inference ครั้งล่าสุด
+    ถ้าต่างกันน้อยกว่า threshold จะข้ามเฟรมนั้น แต่จะบังคับ inference อย่างน้อยทุก max_skip เฟรม
+    ถ้ายังไม่เจอมือจะทำ inference ทุกเฟรมเสมอ (ต้องหามือที่เพิ่งเข้ามา)
+
+    Args:
+        threshold: ค่าต่างเฉลี่ยของ pixel ที่ถือว่ามือขยับ
+        max_skip: จำนวนเฟรมที่ข้ามติดกันได้มากที่สุดก่อนบังคับ inference
+        sample_size: ขนาด (width, height) ของภาพย่อที่ใช้เทียบ
+        margin: สัดส่วนที่ขยายออกจากกรอบของมือในแต่ละด้าน
+        enabled: เปิดใช้งานหรือไม่ (ปิดแล้วทุกเฟรมจะทำ inference)
+    """
+
+    def __init__(self, threshold=3.0, max_skip=5, sample_size=(160, 120), margin=0.25, enabled=True):
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.sample_size = tuple(sample_size)
+        self.margin = margin
+        self.enabled = enabled
+        self._reference = None  # ภาพย่อของเฟรมที่ทำ inference ครั้งล่าสุด
+        self._skipped_in_row = 0
+
+        # สถิติสำหรับปรับค่า threshold / max_skip
+        self.frames = 0
+        self.inferred = 0
+        self.skipped = 0
+        self.forced = 0
+        self.last_motion = 0.0
+
+    def reset(self):
+        self._reference = None
+        self._skipped_in_row = 0
+
+    def should_infer(self, frame, previous):
+        """
+        ตัดสินว่าเฟรมนี้ต้องส่งให้ MediaPipe หรือไม่
+
+        Args:
+            frame: ภาพ BGR ของเฟรมปัจจุบัน
+            previous: LandmarkFrame ล่าสุดของ provider (หรือ None)
+
+        Returns:
+            bool: True ถ้าต้องทำ inference
+        """
+        self.frames += 1
+        if not self.enabled or previous is None or not previous.hands:
+            self.reset()
+            self.inferred += 1
+            return True
+
+        sample = cv2.cvtColor(cv2.resize(frame, self.sample_size, interpolation=cv2.INTER_AREA),
+                              cv2.COLOR_BGR2GRAY)
+        if self._reference is None or self._skipped_in_row >= self.max_skip:
+            if self._reference is not None:
+                self.forced += 1
+            return self._infer(sample)
+
+        x0, y0, x1, y1 = self._hand_box(previous.hands)
+        self.last_motion = float(cv2.absdiff(sample[y0:y1, x0:x1], self._reference[y0:y1, x0:x1]).mean())
+        if self.last_motion >= self.threshold:
+            return self._infer(sample)
+
+        self._skipped_in_row += 1
+        self.skipped += 1
+        return False
+
+    def _infer(self, sample):
+        self._reference = sample
+        self._skipped_in_row = 0
+        self.inferred += 1
+        return True
+
+    def _hand_box(self, hands):
+        """กรอบรอบมือทุกมือ (ขยายด้วย margin) ในพิกัดของภาพย่อ"""
+        w, h = self.sample_size
+        points = np.concatenate([hand[:, :2] for hand in hands])
+        (min_x, min_y), (max_x, max_y) = points.min(axis=0), points.max(axis=0)
+        pad_x = (max_x - min_x) * self.margin
+        pad_y = (max_y - min_y) * self.margin
+        x0 = int(np.clip((min_x - pad_x) * w, 0, w - 1))
+        y0 = int(np.clip((min_y - pad_y) * h, 0, h - 1))
+        x1 = int(np.clip((max_x + pad_x) * w, x0 + 1, w))
+        y1 = int(np.clip((max_y + pad_y) * h, y0 + 1, h))
+        return x0, y0, x1, y1
+
+    @staticmethod
+    def reuse(previous, timestamp):
+        """สร้าง LandmarkFrame ของเฟรมที่ถูกข้าม จากพิกัดมือของเฟรมก่อนหน้า"""
+        return LandmarkFrame(previous.hands, previous.frame_size, timestamp, previous.handedness)
+
+    def stats(self):
+        """
+        Returns:
+            dict: จำนวนเฟรมที่ตรวจ / ทำ inference / ข้าม / ถูกบังคับ และสัดส่วนที่ข้าม
+        """
+        return {
+            "enabled": self.enabled,
+            "frames": self.frames,
+            "inferred": self.inferred,
+            "skipped": self.skipped,
+            "forced": self.forced,
+            "skip_rate": self.skipped / self.frames if self.frames else 0.0,
+            "last_motion": self.last_motion,
+        }
@@ -0,0 +1,169 @@
+import cv2
+import numpy as np
+
+from drawing import LINE_WIDTH
+from measure import ShapeMeasure
+
+# น้ำหนักของคะแนนรวม (เหมือน ShapeMeasure.evaluate_drawing แต่ไม่มี similarity ซึ่งต้องใช้ภาพทั้งภาพ)
+PATH_WEIGHTS = {"coverage": 0.3, "in_bounds": 0.2, "accuracy": 0.3}
+PATH_WEIGHTS_NO_ACCURACY = {"coverage": 0.4, "in_bounds": 0.3}
+
+
+class PathTemplate:
+    """
+    Precomputed lookups of one template for PathMeasure
+
+    Built once per template (not per evaluation): the filled mask uses the same
+    threshold as ShapeMeasure.calculate_coverage, the distance field the same
+    transform as ShapeMeasure.calculate_accuracy. Both are summed over square
+    cells of `cell` pixels so an evaluation only reads the cells under the ink.
+
+    Args:
+        template_surface: The Pygame surface containing the template (cookie image)
+        binary_template_path: Optional path to the binary outline used for accuracy
+        cell: Cell size in pixels
+    """
+
+    def __init__(self, template_surface, binary_template_path=None, cell=4):
+        self.source = template_surface
+        self.cell = cell
+        self.binary_template_path = binary_template_path
+        self.mask = ShapeMeasure.get_binary_image(template_surface, threshold=120) > 0
+        self.height, self.width = self.mask.shape
+        self.area = int(np.count_nonzero(self.mask))
+
+        self.distance = None
+        self.max_distance = 0.0
+        if binary_template_path:
+            binary_template = cv2.imread(binary_template_path, cv2.IMREAD_GRAYSCALE)
+            if binary_template is None:
+                print(f"Could not load binary template from {binary_template_path}")
+            else:
+                binary_template = cv2.resize(binary_template, (self.width, self.height))
+                self.distance = cv2.distanceTransform(255 - binary_template, cv2.DIST_L2, 3)
+                self.max_distance = float(np.max(self.distance))
+
+        # ผลรวมต่อช่อง: จำนวนพิกเซลของ template, ผลรวมระยะห่าง และจำนวนพิกเซลที่อยู่ใกล้เส้น
+        self.cells_x = -(-self.width // cell)
+        self.cells_y = -(-self.height // cell)
+        self.mask_count = self._cell_sum(self.mask.astype(np.float64))
+        if self.distance is not None and self.max_distance > 0:
+            self.distance_sum = self._cell_sum(self.distance.astype(np.float64))
+            self.close_count = self._cell_sum((self.distance < self.max_distance * 0.1).astype(np.float64))
+
+    def _cell_sum(self, image):
+        padded = np.zeros((self.cells_y * self.cell, self.cells_x * self.cell))
+        padded[:self.height, :self.width] = image
+        return padded.reshape(self.cells_y, self.cell, self.cells_x, self.cell).sum(axis=(1, 3)).ravel()
+
+
+class PathMeasure:
+    """
+    Score a drawing from its stroke polylines instead of the rasterized layer
+
+    Strokes are resampled at a fixed arc-length spacing and only the template
+    cells under the samples (widened by half the line width) are read, so the
+    cost grows with the stroke length and no full-canvas image operation runs
+    per evaluation.
+    Calibrate against the raster metrics with `python benchmark.py --path-scoring`.
+    """
+
+    @staticmethod
+    def resample(strokes, spacing=4.0):
+        """
+        Sample polylines every `spacing` pixels along their length
+
+        Args:
+            strokes: list of (n, >=2) arrays of x, y (e.g. StrokeStore.strokes())
+
+        Returns:
+            numpy.ndarray: (samples, 2) float array
+        """
+        samples = []
+        for stroke in strokes:
+            xy = np.asarray(stroke, dtype=np.float64)[:, :2]
+            # DrawingApp ไม่วาดเส้นที่มีจุดเดียว จึงไม่นับเช่นกัน
+            if len(xy) < 2:
+                continue
+            arc = np.concatenate(([0.0], np.cumsum(np.hypot(*np.diff(xy, axis=0).T))))
+            if arc[-1] <= 0:
+                continue
+            s = np.append(np.arange(0.0, arc[-1], spacing), arc[-1])
+            samples.append(np.column_stack((np.interp(s, arc, xy[:, 0]), np.interp(s, arc, xy[:, 1]))))
+        if not samples:
+            return np.empty((0, 2))
+        return np.concatenate(samples)
+
+    @staticmethod
+    def evaluate_paths(strokes, template, offset=(0, 0), spacing=4.0, line_width=LINE_WIDTH):
+        """
+        Estimate coverage, out-of-bounds and accuracy of a drawing from its strokes
+
+        Args:
+            strokes: list of stroke point arrays in screen coordinates
+            template: PathTemplate of the cookie being cut
+            offset: Screen position of the template's top-left corner
+            spacing: Arc-length spacing of the samples (pixels)
+            line_width: Width of the rendered ink (pixels)
+
+        Returns:
+            dict: Same keys as ShapeMeasure.evaluate_drawing (similarity is None)
+        """
+        samples = PathMeasure.resample(strokes, spacing) - np.asarray(offset, dtype=np.float64)
+        pixels = np.round(samples).astype(np.int64)
+        # เหมือนการตัด drawing layer เฉพาะส่วนใต้คุกกี้: จุดนอกกรอบไม่นับ
+        visible = ((pixels[:, 0] >= 0) & (pixels[:, 0] < template.width) &
+                   (pixels[:, 1] >= 0) & (pixels[:, 1] < template.height))
+        pixels = pixels[visible]
+        has_accuracy = template.binary_template_path is not None
+
+        if not len(pixels):
+            return {
+                "coverage": 0.0,
+                "out_of_bounds": 0.0,
+                "similarity": None,
+                "accuracy": 0.0 if has_accuracy else None,
+                "overall_score": PathMeasure._overall(0.0, 0.0, 0.0, has_accuracy),
+            }
+
+        # ช่องที่หมึกทับ: ช่องของทุกจุด ขยายออกไปครึ่งหนึ่งของความกว้างเส้น
+        # (ใช้ np.unique จึงไม่นับซ้ำเมื่อวาดทับที่เดิม)
+        cell = template.cell
+        reach = max(1, int(line_width // (2 * cell)))
+        cx = pixels[:, 0] // cell
+        cy = pixels[:, 1] // cell
+        offsets = np.arange(-reach, reach + 1)
+        cx = (cx[:, None, None] + offsets[None, None, :]).repeat(len(offsets), axis=1)
+        cy = (cy[:, None, None] + offsets[None, :, None]).repeat(len(offsets), axis=2)
+        valid = (cx >= 0) & (cx < template.cells_x) & (cy >= 0) & (cy < template.cells_y)
+        cells = np.unique(cy[valid] * template.cells_x + cx[valid])
+        ink_area = len(cells) * cell * cell
+
+        covered = float(template.mask_count[cells].sum())
+        coverage = 100.0 * covered / template.area if template.area else 0.0
+        out_of_bounds = 100.0 * max(0.0, ink_area - covered) / ink_area
+
+        accuracy = None
+        if has_accuracy:
+            accuracy = 0.0
+            if template.distance is not None and template.max_distance > 0:
+                point_ratio = float(template.close_count[cells].sum()) / ink_area
+                avg_dist = float(template.distance_sum[cells].sum()) / ink_area
+                dist_score = 100 * (1 - min(avg_dist / template.max_distance, 1.0))
+                accuracy = point_ratio * 50 + dist_score * 0.5
+
+        return {
+            "coverage": coverage,
+            "out_of_bounds": out_of_bounds,
+            "similarity": None,
+            "accuracy": accuracy,
+            "overall_score": PathMeasure._overall(coverage, out_of_bounds, accuracy or 0.0, has_accuracy),
+        }
+
+    @staticmethod
+    def _overall(coverage, out_of_bounds, accuracy, has_accuracy):
+        weights = PATH_WEIGHTS if has_accuracy else PATH_WEIGHTS_NO_ACCURACY
+        score = coverage * weights["coverage"] + (100 - out_of_bounds) * weights["in_bounds"]
+        if has_accuracy:
+            score += accuracy * weights["accuracy"]
+        return score / sum(weights.values())
@@ -0,0 +1,305 @@
+"""
+โหมดหลายผู้เล่น: ผู้เล่นแต่ละคนใช้มือหนึ่งข้าง มีเส้นวาด การ smooth และคะแนนของตัวเอง
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from drawing import DrawingApp
+from gesture_engine import GestureEngine, GestureRule
+from landmark_provider import INDEX_FINGER_TIP
+from measure import ShapeMeasure
+
+MAX_PLAYERS = 4
+PLAYER_COLORS = [(255, 0, 0), (0, 120, 255), (0, 200, 0), (255, 200, 0)]
+WRIST = 0
+# ท่ามือสำหรับ undo เส้นล่าสุด (แบมือ ต่างจากท่าชี้นิ้วที่ใช้วาดชัดเจน)
+UNDO_GESTURE = "open_palm"
+# จำนวนคะแนนที่จำไว้ต่อผู้เล่น (ใช้คืนคะแนนเมื่อ undo/redo กลับไปยังภาพที่เคยให้คะแนนแล้ว)
+MAX_METRICS_HISTORY = 64
+
+
+class Player:
+    """
+    ข้อมูลของผู้เล่นหนึ่งคน
+
+    Attributes:
+        anchor: พิกัด normalized ของข้อมือล่าสุด ใช้จับคู่มือในเฟรมถัดไป (None = ยังไม่มีมือ)
+        missed_frames: จำนวนเฟรมติดกันที่ไม่เจอมือของผู้เล่นนี้
+        latest_metrics: ผลของ ShapeMeasure.evaluate_drawing ล่าสุด
+        metrics_version: DrawingApp.version ของภาพที่ latest_metrics เป็นคะแนน (None = ไม่รู้)
+        metrics_history: คะแนนของภาพที่เคยให้คะแนนตอนยกปากกา (key คือ DrawingApp.state_key)
+        undo_requests: ท่า undo ที่ตรวจพบแล้วแต่ main loop ยังไม่ได้ทำ (เพิ่มจาก thread ที่ทำ inference)
+    """
+
+    def __init__(self, player_id, width, height, smoothing=5):
+        self.player_id = player_id
+        self.color = PLAYER_COLORS[player_id % len(PLAYER_COLORS)]
+        self.drawing_app = DrawingApp(width, height, color=self.color)
+        self.smooth_positions = deque(maxlen=smoothing)
+        self.anchor = None
+        self.missed_frames = 0
+        self.latest_metrics = None
+        self.metrics_version = None
+        self.metrics_history = {}
+        self.undo_gesture = GestureEngine([GestureRule.from_pattern(UNDO_GESTURE, window=0.3, cooldown=1.0)])
+        self.undo_requests = deque()
+
+    @property
+    def name(self):
+        return f"Player {self.player_id + 1}"
+
+    def release_hand(self):
+        self.anchor = None
+        self.missed_frames = 0
+        self.smooth_positions.clear()
+
+    def reset(self):
+        self.release_hand()
+        self.drawing_app.reset()
+        self.latest_metrics = None
+        self.metrics_version = None
+        self.metrics_history = {}
+        self.undo_gesture.reset()
+        self.undo_requests.clear()
+
+    def undo(self, redo=False):
+        """
+        undo (หรือ redo) เส้นล่าสุด แล้วคืนคะแนนเป็นของภาพนั้น (None ถ้าภาพนั้นยังไม่เคยถูกให้คะแนน)
+
+        Returns:
+            bool: True ถ้าภาพเปลี่ยน
+        """
+        changed = self.drawing_app.redo() if redo else self.drawing_app.undo()
+        if changed:
+            self.latest_metrics = self.metrics_history.get(self.drawing_app.state_key)
+            self.metrics_version = self.drawing_app.version if self.latest_metrics is not None else None
+        return changed
+
+    def remember_metrics(self, state_key, metrics):
+        if state_key is None:
+            return
+        self.metrics_history[state_key] = metrics
+        if len(self.metrics_history) > MAX_METRICS_HISTORY:
+            del self.metrics_history[next(iter(self.metrics_history))]
+
+
+class PlayerTracker:
+    """
+    จับคู่มือแต่ละข้างจาก HandLandmarkProvider เข้ากับผู้เล่น
+
+    มือในเฟรมใหม่ถูกจับคู่กับผู้เล่นที่ข้อมือล่าสุดอยู่ใกล้ที่สุด (ไม่เกิน max_match_distance)
+    มือที่เหลือจะถูกให้ผู้เล่นที่ยังไม่มีมือตามลำดับ ถ้าผู้เล่นไม่เจอมือเกิน max_missed_frames เฟรม
+    มือนั้นจะถูกปล่อยให้คนอื่นใช้ได้
+
+    Args:
+        provider: HandLandmarkProvider ที่ใช้ร่วมกับ HandTracking
+        num_players: จำนวนผู้เล่น (1 - MAX_PLAYERS)
+        display_size: ขนาดหน้าจอ (พิกัดปลายนิ้วจะอยู่ในหน่วย pixel ของหน้าจอ)
+    """
+
+    def __init__(self, provider, num_players=1, display_size=(1200, 900), max_match_distance=0.25,
+                 max_missed_frames=15):
+        self.display_size = tuple(display_size)
+        self.max_match_distance = max_match_distance
+        self.max_missed_frames = max_missed_frames
+        self.players = []
+        self._positions = {}
+        self.set_num_players(num_players)
+        # callback ถูกเรียกบน thread ที่ทำ inference
+        self.subscription = provider.subscribe(self._on_landmarks)
+
+    def set_num_players(self, num_players):
+        """เปลี่ยนจำนวนผู้เล่น (ผู้เล่นที่มีอยู่แล้วยังคงใช้ออบเจกต์เดิม)"""
+        num_players = max(1, min(MAX_PLAYERS, num_players))
+        players = self.players[:num_players]
+        for player_id in range(len(players), num_players):
+            players.append(Player(player_id, *self.display_size))
+        self.players = players
+
+    @property
+    def num_players(self):
+        return len(self.players)
+
+    def reset(self):
+        for player in self.players:
+            player.reset()
+        self._positions = {}
+
+    def assign(self, hands, players=None):
+        """
+        จับคู่มือกับผู้เล่น
+
+        Returns:
+            list: คู่ (player, hand) ของผู้เล่นที่เจอมือในเฟรมนี้
+        """
+        players = players if players is not None else self.players
+        wrists = [hand[WRIST, :2] for hand in hands]
+
+        # จับคู่ผู้เล่นที่มีมืออยู่แล้วกับมือที่ใกล้ที่สุดก่อน
+        candidates = sorted(
+            (float(np.linalg.norm(wrist - player.anchor)), p, h)
+            for p, player in enumerate(players) if player.anchor is not None
+            for h, wrist in enumerate(wrists))
+        hand_for_player = {}
+        for distance, p, h in candidates:
+            if distance > self.max_match_distance:
+                break
+            if p in hand_for_player or h in hand_for_player.values():
+                continue
+            hand_for_player[p] = h
+
+        # มือใหม่ให้ผู้เล่นที่ยังว่างตามลำดับ
+        free_hands = [h for h in range(len(hands)) if h not in hand_for_player.values()]
+        for p, player in enumerate(players):
+            if not free_hands:
+                break
+            if player.anchor is None and p not in hand_for_player:
+                hand_for_player[p] = free_hands.pop(0)
+
+        pairs = []
+        for p, player in enumerate(players):
+            h = hand_for_player.get(p)
+            if h is None:
+                player.missed_frames += 1
+                if player.missed_frames > self.max_missed_frames:
+                    player.release_hand()
+                continue
+            player.anchor = wrists[h]
+            player.missed_frames = 0
+            pairs.append((player, hands[h]))
+        return pairs
+
+    def _on_landmarks(self, landmark_frame):
+        """คำนวณตำแหน่งปลายนิ้วชี้ (smooth แยกต่อผู้เล่น) ในพิกัดของหน้าจอ"""
+        players = self.players
+        positions = {}
+        hand_index = {id(hand): h for h, hand in enumerate(landmark_frame.hands)}
+        no_hand = np.zeros(1, dtype=bool)
+        with_hand = set()
+        for player, hand in self.assign(landmark_frame.hands, players):
+            with_hand.add(player.player_id)
+            # ท่า undo ตรวจจากมือของผู้เล่นคนนั้นเท่านั้น
+            states = landmark_frame.features.extended[hand_index[id(hand)]]
+            engine = player.undo_gesture
+            if engine.push(engine.classify(states), landmark_frame.timestamp):
+                player.undo_requests.append(landmark_frame.timestamp)
+
+            tip_x, tip_y = hand[INDEX_FINGER_TIP, :2]
+            if not (0 <= tip_x <= 1 and 0 <= tip_y <= 1):
+                continue
+            player.smooth_positions.append((tip_x * self.display_size[0], tip_y * self.display_size[1]))
+            avg_x, avg_y = np.mean(player.smooth_positions, axis=0).astype(int).tolist()
+            positions[player.player_id] = (avg_x, avg_y)
+        for player in players:
+            if player.player_id not in with_hand:
+                player.undo_gesture.push(no_hand, landmark_frame.timestamp)
+        self._positions = positions
+
+    def positions(self, player):
+        """
+        Returns:
+            list: ตำแหน่งปลายนิ้วของผู้เล่นในรูปแบบเดียวกับ HandTracking.get_hand_positions ([] = ไม่เจอมือ)
+        """
+        position = self._positions.get(player.player_id)
+        return [position] if position is not None else []
+
+    def leader(self):
+        """ผู้เล่นที่คะแนนรวมสูงที่สุด (ถ้ายังไม่มีคะแนนเลยจะคืนผู้เล่นคนแรก)"""
+        scored = [player for player in self.players if player.latest_metrics]
+        if not scored:
+            return self.players[0]
+        return max(scored, key=lambda player: player.latest_metrics["overall_score"])
+
+    def close(self):
+        self.subscription.close()
+
+
+class PlayerScorer:
+    """
+    ให้คะแนนภาพวาดของผู้เล่นแต่ละคนพร้อมกันบน thread pool
+
+    ผู้เล่นแต่ละคนมีงานค้างได้แค่หนึ่งงาน ถ้ายังคำนวณไม่เสร็จ submit จะข้ามไป
+    (main loop ไม่ต้องรอการให้คะแนน) งานของ OpenCV/numpy ปล่อย GIL จึงทำงานขนานกันได้จริง
+    ภาพที่ได้คะแนนกับ template เดิมแล้ว (DrawingApp.version เดิม) จะไม่ถูกให้คะแนนซ้ำ
+    """
+
+    def __init__(self, max_workers=MAX_PLAYERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scoring")
+        self._pending = {}
+        self._scored = {}  # player_id -> (template, version) ของคะแนนใน player.latest_metrics
+
+    @staticmethod
+    def _score_key(player, template_surface, binary_template_path):
+        return (id(template_surface), binary_template_path, player.drawing_app.version)
+
+    def is_scored(self, player, template_surface, binary_template_path=None):
+        """True ถ้าภาพปัจจุบันของผู้เล่นได้คะแนนกับ template นี้แล้ว หรือกำลังคำนวณอยู่"""
+        key = self._score_key(player, template_surface, binary_template_path)
+        future = self._pending.get(player.player_id)
+        if future is not None and future.score_key == key:
+            return True
+        return self._scored.get(player.player_id) == key
+
+    def submit(self, player, drawing_surface, template_surface, binary_template_path=None, save_debug=False):
+        """
+        Args:
+            drawing_surface: ภาพวาดของผู้เล่น (ต้องเป็น surface ใหม่ ไม่ใช่ layer ที่ยังวาดต่ออยู่)
+            save_debug: บันทึกภาพ debug_*.png ของการให้คะแนนครั้งนี้ด้วยหรือไม่ (ชื่อไฟล์ตายตัว
+                ถ้าหลายผู้เล่นบันทึกพร้อมกันบน thread pool จะเขียนทับกัน ให้เปิดทีละผู้เล่นเท่านั้น)
+
+        Returns:
+            bool: True ถ้าเริ่มงานใหม่
+        """
+        future = self._pending.get(player.player_id)
+        if future is not None and not future.done():
+            return False
+        if self.is_scored(player, template_surface, binary_template_path):
+            return False
+        # จำว่าภาพที่ส่งไปคือภาพไหน เพื่อใช้คะแนนนี้อีกเมื่อ undo/redo กลับมาที่ภาพเดิม
+        future = self.executor.submit(
+            ShapeMeasure.evaluate_drawing, drawing_surface, template_surface, binary_template_path, save_debug)
+        future.state_key = player.drawing_app.state_key
+        future.score_key = self._score_key(player, template_surface, binary_template_path)
+        self._pending[player.player_id] = future
+        return True
+
+    def collect(self, players):
+        """
+        เก็บผลที่คำนวณเสร็จแล้วลงใน player.latest_metrics
+
+        Returns:
+            list: ผู้เล่นที่ได้คะแนนใหม่
+        """
+        updated = []
+        for player in players:
+            future = self._pending.get(player.player_id)
+            if future is None or not future.done():
+                continue
+            del self._pending[player.player_id]
+            try:
+                player.latest_metrics = future.result()
+                player.metrics_version = future.score_key[2]
+                player.remember_metrics(future.state_key, player.latest_metrics)
+                self._scored[player.player_id] = future.score_key
+                updated.append(player)
+            except Exception as e:
+                print(f"Error measuring drawing of {player.name}: {e}")
+        return updated
+
+    def discard(self, player):
+        """ทิ้งงานที่ค้างของผู้เล่นคนนี้ (ภาพที่ส่งไปไม่ใช่ภาพปัจจุบันแล้ว เช่นหลัง undo)"""
+        future = self._pending.pop(player.player_id, None)
+        if future is not None:
+            future.cancel()
+
+    def cancel(self):
+        """ทิ้งงานที่ยังไม่เริ่ม (ใช้ตอนรีเซ็ตเกม)"""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending = {}
+        self._scored = {}
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
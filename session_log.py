@@ -0,0 +1,175 @@
+"""
+บันทึกเกมหนึ่งรอบเป็นไฟล์ binary แบบต่อท้าย (append-only) เพื่อเล่นซ้ำภายหลัง
+
+รูปแบบไฟล์: MAGIC แล้วตามด้วย record ต่อกันไปเรื่อยๆ แต่ละ record คือ
+
+    header (RECORD_HEADER): ชนิด record (uint8), flags (uint8), timestamp (float64), ความยาว payload (uint32)
+    payload: ข้อมูลตามชนิด (ถูกบีบอัดด้วย zlib ถ้า flags มี FLAG_ZLIB)
+
+record ที่เขียนไม่ครบ (เกมปิดกลางคัน) จะถูกข้ามตอนอ่าน ส่วนที่เขียนครบแล้วยังอ่านได้ตามปกติ
+เล่นซ้ำด้วย `python benchmark.py --session recordings/sessions/<ไฟล์>.ccs`
+"""
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+MAGIC = b"CCSESS1\n"
+RECORD_HEADER = struct.Struct("<BBdI")
+FLAG_ZLIB = 1
+
+# ชนิดของ record
+START = 1        # json: difficulty, num_players, display_size
+FINGERTIPS = 2   # int16 (num_players, 2) ตำแหน่งปลายนิ้วที่ส่งเข้า DrawingApp.update ของแต่ละผู้เล่น
+LANDMARKS = 3    # uint8 จำนวนมือ + float32 (hands, 21, 3)
+GESTURE = 4      # json: gesture
+SCORE = 5        # json: player ที่เริ่มให้คะแนน (ภาพ ณ ตอนนี้คือภาพที่ถูกให้คะแนน)
+METRICS = 6      # json: player, metrics ที่คำนวณเสร็จแล้ว
+RESULT = 7       # json: result, leader
+EVENT = 8        # json: เหตุการณ์อื่นๆ (เช่น reset)
+
+RECORD_NAMES = {START: "start", FINGERTIPS: "fingertips", LANDMARKS: "landmarks", GESTURE: "gesture",
+                SCORE: "score", METRICS: "metrics", RESULT: "result", EVENT: "event"}
+
+# ตำแหน่งปลายนิ้วของผู้เล่นที่ไม่มีมือในเฟรมนั้น (ยกปากกา)
+NO_POSITION = -32768
+
+Record = namedtuple("Record", ["kind", "timestamp", "data"])
+
+
+class SessionRecorder:
+    """
+    เขียน record ของเกมหนึ่งรอบต่อท้ายไฟล์
+
+    เรียกได้จากหลาย thread (record_landmarks ใช้เป็น callback ของ provider.subscribe() ได้โดยตรง)
+
+    Args:
+        path: ไฟล์ที่จะเขียน (สร้างโฟลเดอร์ให้ถ้ายังไม่มี)
+        compress: บีบอัด payload ด้วย zlib (เฉพาะ payload ที่ยาวกว่า min_compress_size)
+        flush_interval: เขียนลงดิสก์อย่างน้อยทุกกี่วินาที (record ที่ไม่ใช่ต่อเฟรมจะ flush ทันที)
+    """
+
+    def __init__(self, path, compress=True, min_compress_size=64, flush_interval=1.0):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.compress = compress
+        self.min_compress_size = min_compress_size
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._last_flush = time.perf_counter()
+
+    def write(self, kind, payload, timestamp=None, flush=False):
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        flags = 0
+        if self.compress and len(payload) > self.min_compress_size:
+            compressed = zlib.compress(payload, 1)
+            if len(compressed) < len(payload):
+                payload = compressed
+                flags |= FLAG_ZLIB
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(RECORD_HEADER.pack(kind, flags, timestamp, len(payload)))
+            self._file.write(payload)
+            self.records += 1
+            now = time.perf_counter()
+            if flush or now - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = now
+
+    def write_json(self, kind, data, timestamp=None):
+        self.write(kind, json.dumps(data, default=float).encode("utf-8"), timestamp, flush=True)
+
+    def start(self, difficulty, num_players, display_size, timestamp=None):
+        self.write_json(START, {"difficulty": difficulty, "num_players": num_players,
+                                "display_size": list(display_size)}, timestamp)
+
+    def record_fingertips(self, positions, timestamp):
+        """
+        Args:
+            positions: list ของตำแหน่งที่ส่งเข้า DrawingApp.update ของผู้เล่นแต่ละคน ([] = ไม่มีมือ)
+            timestamp: timestamp เดียวกับที่ส่งเข้า DrawingApp.update
+        """
+        tips = np.full((len(positions), 2), NO_POSITION, dtype=np.int16)
+        for i, player_positions in enumerate(positions):
+            if player_positions:
+                tips[i] = np.clip(player_positions[-1], -32767, 32767)
+        self.write(FINGERTIPS, tips.tobytes(), timestamp)
+
+    def record_landmarks(self, landmark_frame):
+        hands = np.asarray(landmark_frame.hands, dtype=np.float32).reshape(-1, 21, 3)
+        self.write(LANDMARKS, bytes([len(hands)]) + hands.tobytes(), landmark_frame.timestamp)
+
+    def gesture(self, name, timestamp=None):
+        self.write_json(GESTURE, {"gesture": name}, timestamp)
+
+    def score(self, player_id, timestamp=None):
+        self.write_json(SCORE, {"player": player_id}, timestamp)
+
+    def metrics(self, player_id, metrics, timestamp=None):
+        self.write_json(METRICS, {"player": player_id, "metrics": metrics}, timestamp)
+
+    def result(self, result, leader_id, timestamp=None):
+        self.write_json(RESULT, {"result": result, "leader": leader_id}, timestamp)
+
+    def event(self, name, timestamp=None, **data):
+        self.write_json(EVENT, dict(data, event=name), timestamp)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def session_path(directory="recordings/sessions", difficulty=""):
+    """ชื่อไฟล์ใหม่สำหรับเกมรอบนี้ (ตามวันเวลาที่เริ่ม)"""
+    name = time.strftime("%Y%m%d-%H%M%S")
+    if difficulty:
+        name += f"-{difficulty.lower()}"
+    return os.path.join(directory, name + ".ccs")
+
+
+def decode(kind, payload):
+    """แปลง payload ของ record เป็นข้อมูลตามชนิด"""
+    if kind == FINGERTIPS:
+        tips = np.frombuffer(payload, dtype=np.int16).reshape(-1, 2)
+        return [[] if tip[0] == NO_POSITION else [(int(tip[0]), int(tip[1]))] for tip in tips]
+    if kind == LANDMARKS:
+        count = payload[0]
+        return np.frombuffer(payload, dtype=np.float32, offset=1).reshape(count, 21, 3)
+    return json.loads(payload.decode("utf-8"))
+
+
+def read_session(path):
+    """
+    อ่าน record ทั้งหมดของไฟล์ตามลำดับที่เขียน
+
+    Yields:
+        Record: (kind, timestamp, data)
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            kind, flags, timestamp, length = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                print(f"Session {path} ends with a truncated record, ignoring it")
+                return
+            if flags & FLAG_ZLIB:
+                payload = zlib.decompress(payload)
+            yield Record(kind, timestamp, decode(kind, payload))
@@ -0,0 +1,239 @@
+import time
+
+import numpy as np
+
+X, Y, T, STROKE = range(4)
+
+
+def simplify_rdp(points, epsilon):
+    """
+    Ramer–Douglas–Peucker: เลือกจุดที่ต้องเก็บไว้ให้เส้นเดิมห่างจากเส้นที่ลดจุดแล้วไม่เกิน epsilon พิกเซล
+
+    Args:
+        points: array (จำนวนจุด, 2)
+        epsilon: ระยะห่างสูงสุดที่ยอมให้ (พิกเซล)
+
+    Returns:
+        numpy.ndarray: mask (bool) ของจุดที่เก็บไว้ (จุดแรกและจุดสุดท้ายเก็บเสมอ)
+    """
+    points = np.asarray(points, dtype=np.float64)
+    keep = np.zeros(len(points), dtype=bool)
+    if len(points) <= 2:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+    # ใช้ stack แทน recursion (เส้นยาวหลายพันจุดจะไม่ชน recursion limit)
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        segment = end - start
+        inner = points[first + 1:last] - start
+        length = np.hypot(segment[0], segment[1])
+        if length > 0:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        else:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        i = int(np.argmax(distances))
+        if distances[i] > epsilon:
+            split = first + 1 + i
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+class StrokeStore:
+    """
+    เก็บจุดของเส้นที่วาดเป็น float32 array ขนาด (จำนวนจุด, 4) = (x, y, t, stroke_id)
+
+    - เส้นใหม่ (pen-up) เริ่มเมื่อเรียก pen_up() (มือหายไป) หรือเมื่อจุดใหม่ห่างจากจุดก่อนหน้าเกิน gap วินาที
+    - array ขยายขนาดเป็นสองเท่าเมื่อเต็ม แต่ไม่เกิน max_points ถ้าถึงแล้วจะทิ้งจุดเก่าที่สุดครึ่งหนึ่ง
+      (first_stroke คือ id ของเส้นเก่าสุดที่ยังเก็บไว้ครบทุกจุด)
+    - ถ้า epsilon > 0 เส้นที่จบแล้วจะถูกลดจุดด้วย Ramer–Douglas–Peucker (simplify_rdp)
+    - t เก็บเป็นวินาทีนับจากจุดแรกหลัง clear() (float32 ไม่พอสำหรับค่า perf_counter โดยตรง)
+      timestamp ที่ส่งเข้ามาต้องใช้นาฬิกาเดียวกันตลอด (ค่าเริ่มต้น time.perf_counter)
+
+    Args:
+        capacity: ขนาดเริ่มต้นของ array
+        max_points: จำนวนจุดสูงสุดที่เก็บไว้
+        gap: ช่วงเวลาที่ไม่มีจุดใหม่นานเกินกว่านี้จะถือว่ายกปากกา (วินาที)
+        epsilon: ระยะห่างสูงสุด (พิกเซล) ที่ยอมให้เมื่อลดจุดของเส้นที่จบแล้ว (0 = เก็บทุกจุด)
+    """
+
+    def __init__(self, capacity=1024, max_points=50000, gap=0.25, epsilon=0.0):
+        self.max_points = max_points
+        self.gap = gap
+        self.epsilon = epsilon
+        self._data = np.empty((min(capacity, max_points), 4), dtype=np.float32)
+        self.clear()
+
+    def clear(self):
+        self._count = 0
+        self._stroke_start = 0
+        self._next_stroke_id = 0
+        self.pen_down = False
+        self.dropped_points = 0
+        self.first_stroke = 0
+        self.simplified_points = 0
+        self.origin = None
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def stroke_count(self):
+        return self._next_stroke_id
+
+    def add(self, x, y, timestamp=None):
+        """
+        เพิ่มจุดใหม่ของเส้นปัจจุบัน (หรือเริ่มเส้นใหม่ถ้ายกปากกาอยู่)
+
+        Returns:
+            tuple: จุด (x, y) ก่อนหน้าในเส้นเดียวกัน หรือ None ถ้าเป็นจุดแรกของเส้น
+        """
+        t = self._time(timestamp)
+        previous = None
+        if self.pen_down and self._count > self._stroke_start:
+            last = self._data[self._count - 1]
+            if t - last[T] > self.gap:
+                self.pen_up()
+            else:
+                previous = (int(last[X]), int(last[Y]))
+
+        if not self.pen_down:
+            self.pen_down = True
+            self._stroke_start = self._count
+            self._next_stroke_id += 1
+
+        self._reserve()
+        self._data[self._count] = (x, y, t, self._next_stroke_id - 1)
+        self._count += 1
+        return previous
+
+    def touch(self, timestamp=None):
+        """มือยังอยู่ที่เดิม: เลื่อนเวลาของจุดล่าสุด เพื่อไม่ให้ถูกนับเป็นช่วงที่ไม่มีจุด (gap)"""
+        if self.pen_down and self._count > self._stroke_start:
+            self._data[self._count - 1, T] = self._time(timestamp)
+
+    def _time(self, timestamp):
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self.origin is None:
+            self.origin = timestamp
+        return timestamp - self.origin
+
+    def pen_up(self):
+        """จบเส้นปัจจุบัน (ลดจุดถ้ากำหนด epsilon) จุดถัดไปจะเริ่มเส้นใหม่"""
+        if self.pen_down and self.epsilon > 0:
+            self._simplify_current()
+        self.pen_down = False
+
+    def _simplify_current(self):
+        # เส้นปัจจุบันอยู่ท้าย array เสมอ จึงบีบจุดที่เหลือเข้าหากันได้โดยไม่ต้องย้ายเส้นอื่น
+        stroke = self._data[self._stroke_start:self._count]
+        keep = simplify_rdp(stroke[:, :2], self.epsilon)
+        kept = int(np.count_nonzero(keep))
+        if kept == len(stroke):
+            return
+        self._data[self._stroke_start:self._stroke_start + kept] = stroke[keep]
+        self.simplified_points += len(stroke) - kept
+        self._count = self._stroke_start + kept
+
+    def _reserve(self):
+        if self._count < len(self._data):
+            return
+        if len(self._data) < self.max_points:
+            grown = np.empty((min(len(self._data) * 2, self.max_points), 4), dtype=np.float32)
+            grown[:self._count] = self._data[:self._count]
+            self._data = grown
+            return
+        # เต็มแล้ว: ทิ้งจุดเก่าครึ่งหนึ่ง (ค่าใช้จ่ายเฉลี่ยต่อจุดยังคงเป็น O(1))
+        drop = self._count // 2
+        last_dropped = self._data[drop - 1, STROKE]
+        self._data[:self._count - drop] = self._data[drop:self._count]
+        self._count -= drop
+        # เส้นที่ถูกทิ้งไปบางส่วนไม่นับว่ายังเก็บไว้
+        first = int(self._data[0, STROKE])
+        self.first_stroke = first + 1 if self._data[0, STROKE] == last_dropped else first
+        self._stroke_start = max(0, self._stroke_start - drop)
+        self.dropped_points += drop
+
+    def pop_stroke(self):
+        """
+        เอาเส้นล่าสุดออก (ยกปากกาก่อนถ้ายังวาดอยู่) ใช้สำหรับ undo
+
+        Returns:
+            numpy.ndarray: สำเนาของจุดในเส้นนั้น (จำนวนจุด, 4) หรือ None ถ้าไม่มีเส้นให้เอาออก
+        """
+        self.pen_up()
+        if self._count == 0 or self._next_stroke_id == 0:
+            return None
+        stroke_id = self._next_stroke_id - 1
+        if self._data[self._count - 1, STROKE] != stroke_id:
+            return None
+        start = int(np.searchsorted(self._data[:self._count, STROKE], stroke_id))
+        stroke = self._data[start:self._count].copy()
+        self._count = start
+        self._stroke_start = start
+        self._next_stroke_id -= 1
+        return stroke
+
+    def push_stroke(self, stroke):
+        """ใส่เส้นที่ได้จาก pop_stroke กลับเป็นเส้นล่าสุด (redo)"""
+        self.pen_up()
+        stroke = np.array(stroke, dtype=np.float32)
+        stroke[:, STROKE] = self._next_stroke_id
+        self._next_stroke_id += 1
+        for row in stroke:
+            self._reserve()
+            self._data[self._count] = row
+            self._count += 1
+        self._stroke_start = self._count
+
+    def strokes_from(self, stroke_id):
+        """
+        Returns:
+            list: view ของแต่ละเส้นที่มี id ตั้งแต่ stroke_id ขึ้นไป
+        """
+        points = self.points()
+        start = int(np.searchsorted(points[:, STROKE], stroke_id))
+        points = points[start:]
+        if not len(points):
+            return []
+        breaks = np.flatnonzero(np.diff(points[:, STROKE])) + 1
+        return np.split(points, breaks)
+
+    def last_point(self):
+        """จุดล่าสุดของเส้นปัจจุบัน (x, y) หรือ None ถ้ายกปากกาอยู่"""
+        if not self.pen_down or self._count == 0:
+            return None
+        x, y = self._data[self._count - 1, :2]
+        return int(x), int(y)
+
+    def current_stroke(self):
+        """view (จำนวนจุด, 4) ของเส้นที่กำลังวาด (ว่างถ้ายกปากกาอยู่)"""
+        if not self.pen_down:
+            return self._data[:0]
+        return self._data[self._stroke_start:self._count]
+
+    def points(self):
+        """view (จำนวนจุด, 4) ของทุกจุด ห้ามแก้ไขค่า"""
+        return self._data[:self._count]
+
+    def xy(self):
+        """view (จำนวนจุด, 2) ของพิกัดทุกจุด"""
+        return self._data[:self._count, :2]
+
+    def strokes(self):
+        """
+        Returns:
+            list: view (จำนวนจุด, 4) ของแต่ละเส้น เรียงตามเวลา
+        """
+        points = self.points()
+        if not len(points):
+            return []
+        breaks = np.flatnonzero(np.diff(points[:, STROKE])) + 1
+        return np.split(points, breaks)
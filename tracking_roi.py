@@ -0,0 +1,112 @@
+import cv2
+import numpy as np
+
+
+class InferenceRoi:
+    """
+    เลือกส่วนของภาพที่จะส่งให้ MediaPipe เพื่อลดค่าใช้จ่ายของ hands.process
+
+    - ยังไม่เจอมือ: ส่งทั้งภาพแต่ย่อลงด้วย detect_scale
+    - เจอมือแล้ว: ตัดเฉพาะกรอบรอบมือล่าสุด (ขยายด้วย margin) แล้วย่อให้ด้านยาวไม่เกิน crop_size
+      ถ้ากรอบที่ครอบทุกมือใหญ่กว่าภาพจัตุรัสที่ตัดได้ (เช่นผู้เล่นสองคนยืนห่างกัน) จะใช้ภาพเต็มที่ย่อแล้วแทน
+    - ทุก full_frame_interval เฟรมจะกลับไปตรวจทั้งภาพ เพื่อหามือที่เพิ่งเข้ามาในภาพ
+
+    พิกัดที่ได้จาก MediaPipe จะถูกแปลงกลับเป็นพิกัด normalized ของภาพเต็มด้วย map_to_frame()
+
+    Args:
+        detect_scale: สัดส่วนการย่อภาพตอนยังไม่เจอมือ (1.0 = ไม่ย่อ)
+        crop_size: ความยาวด้านยาวสูงสุด (pixel) ของภาพ crop ที่ส่งให้ MediaPipe (None = ไม่ย่อ)
+        margin: สัดส่วนที่ขยายออกจากกรอบของมือในแต่ละด้าน
+        min_crop: ขนาดด้านที่เล็กที่สุดของ crop (pixel ของภาพเต็ม)
+        full_frame_interval: ตรวจทั้งภาพทุกกี่เฟรม (0 = ไม่ตรวจ)
+    """
+
+    def __init__(self, detect_scale=0.5, crop_size=256, margin=0.35, min_crop=160, full_frame_interval=30):
+        self.detect_scale = detect_scale
+        self.crop_size = crop_size
+        self.margin = margin
+        self.min_crop = min_crop
+        self.full_frame_interval = full_frame_interval
+        self._bbox = None  # (x0, y0, x1, y1) ใน pixel ของภาพเต็ม
+        self._frames_since_full = 0
+
+    def settings(self):
+        return {
+            "detect_scale": self.detect_scale,
+            "crop_size": self.crop_size,
+            "margin": self.margin,
+            "min_crop": self.min_crop,
+            "full_frame_interval": self.full_frame_interval,
+        }
+
+    def reset(self):
+        self._bbox = None
+        self._frames_since_full = 0
+
+    @property
+    def tracking(self):
+        return self._bbox is not None
+
+    def prepare(self, frame):
+        """
+        Returns:
+            tuple: (ภาพที่จะส่งให้ MediaPipe, region) โดย region = (x0, y0, w, h) ของภาพเต็ม
+        """
+        h, w = frame.shape[:2]
+        use_full_frame = self._bbox is None or (
+            self.full_frame_interval and self._frames_since_full >= self.full_frame_interval)
+
+        if use_full_frame:
+            self._frames_since_full = 0
+            region = (0, 0, w, h)
+            if self.detect_scale >= 1.0:
+                return frame, region
+            size = (max(1, int(w * self.detect_scale)), max(1, int(h * self.detect_scale)))
+            return cv2.resize(frame, size, interpolation=cv2.INTER_AREA), region
+
+        self._frames_since_full += 1
+        x0, y0, x1, y1 = self._bbox
+        crop = frame[y0:y1, x0:x1]
+        region = (x0, y0, x1 - x0, y1 - y0)
+        longest = max(crop.shape[0], crop.shape[1])
+        if self.crop_size and longest > self.crop_size:
+            scale = self.crop_size / longest
+            size = (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale)))
+            crop = cv2.resize(crop, size, interpolation=cv2.INTER_AREA)
+        return crop, region
+
+    @staticmethod
+    def map_to_frame(hands, region, frame_size):
+        """
+        แปลงพิกัด normalized ของภาพที่ส่งให้ MediaPipe กลับเป็นพิกัด normalized ของภาพเต็ม
+        """
+        x0, y0, rw, rh = region
+        w, h = frame_size
+        if (x0, y0, rw, rh) == (0, 0, w, h):
+            return hands
+        scale = np.array([rw / w, rh / h, rw / w], dtype=np.float32)
+        offset = np.array([x0 / w, y0 / h, 0.0], dtype=np.float32)
+        return [hand * scale + offset for hand in hands]
+
+    def update(self, hands, frame_size):
+        """
+        คำนวณกรอบของเฟรมถัดไปจากพิกัดมือ (normalized ของภาพเต็ม) ที่เพิ่งได้
+        """
+        if not hands:
+            self._bbox = None
+            return
+        w, h = frame_size
+        points = np.concatenate([hand[:, :2] for hand in hands]) * (w, h)
+        (min_x, min_y), (max_x, max_y) = points.min(axis=0), points.max(axis=0)
+
+        # ขยายกรอบและทำให้เป็นสี่เหลี่ยมจัตุรัส (MediaPipe ทำงานได้ดีกับภาพที่ไม่บิดสัดส่วน)
+        side = max(max_x - min_x, max_y - min_y) * (1 + 2 * self.margin)
+        if side > min(w, h):
+            # ตัดเป็นจัตุรัสแล้วจะมีมือหลุดออกนอกกรอบ ให้เฟรมถัดไปใช้ภาพเต็ม (ย่อด้วย detect_scale)
+            self._bbox = None
+            return
+        side = min(max(side, self.min_crop), w, h)
+        cx, cy = (min_x + max_x) / 2, (min_y + max_y) / 2
+        x0 = int(np.clip(cx - side / 2, 0, w - side))
+        y0 = int(np.clip(cy - side / 2, 0, h - side))
+        self._bbox = (x0, y0, x0 + int(side), y0 + int(side))